@@ -0,0 +1,277 @@
+# File: devvconnect-backend/applications.py
+# Proposal submission (POST /freelancer/apply/{job_id}, POST /proposals/proposals) and review
+# (POST /client/jobs/{job_id}/review, POST /client/proposals/{id}/approve).
+#
+# A freelancer holds at most one proposal per job, enforced by the unique index on
+# proposals (job_id, freelancer_id). submit_proposal is a single
+#   INSERT ... ON CONFLICT (job_id, freelancer_id) DO NOTHING RETURNING proposals.*, <job's client_id>
+# so the duplicate check, the insert, reading the row back and looking up the job's client (for
+# cache invalidation) are one round trip, followed by the job's counter increment and the
+# client's daily stats (client_stats.py) in the same transaction. Two concurrent applies can't both succeed: the loser's insert returns no row.
+# Databases without ON CONFLICT fall back to insert + IntegrityError.
+#
+# Reviews are set-based: one statement reads (and on PostgreSQL locks) the job and checks the
+# proposals belong to it, one UPDATE ... SET status = CASE ... applies every decision and
+# rejects the remaining pending proposals (skipping any already in their new status), one
+# UPDATE recounts the job's proposal counters and closes the job, all in one transaction. The
+# client's daily stats count only the rows that changed; a proposal switched from one decision
+# to the other is also taken off the day it was first counted on.
+# Row locks are held for three statements instead of a load-modify-commit cycle per proposal.
+#
+# Both queue their side effects (dashboard notifications, dropping a closed job from the
+# recommendation index) as background tasks in the same transaction (see tasks.py).
+import logging
+from datetime import datetime
+from typing import List, NamedTuple, Optional, Sequence, Tuple
+
+from sqlalchemy import case, delete, func, inspect, or_, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from client_stats import record_client_activity
+from database import DATABASE_DIALECT, engine
+from events import notify
+from job_counters import count_new_proposal, recounted_values
+from models import Job, Proposal
+from recommendations import queue_index_update
+
+logger = logging.getLogger(__name__)
+
+PROPOSAL_UNIQUE_INDEX = "uq_proposals_job_id_freelancer_id"
+
+_UPSERT_INSERTS = {"sqlite": sqlite.insert, "postgresql": postgresql.insert}
+
+
+class JobNotFoundError(LookupError):
+    pass
+
+
+class NotJobOwnerError(PermissionError):
+    pass
+
+
+class UnknownProposalsError(LookupError):
+    def __init__(self, proposal_ids: List[int]):
+        super().__init__(proposal_ids)
+        self.proposal_ids = proposal_ids
+
+
+class ReviewResult(NamedTuple):
+    approved: List[int]
+    rejected: int  # proposals this review moved to rejected, explicitly or as other pending ones
+    job_closed: bool  # the job is closed after the review
+    closed_now: bool = False  # this review closed it
+    updated: List[Tuple[int, int, str]] = []  # (proposal_id, freelancer_id, status) of every row changed
+
+
+def submit_proposal(db: Session, job_id: int, freelancer_id: int, **fields) -> Tuple[Optional[Proposal], Optional[int]]:
+    """Insert a pending proposal and commit. Returns (proposal, job_client_id), or (None, None)
+    if this freelancer already has a proposal for the job. Raises JobNotFoundError (nothing is
+    inserted) if the job doesn't exist. The returned proposal is detached and fully loaded."""
+    values = {"job_id": job_id, "freelancer_id": freelancer_id, "status": "pending", **fields}
+    client_id = select(Job.client_id).where(Job.id == job_id).scalar_subquery()
+
+    dialect_insert = _UPSERT_INSERTS.get(DATABASE_DIALECT)
+    if dialect_insert is None:
+        return _submit_proposal_checked(db, values)
+
+    statement = (
+        dialect_insert(Proposal)
+        .values(**values)
+        .on_conflict_do_nothing(index_elements=["job_id", "freelancer_id"])
+        .returning(Proposal, client_id)
+    )
+    try:
+        row = db.execute(statement).first()
+    except IntegrityError:  # PostgreSQL: foreign key to a missing job
+        db.rollback()
+        raise JobNotFoundError(job_id)
+    if row is None:
+        db.rollback()
+        return None, None
+    proposal, job_client_id = row
+    if job_client_id is None:  # SQLite doesn't enforce the foreign key
+        db.rollback()
+        raise JobNotFoundError(job_id)
+    count_new_proposal(db, job_id)
+    record_client_activity(db, job_client_id, proposals_received=1)
+    notify(db, "proposal.created", [job_client_id], job_id=job_id, proposal_id=proposal.id, freelancer_id=freelancer_id)
+    db.expunge(proposal)  # keep the RETURNING values instead of expiring them on commit
+    db.commit()
+    return proposal, job_client_id
+
+
+def _submit_proposal_checked(db: Session, values: dict) -> Tuple[Optional[Proposal], Optional[int]]:
+    job_client_id = db.query(Job.client_id).filter(Job.id == values["job_id"]).scalar()
+    if job_client_id is None:
+        raise JobNotFoundError(values["job_id"])
+    proposal = Proposal(**values)
+    db.add(proposal)
+    try:
+        db.flush()
+    except IntegrityError:  # the unique index caught a concurrent duplicate
+        db.rollback()
+        return None, None
+    count_new_proposal(db, values["job_id"])
+    record_client_activity(db, job_client_id, proposals_received=1)
+    notify(db, "proposal.created", [job_client_id], job_id=proposal.job_id, proposal_id=proposal.id, freelancer_id=proposal.freelancer_id)
+    db.expunge(proposal)
+    db.commit()
+    return proposal, job_client_id
+
+
+def dedupe_proposals() -> int:
+    """Delete duplicate (job_id, freelancer_id) proposals so the unique index can be built,
+    keeping the approved one if there is one, else the oldest. Only does work while the index
+    doesn't exist yet; call before create_missing_schema(). Returns the number of rows deleted."""
+    inspector = inspect(engine)
+    if not inspector.has_table(Proposal.__tablename__):
+        return 0
+    if any(index["name"] == PROPOSAL_UNIQUE_INDEX for index in inspector.get_indexes(Proposal.__tablename__)):
+        return 0
+
+    keep_id = func.coalesce(func.min(case((Proposal.status == "approved", Proposal.id))), func.min(Proposal.id))
+    removed = 0
+    with engine.begin() as conn:
+        duplicates = conn.execute(
+            select(Proposal.job_id, Proposal.freelancer_id, keep_id)
+            .where(Proposal.job_id.isnot(None), Proposal.freelancer_id.isnot(None))
+            .group_by(Proposal.job_id, Proposal.freelancer_id)
+            .having(func.count() > 1)
+        ).all()
+        for job_id, freelancer_id, keep in duplicates:
+            removed += conn.execute(
+                delete(Proposal.__table__).where(
+                    Proposal.job_id == job_id,
+                    Proposal.freelancer_id == freelancer_id,
+                    Proposal.id != keep,
+                )
+            ).rowcount
+    if removed:
+        logger.warning("Removed %s duplicate proposals before adding %s", removed, PROPOSAL_UNIQUE_INDEX)
+    return removed
+
+
+def review_proposals(
+    db: Session,
+    job_id: int,
+    client_id: int,
+    approve: Sequence[int] = (),
+    reject: Sequence[int] = (),
+    reject_pending: Optional[bool] = None,
+    close_job: Optional[bool] = None,
+) -> ReviewResult:
+    """Apply a client's decisions on one job's proposals and commit. `reject_pending` (reject
+    every other pending proposal) and `close_job` default to True when something is approved.
+    Raises JobNotFoundError, NotJobOwnerError, or UnknownProposalsError (ids not on this job)."""
+    decided = list(approve) + list(reject)
+    # One statement: the job (locked against concurrent reviews on PostgreSQL) plus which of the
+    # given proposals belong to it
+    rows = db.execute(
+        select(Job.client_id, Job.is_open, Proposal.id)
+        .outerjoin(Proposal, (Proposal.job_id == Job.id) & Proposal.id.in_(decided))
+        .where(Job.id == job_id)
+        .with_for_update(of=Job)
+    ).all()
+    if not rows:
+        db.rollback()
+        raise JobNotFoundError(job_id)
+    job_client_id, is_open = rows[0][0], rows[0][1]
+    if job_client_id != client_id:
+        db.rollback()
+        raise NotJobOwnerError(job_id)
+    found = {proposal_id for _, _, proposal_id in rows if proposal_id is not None}
+    missing = [proposal_id for proposal_id in decided if proposal_id not in found]
+    if missing:
+        db.rollback()
+        raise UnknownProposalsError(missing)
+    return apply_review(db, job_id, client_id, is_open, approve, reject, reject_pending, close_job)
+
+
+def apply_review(
+    db: Session,
+    job_id: int,
+    client_id: int,
+    is_open: bool,
+    approve: Sequence[int],
+    reject: Sequence[int],
+    reject_pending: Optional[bool] = None,
+    close_job: Optional[bool] = None,
+) -> ReviewResult:
+    """The writes of review_proposals, for callers that already checked the job and proposals."""
+    approve, reject = list(approve), list(reject)
+    if reject_pending is None:
+        reject_pending = bool(approve)
+    if close_job is None:
+        close_job = bool(approve)
+
+    now = datetime.utcnow()
+    approved = rejected = 0
+    updated = []
+    reversed_decisions = {}
+    job_values = {}
+    if approve or reject or reject_pending:
+        new_status = case((Proposal.id.in_(approve), "approved"), else_="rejected")
+        # Named proposals that already carry the other decision: the day they were counted on
+        # loses them again (dated the way rebuild_client_stats dates decisions)
+        previous = {
+            proposal_id: (status, decided_at)
+            for proposal_id, status, decided_at in db.execute(
+                select(Proposal.id, Proposal.status, func.coalesce(Proposal.decided_at, Proposal.created_at, Job.created_at))
+                .join(Job, Job.id == Proposal.job_id)
+                .where(Proposal.job_id == job_id, Proposal.id.in_(approve + reject), Proposal.status.in_(("approved", "rejected")))
+            )
+        }
+        targets = [Proposal.id.in_(approve + reject)]
+        if reject_pending:
+            targets.append(Proposal.status == "pending")
+        statement = (
+            update(Proposal)
+            # Proposals already in their new status are left alone, and not counted again
+            .where(Proposal.job_id == job_id, or_(*targets), Proposal.status.is_distinct_from(new_status))
+            .values(status=new_status, decided_at=now)
+            .execution_options(synchronize_session=False)
+        )
+        if engine.dialect.update_returning:
+            # The changed rows tell which freelancers to notify and what to count
+            updated = [tuple(row) for row in db.execute(statement.returning(Proposal.id, Proposal.freelancer_id, Proposal.status))]
+            changed = len(updated)
+            changed_ids = {proposal_id for proposal_id, _, _ in updated}
+            approved = sum(status == "approved" for _, _, status in updated)
+        else:
+            changed = db.execute(statement).rowcount
+            changed_ids = set(approve + reject)
+            approved = sum(previous.get(proposal_id, ("",))[0] != "approved" for proposal_id in set(approve))
+        rejected = changed - approved
+        for proposal_id, (status, decided_at) in previous.items():
+            if proposal_id in changed_ids and (status == "approved") != (proposal_id in approve):
+                day_deltas = reversed_decisions.setdefault(decided_at.date(), {})
+                column = f"proposals_{status}"
+                day_deltas[column] = day_deltas.get(column, 0) - 1
+        if changed:
+            job_values.update(recounted_values())
+    if close_job and is_open:
+        job_values.update(is_open=False, closed_at=now)
+    if job_values:
+        db.execute(update(Job).where(Job.id == job_id).values(**job_values).execution_options(synchronize_session=False))
+    result = ReviewResult(
+        approved=approve,
+        rejected=rejected,
+        job_closed=bool(close_job or not is_open),
+        closed_now=bool(close_job and is_open),
+        updated=updated,
+    )
+    for proposal_id, freelancer_id, status in updated:
+        notify(db, "proposal.updated", [freelancer_id], job_id=job_id, proposal_id=proposal_id, status=status)
+    if result.closed_now:
+        notify(db, "job.closed", [client_id], job_id=job_id)
+    if result.job_closed:
+        queue_index_update(db, closed_job_id=job_id)
+    record_client_activity(
+        db, client_id, proposals_approved=approved, proposals_rejected=rejected, jobs_closed=int(result.closed_now)
+    )
+    for day, deltas in reversed_decisions.items():
+        record_client_activity(db, client_id, day=day, **deltas)
+    db.commit()
+    return result
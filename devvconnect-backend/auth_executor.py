@@ -0,0 +1,101 @@
+# File: devvconnect-backend/auth_executor.py
+# Dedicated, bounded thread pool for blocking auth / Firebase Admin SDK calls.
+#
+# get_current_user and firebase_auth.verify_token are async dependencies, so calling the
+# blocking verifier (the revocation check does network I/O) directly on the event loop
+# stalls every in-flight request on the worker. Work submitted here runs on its own
+# small pool (so it can't starve FastAPI's default threadpool either), with a cap on how
+# much may be waiting and a timeout per call.
+import asyncio
+import contextvars
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# Max verifications running at the same time
+AUTH_EXECUTOR_MAX_WORKERS = int(os.getenv("AUTH_EXECUTOR_MAX_WORKERS", "8"))
+# Max verifications queued or running before new ones are rejected outright
+AUTH_EXECUTOR_MAX_PENDING = int(os.getenv("AUTH_EXECUTOR_MAX_PENDING", "256"))
+# Seconds a caller waits for a verification before giving up
+AUTH_VERIFY_TIMEOUT_SECONDS = float(os.getenv("AUTH_VERIFY_TIMEOUT_SECONDS", "10"))
+
+
+class ExecutorSaturatedError(RuntimeError):
+    pass
+
+
+class BlockingExecutor:
+    def __init__(self, name: str, max_workers: int, max_pending: int, timeout: float):
+        self.name = name
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name)
+        self._lock = threading.Lock()
+        # Gauges
+        self.queued = 0
+        self.running = 0
+        # Counters
+        self.completed = 0
+        self.timeouts = 0
+        self.rejected = 0
+
+    async def run(self, fn, *args, timeout: float = None, **kwargs):
+        with self._lock:
+            if self.queued + self.running >= self.max_pending:
+                self.rejected += 1
+                raise ExecutorSaturatedError(f"{self.name}: {self.queued + self.running} calls already pending")
+            self.queued += 1
+
+        # Copy the caller's context so contextvars (request id, metrics) follow the call
+        context = contextvars.copy_context()
+        future = self._pool.submit(context.run, self._call, fn, args, kwargs)
+        future.add_done_callback(self._on_done)
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), timeout or self.timeout)
+        except asyncio.TimeoutError:
+            # The thread can't be interrupted; it finishes in the background and the
+            # running gauge drops when it does.
+            with self._lock:
+                self.timeouts += 1
+            raise
+
+    def _call(self, fn, args, kwargs):
+        with self._lock:
+            self.queued -= 1
+            self.running += 1
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            with self._lock:
+                self.running -= 1
+                self.completed += 1
+
+    def _on_done(self, future):
+        # Cancelled before a worker picked it up: _call never ran, so undo the queued count
+        if future.cancelled():
+            with self._lock:
+                self.queued -= 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "queued": self.queued,
+                "running": self.running,
+                "max_workers": self.max_workers,
+                "max_pending": self.max_pending,
+                "completed": self.completed,
+                "timeouts": self.timeouts,
+                "rejected": self.rejected,
+            }
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+auth_executor = BlockingExecutor(
+    "auth-verify",
+    max_workers=AUTH_EXECUTOR_MAX_WORKERS,
+    max_pending=AUTH_EXECUTOR_MAX_PENDING,
+    timeout=AUTH_VERIFY_TIMEOUT_SECONDS,
+)
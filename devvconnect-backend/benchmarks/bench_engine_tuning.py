@@ -0,0 +1,154 @@
+# File: devvconnect-backend/benchmarks/bench_engine_tuning.py
+# Mixed read/write throughput with and without the SQLite connection tuning in database.py.
+#
+# Each round seeds a fresh database in a child process and drives a mix of dashboard reads
+# (client jobs with proposals, approved jobs, /users/me) and writes (apply to a job, create a
+# job) concurrently through the app, using the load test's dataset and scenarios. "before"
+# sets every SQLITE_* pragma to "" (SQLite's defaults: rollback journal, synchronous=FULL),
+# "after" uses the defaults from database.py (WAL, synchronous=NORMAL, busy_timeout, mmap,
+# cache_size). Pool settings are the same in both. Runs alternate; medians are reported.
+#
+#   cd devvconnect-backend
+#   python benchmarks/bench_engine_tuning.py --scale 0.2 --concurrency 12 --duration 5
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{tempfile.mkdtemp()}/bench.db")
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+os.environ.setdefault("LOG_STREAM", "stderr")  # keep stdout clean for the JSON report
+os.environ.setdefault("RATE_LIMIT_ENABLED", "0")  # measure the app, not the per-user limits
+
+READS = ["client_jobs_with_proposals", "freelancer_approved_jobs", "users_me"]
+WRITES = ["freelancer_apply", "client_create_job"]
+UNTUNED = {
+    "SQLITE_JOURNAL_MODE": "",
+    "SQLITE_SYNCHRONOUS": "",
+    "SQLITE_BUSY_TIMEOUT_MS": "",
+    "SQLITE_MMAP_SIZE": "",
+    "SQLITE_CACHE_SIZE": "",
+}
+
+
+def summarize(latencies, elapsed):
+    latencies.sort()
+    from loadtest import percentile
+
+    return {
+        "requests": len(latencies),
+        "rps": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 50), 2) if latencies else None,
+        "p99_ms": round(percentile(latencies, 99), 2) if latencies else None,
+    }
+
+
+def run_child(args):
+    import httpx
+    from sqlalchemy import text
+
+    import loadtest
+    import main
+    from database import engine
+
+    loadtest.install_fake_verifier(0)
+    data, counts, _ = loadtest.seed(args.scale)
+    with engine.connect() as connection:
+        journal_mode = connection.execute(text("PRAGMA journal_mode")).scalar()
+
+    async def drive():
+        rng = random.Random(7)
+        samples = {"read": [], "write": []}
+        errors = {}
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=120) as client:
+            deadline = None
+
+            async def worker():
+                while time.perf_counter() < deadline:
+                    kind = "write" if rng.random() < args.write_ratio else "read"
+                    name = rng.choice(WRITES if kind == "write" else READS)
+                    method, path, headers, body = loadtest.SCENARIOS[name](data, rng)
+                    started = time.perf_counter()
+                    response = await client.request(method, path, headers=headers, json=body)
+                    if response.status_code >= 400:
+                        errors[str(response.status_code)] = errors.get(str(response.status_code), 0) + 1
+                    samples[kind].append((time.perf_counter() - started) * 1000)
+
+            deadline = time.perf_counter() + args.warmup
+            await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+            samples = {"read": [], "write": []}
+            started = time.perf_counter()
+            deadline = started + args.duration
+            await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+            elapsed = time.perf_counter() - started
+        return {
+            "journal_mode": journal_mode,
+            "dataset": counts,
+            "errors": errors,
+            "reads": summarize(samples["read"], elapsed),
+            "writes": summarize(samples["write"], elapsed),
+            "total_rps": round((len(samples["read"]) + len(samples["write"])) / elapsed, 1),
+        }
+
+    print(json.dumps(asyncio.run(drive())))
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description="Mixed read/write throughput before/after SQLite tuning")
+    parser.add_argument("--scale", type=float, default=0.2, help="dataset multiplier (see loadtest.py)")
+    parser.add_argument("--concurrency", type=int, default=12)
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--warmup", type=float, default=1.0)
+    parser.add_argument("--write-ratio", type=float, default=0.2, help="share of requests that write")
+    parser.add_argument("--rounds", type=int, default=3, help="alternating before/after runs; medians are reported")
+    parser.add_argument("--child", action="store_true")
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args)
+        return
+
+    runs = {"before": [], "after": []}
+    for _ in range(args.rounds):
+        for mode in ("before", "after"):
+            env = {**os.environ, "DATABASE_URL": f"sqlite:///{tempfile.mkdtemp()}/bench.db"}
+            if mode == "before":
+                env.update(UNTUNED)
+            command = [
+                sys.executable, __file__, "--child", "--scale", str(args.scale), "--concurrency", str(args.concurrency),
+                "--duration", str(args.duration), "--warmup", str(args.warmup), "--write-ratio", str(args.write_ratio),
+            ]
+            output = subprocess.run(command, env=env, check=True, capture_output=True, text=True).stdout
+            runs[mode].append(json.loads(output.strip().splitlines()[-1]))
+            print(f"{mode}: {runs[mode][-1]['total_rps']} req/s", file=sys.stderr)
+
+    report = {
+        "benchmark": "engine_tuning",
+        "db_mode": os.getenv("DB_MODE", "sync"),
+        "config": {"scale": args.scale, "concurrency": args.concurrency, "duration_s": args.duration, "write_ratio": args.write_ratio, "rounds": args.rounds},
+        "dataset": runs["after"][0]["dataset"],
+    }
+    for mode, results in runs.items():
+        report[mode] = {
+            "journal_mode": results[0]["journal_mode"],
+            "total_rps": round(statistics.median(r["total_rps"] for r in results), 1),
+            "errors": results[-1]["errors"],
+        }
+        for kind in ("reads", "writes"):
+            report[mode][kind] = {key: round(statistics.median(r[kind][key] for r in results), 2) for key in ("rps", "p50_ms", "p99_ms")}
+    report["total_rps_change_pct"] = round((report["after"]["total_rps"] - report["before"]["total_rps"]) / report["before"]["total_rps"] * 100, 1)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main_cli()
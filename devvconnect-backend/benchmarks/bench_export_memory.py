@@ -0,0 +1,158 @@
+# File: devvconnect-backend/benchmarks/bench_export_memory.py
+# Peak memory of GET /client/export as the client's proposal count grows.
+#
+# For each size a child process seeds one client with jobs carrying 10 proposals each, then a
+# fresh child process streams the export through the app, discarding chunks as they arrive,
+# and reports how far its peak RSS rose above the RSS right before the request. With
+# --compare-nested the same is measured for GET /client/jobs-with-proposals, which builds the
+# whole nested list in memory (skipped above --nested-max proposals). SQLite's page cache and
+# mmap window (up to 64 MiB + 256 MiB with database.py's defaults) are bounded but fill up
+# with the file and show in RSS, so they are turned down for the measurement unless
+# --keep-sqlite-cache is given.
+#
+#   cd devvconnect-backend
+#   python benchmarks/bench_export_memory.py --sizes 100,10000,1000000 --compare-nested
+import argparse
+import asyncio
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{tempfile.mkdtemp()}/bench.db")
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+os.environ.setdefault("LOG_STREAM", "stderr")  # keep stdout clean for the JSON report
+os.environ.setdefault("RATE_LIMIT_ENABLED", "0")  # measure the app, not the per-user limits
+
+PROPOSALS_PER_JOB = 10
+SMALL_SQLITE_CACHE = {"SQLITE_MMAP_SIZE": "0", "SQLITE_CACHE_SIZE": "-2000"}  # SQLite's compiled-in default
+
+
+def current_rss_kib():
+    with open("/proc/self/statm") as statm:
+        return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") // 1024
+
+
+def run_seed(proposals):
+    from database import SessionLocal, create_missing_schema
+    from synthetic import seed_jobs, seed_proposals, seed_users
+
+    create_missing_schema()
+    db = SessionLocal()
+    try:
+        client_ids, freelancer_ids = seed_users(db, clients=1, freelancers=PROPOSALS_PER_JOB)
+        seed_jobs(db, max(1, proposals // PROPOSALS_PER_JOB), client_ids)
+        seed_proposals(db, freelancer_ids, per_job=PROPOSALS_PER_JOB)
+    finally:
+        db.close()
+
+
+def run_measure(path):
+    # Calls the ASGI app directly: httpx's ASGITransport collects the whole body before
+    # returning, which would measure the client's buffer instead of the server's
+    import loadtest
+    import main
+
+    loadtest.install_fake_verifier(0)
+
+    async def call(path):
+        route, _, query = path.partition("?")
+        scope = {
+            "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET", "scheme": "http",
+            "path": route, "raw_path": route.encode(), "query_string": query.encode(), "root_path": "",
+            "headers": [(b"authorization", b"Bearer bench-client-0"), (b"host", b"bench")],
+            "client": ("127.0.0.1", 1), "server": ("bench", 80),
+        }
+        received = {"status": None, "bytes": 0}
+        requested = []
+        finished = asyncio.Event()
+
+        async def receive():
+            if not requested:
+                requested.append(True)
+                return {"type": "http.request", "body": b"", "more_body": False}
+            await finished.wait()  # like a server: block until the client goes away
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            if message["type"] == "http.response.start":
+                received["status"] = message["status"]
+            elif message["type"] == "http.response.body":
+                received["bytes"] += len(message.get("body", b""))
+
+        await main.app(scope, receive, send)
+        finished.set()
+        if received["status"] != 200:
+            raise RuntimeError(f"GET {path} returned {received['status']}")
+        return received["bytes"]
+
+    async def fetch():
+        await call("/users/me")  # warm imports and the principal cache
+        baseline = current_rss_kib()
+        started = time.perf_counter()
+        received = await call(path)
+        return baseline, received, time.perf_counter() - started
+
+    baseline, received, elapsed = asyncio.run(fetch())
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(json.dumps({
+        "path": path,
+        "seconds": round(elapsed, 2),
+        "response_mb": round(received / 1024 / 1024, 1),
+        "peak_rss_growth_mb": round(max(0, peak - baseline) / 1024, 1),
+    }))
+
+
+def child(env, *args):
+    command = [sys.executable, __file__, *args]
+    output = subprocess.run(command, env=env, check=True, capture_output=True, text=True).stdout
+    return output.strip().splitlines()[-1] if output.strip() else None
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description="Peak memory of the streaming export vs. proposal count")
+    parser.add_argument("--sizes", default="100,10000,100000", help="comma-separated proposal counts")
+    parser.add_argument("--compare-nested", action="store_true", help="also measure /client/jobs-with-proposals")
+    parser.add_argument("--nested-max", type=int, default=200_000)
+    parser.add_argument("--keep-sqlite-cache", action="store_true", help="measure with database.py's SQLite cache/mmap settings")
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--measure")
+    args = parser.parse_args()
+
+    if args.seed is not None:
+        run_seed(args.seed)
+        return
+    if args.measure:
+        run_measure(args.measure)
+        return
+
+    results = []
+    for size in (int(size) for size in args.sizes.split(",")):
+        env = {**os.environ, "DATABASE_URL": f"sqlite:///{tempfile.mkdtemp()}/bench.db"}
+        started = time.perf_counter()
+        child(env, "--seed", str(size))
+        row = {"proposals": size, "seed_seconds": round(time.perf_counter() - started, 1)}
+        if not args.keep_sqlite_cache:
+            env.update(SMALL_SQLITE_CACHE)
+        for name, path in (("ndjson", "/client/export?format=ndjson"), ("csv", "/client/export?format=csv")):
+            row[name] = json.loads(child(env, "--measure", path))
+        if args.compare_nested and size <= args.nested_max:
+            row["jobs_with_proposals"] = json.loads(child(env, "--measure", "/client/jobs-with-proposals"))
+        print(f"{size} proposals: export peak +{row['ndjson']['peak_rss_growth_mb']} MB", file=sys.stderr)
+        results.append(row)
+    print(json.dumps({
+        "benchmark": "export_memory",
+        "db_mode": os.getenv("DB_MODE", "sync"),
+        "sqlite_cache": "database.py defaults" if args.keep_sqlite_cache else SMALL_SQLITE_CACHE,
+        "results": results,
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main_cli()
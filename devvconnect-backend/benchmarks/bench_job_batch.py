@@ -0,0 +1,112 @@
+# File: devvconnect-backend/benchmarks/bench_job_batch.py
+# POST /client/jobs/batch vs. the same N postings sent as N POST /client/jobs calls.
+#
+# For each batch size N, one client posts N jobs both ways through the app (auth, validation,
+# insert, tags, commit and cache invalidation included) and the wall time of the whole import
+# is compared. Repeats alternate between the two; medians are reported.
+#
+#   cd devvconnect-backend
+#   python benchmarks/bench_job_batch.py --sizes 1,10,50,200,500 --repeat 5
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{tempfile.mkdtemp()}/bench.db")
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+os.environ.setdefault("LOG_STREAM", "stderr")  # keep stdout clean for the JSON report
+os.environ.setdefault("RATE_LIMIT_ENABLED", "0")  # measure the app, not the per-user limits
+
+import httpx  # noqa: E402
+
+import loadtest  # noqa: E402
+import main  # noqa: E402
+from database import SessionLocal  # noqa: E402
+from models import User  # noqa: E402
+
+TECH_STACKS = ["python, fastapi", "react, typescript", "go, postgres", "node.js, graphql", None]
+
+
+def postings(n, offset):
+    return [
+        {
+            "title": f"Imported job {offset + i}",
+            "description": "Migrate the reporting pipeline and add dashboards for the sales team.",
+            "budget": 500 + i,
+            "tech_stack": TECH_STACKS[i % len(TECH_STACKS)],
+            "timeline": "2 weeks",
+        }
+        for i in range(n)
+    ]
+
+
+def seed_client():
+    db = SessionLocal()
+    try:
+        db.add(User(name="Agency", email="agency@example.com", role="client", firebase_uid="bench-agency"))
+        db.commit()
+    finally:
+        db.close()
+
+
+async def run(sizes, repeat):
+    headers = {"Authorization": "Bearer bench-agency"}
+    transport = httpx.ASGITransport(app=main.app)
+    results = []
+    offset = 0
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=120) as client:
+        await client.post("/client/jobs/batch", json=postings(5, 0), headers=headers)  # warm up
+        for n in sizes:
+            samples = {"single_calls": [], "batch": []}
+            for _ in range(repeat):
+                items = postings(n, offset)
+                offset += n
+                started = time.perf_counter()
+                for item in items:
+                    response = await client.post("/client/jobs", json=item, headers=headers)
+                    response.raise_for_status()
+                samples["single_calls"].append((time.perf_counter() - started) * 1000)
+
+                items = postings(n, offset)
+                offset += n
+                started = time.perf_counter()
+                response = await client.post("/client/jobs/batch", json=items, headers=headers)
+                response.raise_for_status()
+                assert len(response.json()["created"]) == n
+                samples["batch"].append((time.perf_counter() - started) * 1000)
+
+            single = statistics.median(samples["single_calls"])
+            batch = statistics.median(samples["batch"])
+            results.append({
+                "jobs": n,
+                "single_calls_ms": round(single, 2),
+                "batch_ms": round(batch, 2),
+                "batch_ms_per_job": round(batch / n, 3),
+                "speedup": round(single / batch, 1),
+            })
+            print(f"N={n}: {single:.1f} ms as single calls, {batch:.1f} ms as one batch", file=sys.stderr)
+    return results
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description="Batch job creation vs. N single POST /client/jobs calls")
+    parser.add_argument("--sizes", default="1,10,50,200,500", help="comma-separated batch sizes")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    loadtest.install_fake_verifier(0)
+    seed_client()
+    sizes = [int(size) for size in args.sizes.split(",")]
+    results = asyncio.run(run(sizes, args.repeat))
+    print(json.dumps({"benchmark": "job_batch", "db_mode": os.getenv("DB_MODE", "sync"), "repeat": args.repeat, "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,153 @@
+# File: devvconnect-backend/benchmarks/bench_metrics_overhead.py
+# Overhead of the /metrics instrumentation (metrics.py).
+#
+# Times MetricsMiddleware around a trivial ASGI app (the instrumentation's own per-request cost)
+# and a bare Histogram.observe(). Then runs the same request mix end to end in child
+# processes with METRICS_ENABLED=0 and =1, alternating, and compares median latency; that
+# number is noisier (thread hops dominate) and mostly shows the cost is lost in the noise.
+#
+#   cd devvconnect-backend
+#   python benchmarks/bench_metrics_overhead.py --requests 3000
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{tempfile.mkdtemp()}/bench.db")
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+os.environ.setdefault("LOG_STREAM", "stderr")  # keep stdout clean for the JSON report
+os.environ.setdefault("RATE_LIMIT_ENABLED", "0")  # measure the app, not the per-user limits
+
+PATHS = ["/", "/jobs?limit=20", "/users/me"]
+
+
+def run_child(requests, jobs):
+    import httpx
+
+    import main
+    from database import SessionLocal
+    from routes import auth as auth_routes
+    from synthetic import seed_jobs, seed_users
+
+    db = SessionLocal()
+    client_ids, _ = seed_users(db, clients=10, freelancers=1)
+    seed_jobs(db, jobs, client_ids)
+    db.close()
+    auth_routes.verify_id_token = lambda token, check_revoked=False: {"uid": token, "exp": time.time() + 3600}
+    headers = {"Authorization": "Bearer bench-freelancer-0"}
+
+    async def drive():
+        transport = httpx.ASGITransport(app=main.app)
+        results = {}
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            for path in PATHS:
+                for _ in range(50):  # warm-up (response cache, principal cache, JIT-ish effects)
+                    await client.get(path, headers=headers)
+                samples = []
+                for _ in range(requests):
+                    started = time.perf_counter()
+                    response = await client.get(path, headers=headers)
+                    samples.append((time.perf_counter() - started) * 1e6)
+                    assert response.status_code == 200, response.text
+                samples.sort()
+                results[path] = {"mean_us": round(statistics.fmean(samples), 1), "p50_us": round(samples[len(samples) // 2], 1)}
+        return results
+
+    print(json.dumps(asyncio.run(drive())))
+
+
+def observe_cost_ns(iterations=200_000):
+    from metrics import Histogram
+
+    histogram = Histogram("bench", "bench", ("method", "route"))
+    labels = ("GET", "/jobs")
+    started = time.perf_counter()
+    for i in range(iterations):
+        histogram.observe(labels, 0.0123)
+    return (time.perf_counter() - started) / iterations * 1e9
+
+
+def middleware_cost_us(iterations=50_000):
+    # MetricsMiddleware around a trivial ASGI app vs. the bare app: the per-request cost of
+    # the instrumentation itself, without threadpool/HTTP noise.
+    from metrics import MetricsMiddleware
+
+    class Route:
+        path = "/bench/{id}"
+
+    async def bare_app(scope, receive, send):
+        scope["route"] = Route
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"{}"})
+
+    async def noop_send(message):
+        pass
+
+    async def drive(app):
+        scope = {"type": "http", "method": "GET", "path": "/bench/1", "headers": []}
+        started = time.perf_counter()
+        for _ in range(iterations):
+            await app(dict(scope), None, noop_send)
+        return (time.perf_counter() - started) / iterations * 1e6
+
+    async def both():
+        bare = min([await drive(bare_app) for _ in range(3)])
+        wrapped = min([await drive(MetricsMiddleware(bare_app)) for _ in range(3)])
+        return bare, wrapped
+
+    bare, wrapped = asyncio.run(both())
+    return wrapped - bare
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description="Measure metrics middleware overhead")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--jobs", type=int, default=1000)
+    parser.add_argument("--rounds", type=int, default=3, help="alternating off/on runs; medians are reported")
+    parser.add_argument("--child", choices=["on", "off"])
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args.requests, args.jobs)
+        return
+
+    runs = {"off": [], "on": []}
+    for _ in range(args.rounds):
+        for mode in ("off", "on"):
+            env = {**os.environ, "METRICS_ENABLED": "1" if mode == "on" else "0", "DATABASE_URL": f"sqlite:///{tempfile.mkdtemp()}/bench.db"}
+            output = subprocess.run(
+                [sys.executable, __file__, "--child", mode, "--requests", str(args.requests), "--jobs", str(args.jobs)],
+                env=env, check=True, capture_output=True, text=True,
+            ).stdout
+            runs[mode].append(json.loads(output.strip().splitlines()[-1]))
+
+    report = {
+        "benchmark": "metrics_overhead",
+        "requests_per_path": args.requests,
+        "rounds": args.rounds,
+        "observe_ns": round(observe_cost_ns()),
+        "middleware_us_per_request": round(middleware_cost_us(), 2),
+        "paths": {},
+    }
+    for path in PATHS:
+        off = statistics.median(run[path]["mean_us"] for run in runs["off"])
+        on = statistics.median(run[path]["mean_us"] for run in runs["on"])
+        report["paths"][path] = {
+            "metrics_off_mean_us": round(off, 1),
+            "metrics_on_mean_us": round(on, 1),
+            "overhead_us": round(on - off, 1),
+            "overhead_pct": round((on - off) / off * 100, 1),
+        }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main_cli()
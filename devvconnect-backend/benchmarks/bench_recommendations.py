@@ -0,0 +1,73 @@
+# File: devvconnect-backend/benchmarks/bench_recommendations.py
+# Ranking latency of the in-process recommendation index (recommendations.py).
+#
+#   cd devvconnect-backend
+#   python benchmarks/bench_recommendations.py --jobs 100000
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{tempfile.mkdtemp()}/bench.db")
+
+from recommendations import JobVectorIndex, text_features  # noqa: E402
+from synthetic import TECH, fake_job_text  # noqa: E402
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description="Benchmark recommendation ranking")
+    parser.add_argument("--jobs", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--k", type=int, default=20)
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    started = time.perf_counter()
+    rows = [(job_id, text_features(*fake_job_text(rng))) for job_id in range(1, args.jobs + 1)]
+    featurize_seconds = time.perf_counter() - started
+
+    index = JobVectorIndex()
+    started = time.perf_counter()
+    index.rebuild(rows)
+    build_seconds = time.perf_counter() - started
+
+    profiles = [
+        text_features(*fake_job_text(rng)) if i % 2 else text_features(None, None, ", ".join(rng.sample(TECH, 3)))
+        for i in range(args.queries)
+    ]
+    index.top_k(profiles[0], args.k)  # warm-up
+    latencies = []
+    for profile in profiles:
+        started = time.perf_counter()
+        index.top_k(profile, args.k, exclude_job_ids=range(1, 50))
+        latencies.append((time.perf_counter() - started) * 1000)
+
+    # Incremental maintenance: one new job appended, one closed
+    started = time.perf_counter()
+    index.add(args.jobs + 1, rows[0][1])
+    index.remove(2)
+    index.top_k(profiles[0], args.k)
+    incremental_ms = (time.perf_counter() - started) * 1000
+
+    latencies.sort()
+    print(json.dumps({
+        "benchmark": "recommendations",
+        "jobs": args.jobs,
+        "k": args.k,
+        "featurize_seconds": round(featurize_seconds, 2),
+        "build_seconds": round(build_seconds, 2),
+        "rank_p50_ms": round(statistics.median(latencies), 2),
+        "rank_p95_ms": round(latencies[int(len(latencies) * 0.95) - 1], 2),
+        "add_remove_then_rank_ms": round(incremental_ms, 2),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,74 @@
+# File: devvconnect-backend/benchmarks/bench_search.py
+# Full-text job search vs. a LIKE '%...%' scan on a synthetic job table.
+#
+#   cd devvconnect-backend
+#   python benchmarks/bench_search.py --rows 1000000
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{tempfile.mkdtemp()}/bench.db")
+
+from sqlalchemy import or_  # noqa: E402
+
+from database import SessionLocal, create_missing_schema  # noqa: E402
+from models import Job  # noqa: E402
+from search import ensure_search_index, search_jobs  # noqa: E402
+from synthetic import seed_jobs, seed_users  # noqa: E402
+
+QUERIES = ["python", "react dashboard", "payment integration", "kubernetes migration", "scal", "graphql api"]
+
+
+def timed(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return samples
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description="Benchmark /jobs/search against LIKE scans")
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--limit", type=int, default=20)
+    args = parser.parse_args()
+
+    create_missing_schema()
+    ensure_search_index()
+    db = SessionLocal()
+    started = time.perf_counter()
+    client_ids, _ = seed_users(db, clients=100, freelancers=0)
+    seed_jobs(db, args.rows, client_ids)
+    seed_seconds = time.perf_counter() - started
+
+    results = []
+    for q in QUERIES:
+        fts = timed(lambda: search_jobs(db, q, limit=args.limit), args.repeat)
+        like = timed(
+            lambda: db.query(Job)
+            .filter(Job.is_open == True, or_(Job.title.ilike(f"%{q}%"), Job.description.ilike(f"%{q}%"), Job.tech_stack.ilike(f"%{q}%")))
+            .limit(args.limit)
+            .all(),
+            max(1, args.repeat // 4),
+        )
+        results.append({
+            "query": q,
+            "fts_p50_ms": round(statistics.median(fts), 2),
+            "fts_max_ms": round(max(fts), 2),
+            "like_p50_ms": round(statistics.median(like), 2),
+        })
+    db.close()
+    print(json.dumps({"benchmark": "search", "rows": args.rows, "seed_seconds": round(seed_seconds, 1), "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main_cli()
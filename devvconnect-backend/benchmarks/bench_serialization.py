@@ -0,0 +1,120 @@
+# File: devvconnect-backend/benchmarks/bench_serialization.py
+# Serialization cost of a job list response, per 1,000 jobs.
+#
+# Compares, on the same jobs:
+#   * jsonable_encoder + json.dumps over ORM Job objects (how the listings were served before
+#     they had response models, and FastAPI's fallback for a route without one);
+#   * validating the ORM objects into List[JobRead] and rendering with orjson (a route with a
+#     response_model and the app's ORJSONResponse);
+#   * the job list path: rows of JobRead's columns -> dicts -> orjson;
+#   * the same with ?fields=id,title,budget.
+# "serialize" times the conversion alone, from already fetched objects/rows; "fetch_and_serialize"
+# includes the query, which for the last two selects only the columns that are returned.
+#
+#   cd devvconnect-backend
+#   python benchmarks/bench_serialization.py --jobs 1000 --repeat 50
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{tempfile.mkdtemp()}/bench.db")
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+import orjson  # noqa: E402
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+from pydantic import TypeAdapter  # noqa: E402
+from typing import List  # noqa: E402
+
+from database import SessionLocal, create_missing_schema  # noqa: E402
+from models import Job  # noqa: E402
+from routes.jobs import job_columns, job_dicts, job_fields  # noqa: E402
+from schemas import JOB_FIELDS, JobRead  # noqa: E402
+from synthetic import seed_jobs, seed_users  # noqa: E402
+
+PROJECTED_FIELDS = "id,title,budget"
+
+job_list_adapter = TypeAdapter(List[JobRead])
+
+
+def encoder_json(jobs) -> bytes:
+    return json.dumps(jsonable_encoder(jobs), separators=(",", ":")).encode("utf-8")
+
+
+def response_model_orjson(jobs) -> bytes:
+    validated = job_list_adapter.validate_python(jobs, from_attributes=True)
+    return orjson.dumps(job_list_adapter.dump_python(validated, mode="json"))
+
+
+def rows_orjson(rows, fields) -> bytes:
+    return orjson.dumps(job_dicts(rows, fields))
+
+
+def median_us(fn, repeat: int) -> float:
+    fn()  # warm-up
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1e6)
+    return statistics.median(samples)
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description="Benchmark job list serialization")
+    parser.add_argument("--jobs", type=int, default=1000, help="jobs per response")
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    create_missing_schema()
+    db = SessionLocal()
+    client_ids, _ = seed_users(db, clients=10, freelancers=0)
+    seed_jobs(db, args.jobs, client_ids)
+    db.close()
+
+    projected = job_fields(PROJECTED_FIELDS)
+    per_thousand = 1000 / args.jobs
+
+    def fetch_orm():
+        with SessionLocal() as session:
+            return session.query(Job).limit(args.jobs).all()
+
+    def fetch_rows(fields):
+        with SessionLocal() as session:
+            return session.query(*job_columns(fields)).limit(args.jobs).all()
+
+    jobs = fetch_orm()
+    full_rows = fetch_rows(JOB_FIELDS)
+    projected_rows = fetch_rows(projected)
+    variants = {
+        "orm_jsonable_encoder_json": (lambda: encoder_json(jobs), lambda: encoder_json(fetch_orm())),
+        "orm_response_model_orjson": (lambda: response_model_orjson(jobs), lambda: response_model_orjson(fetch_orm())),
+        "rows_orjson": (lambda: rows_orjson(full_rows, JOB_FIELDS), lambda: rows_orjson(fetch_rows(JOB_FIELDS), JOB_FIELDS)),
+        f"rows_orjson_fields={PROJECTED_FIELDS}": (
+            lambda: rows_orjson(projected_rows, projected),
+            lambda: rows_orjson(fetch_rows(projected), projected),
+        ),
+    }
+
+    results = {}
+    for name, (serialize, fetch_and_serialize) in variants.items():
+        results[name] = {
+            "serialize_us_per_1000_jobs": round(median_us(serialize, args.repeat) * per_thousand),
+            "fetch_and_serialize_us_per_1000_jobs": round(median_us(fetch_and_serialize, args.repeat) * per_thousand),
+            "body_bytes_per_1000_jobs": round(len(serialize()) * per_thousand),
+        }
+    baseline = results["orm_jsonable_encoder_json"]["serialize_us_per_1000_jobs"]
+    for result in results.values():
+        result["serialize_speedup"] = round(baseline / result["serialize_us_per_1000_jobs"], 1)
+
+    print(json.dumps({"benchmark": "serialization", "jobs": args.jobs, "repeat": args.repeat, "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main_cli()
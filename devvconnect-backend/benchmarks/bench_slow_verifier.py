@@ -0,0 +1,118 @@
+# File: devvconnect-backend/benchmarks/bench_slow_verifier.py
+# Shows that a slow token verifier no longer stalls unrelated endpoints.
+#
+# Authenticated /users/me requests hammer the app with an artificially slow verifier
+# (time.sleep, like a slow revocation lookup) while a probe keeps hitting GET /.
+# The probe's latency is reported twice: with verification on the auth executor (current
+# behaviour) and with it called inline on the event loop (the old behaviour).
+#
+#   cd devvconnect-backend
+#   python benchmarks/bench_slow_verifier.py --verify-delay 0.2 --concurrency 16 --duration 5
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{tempfile.mkdtemp()}/bench.db")
+os.environ.setdefault("RATE_LIMIT_ENABLED", "0")  # measure the app, not the per-user limits
+
+import httpx  # noqa: E402
+
+import main  # noqa: E402
+from auth_executor import auth_executor  # noqa: E402
+from database import SessionLocal  # noqa: E402
+from models import User  # noqa: E402
+from routes import auth as auth_routes  # noqa: E402
+
+PROBE_INTERVAL_SECONDS = 0.01
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+def seed_user():
+    db = SessionLocal()
+    try:
+        if not db.query(User).filter(User.firebase_uid == "bench-user").first():
+            db.add(User(name="Bench", email="bench@example.com", role="client", firebase_uid="bench-user"))
+            db.commit()
+    finally:
+        db.close()
+
+
+async def run_scenario(verify_delay, concurrency, duration, offload):
+    def slow_verify(token, check_revoked=False):
+        time.sleep(verify_delay)
+        return {"uid": "bench-user", "exp": time.time() + 3600}
+
+    auth_routes.verify_id_token = slow_verify
+    original_run = auth_executor.run
+    if not offload:
+        async def inline_run(fn, *args, timeout=None, **kwargs):
+            return fn(*args, **kwargs)
+        auth_executor.run = inline_run
+
+    probe_latencies = []
+    authed = 0
+    deadline = time.perf_counter() + duration
+    transport = httpx.ASGITransport(app=main.app)
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            async def authed_worker(worker_id):
+                nonlocal authed
+                n = 0
+                while time.perf_counter() < deadline:
+                    # A fresh token each time so the principal cache can't help
+                    n += 1
+                    await client.get("/users/me", headers={"Authorization": f"Bearer bench-{worker_id}-{n}"})
+                    authed += 1
+
+            async def probe():
+                # Latency is measured from when the probe was *scheduled* to fire, so time
+                # spent waiting for a blocked event loop counts (no coordinated omission).
+                scheduled = time.perf_counter()
+                while scheduled < deadline:
+                    await asyncio.sleep(max(0, scheduled - time.perf_counter()))
+                    await client.get("/")
+                    probe_latencies.append((time.perf_counter() - scheduled) * 1000)
+                    scheduled += PROBE_INTERVAL_SECONDS
+
+            await asyncio.gather(probe(), *(authed_worker(i) for i in range(concurrency)))
+    finally:
+        auth_executor.run = original_run
+
+    return {
+        "mode": "executor" if offload else "inline",
+        "probe_requests": len(probe_latencies),
+        "probe_p50_ms": round(statistics.median(probe_latencies), 2),
+        "probe_p99_ms": round(percentile(probe_latencies, 99), 2),
+        "authed_requests": authed,
+    }
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description="Probe GET / latency while a slow verifier runs")
+    parser.add_argument("--verify-delay", type=float, default=0.2, help="seconds each verification blocks")
+    parser.add_argument("--concurrency", type=int, default=16, help="concurrent authenticated clients")
+    parser.add_argument("--duration", type=float, default=5.0, help="seconds per scenario")
+    args = parser.parse_args()
+
+    seed_user()
+    results = [
+        asyncio.run(run_scenario(args.verify_delay, args.concurrency, args.duration, offload=True)),
+        asyncio.run(run_scenario(args.verify_delay, args.concurrency, args.duration, offload=False)),
+    ]
+    print(json.dumps({"benchmark": "slow_verifier", "params": vars(args), "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,117 @@
+# File: devvconnect-backend/benchmarks/check_sql_counts.py
+# Regression check: the dashboard endpoints run a constant number of SQL statements.
+#
+# For each size NxM, a client with N jobs of M proposals each and a freelancer approved on
+# all N jobs are seeded; every endpoint is then requested once per size through the app and
+# the X-SQL-Statements header (see sql_counter.py) is compared across sizes. Any endpoint
+# whose count grows with N or M (an N+1 query) fails the check with exit status 1.
+#
+#   cd devvconnect-backend
+#   python benchmarks/check_sql_counts.py --sizes 1x1,10x5,100x20
+#   DB_MODE=async python benchmarks/check_sql_counts.py --read-replica
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{tempfile.mkdtemp()}/sqlcounts.db")
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+os.environ.setdefault("LOG_STREAM", "stderr")  # keep stdout clean for the JSON report
+os.environ.setdefault("RATE_LIMIT_ENABLED", "0")
+if "--read-replica" in sys.argv:
+    # Reads go through read_engine; the same file stands in for the replica
+    os.environ.setdefault("DATABASE_READ_URL", os.environ["DATABASE_URL"])
+
+import httpx  # noqa: E402
+from sqlalchemy import insert  # noqa: E402
+
+import loadtest  # noqa: E402
+import main  # noqa: E402
+from database import DATABASE_READ_URL, SessionLocal  # noqa: E402
+from models import Job, Proposal, User  # noqa: E402
+from sql_counter import SQL_STATEMENTS_HEADER  # noqa: E402
+
+# (endpoint, which seeded user requests it)
+ENDPOINTS = [
+    ("/client/jobs", "client"),
+    ("/client/jobs-with-proposals", "client"),
+    ("/freelancer/approved-jobs", "freelancer"),
+    ("/proposals/freelancer/approved-jobs", "freelancer"),
+]
+
+
+def seed_size(db, label, jobs, proposals_per_job):
+    """A client with `jobs` jobs of `proposals_per_job` proposals; the first freelancer is approved on every job."""
+    uids = {"client": f"sql-{label}-client", "freelancer": f"sql-{label}-freelancer-0"}
+    db.execute(insert(User), [{"firebase_uid": uids["client"], "name": "Client", "email": f"{uids['client']}@example.com", "role": "client"}] + [
+        {"firebase_uid": f"sql-{label}-freelancer-{i}", "name": f"Freelancer {i}", "email": f"sql-{label}-freelancer-{i}@example.com", "role": "freelancer"}
+        for i in range(proposals_per_job)
+    ])
+    users = {uid: user_id for user_id, uid in db.query(User.id, User.firebase_uid).filter(User.firebase_uid.like(f"sql-{label}-%"))}
+    client_id = users[uids["client"]]
+    freelancer_ids = [users[f"sql-{label}-freelancer-{i}"] for i in range(proposals_per_job)]
+    db.execute(insert(Job), [
+        {"title": f"Job {i}", "description": "Check the statement count.", "tech_stack": "Python, React", "timeline": "2 weeks", "budget": 500.0, "client_id": client_id, "is_open": True}
+        for i in range(jobs)
+    ])
+    job_ids = [job_id for (job_id,) in db.query(Job.id).filter(Job.client_id == client_id)]
+    db.execute(insert(Proposal), [
+        {"job_id": job_id, "freelancer_id": freelancer_id, "message": "I can help.", "status": "approved" if i == 0 else "pending"}
+        for job_id in job_ids
+        for i, freelancer_id in enumerate(freelancer_ids)
+    ])
+    db.commit()
+    return uids
+
+
+async def run(sizes):
+    db = SessionLocal()
+    try:
+        warmup = seed_size(db, "warmup", 2, 2)
+        seeded = {f"{jobs}x{per_job}": seed_size(db, f"{jobs}x{per_job}", jobs, per_job) for jobs, per_job in sizes}
+    finally:
+        db.close()
+
+    counts = {path: {} for path, _ in ENDPOINTS}
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://check", timeout=120) as client:
+        for path, role in ENDPOINTS:
+            # One-time work (first query on a connection, cache tables) stays out of the counts
+            await client.get(path, headers=loadtest.auth(warmup[role]))
+        for label, uids in seeded.items():
+            for path, role in ENDPOINTS:
+                response = await client.get(path, headers=loadtest.auth(uids[role]))
+                response.raise_for_status()
+                counts[path][label] = int(response.headers[SQL_STATEMENTS_HEADER.decode()])
+    return counts
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description="Fail if a dashboard endpoint's SQL statement count grows with its data")
+    parser.add_argument("--sizes", default="1x1,10x5,100x20", help="comma-separated JOBSxPROPOSALS_PER_JOB sizes")
+    parser.add_argument("--read-replica", action="store_true", help="route reads through DATABASE_READ_URL (the same SQLite file)")
+    args = parser.parse_args()
+
+    sizes = [tuple(int(part) for part in size.split("x")) for size in args.sizes.split(",")]
+    loadtest.install_fake_verifier(0)
+    counts = asyncio.run(run(sizes))
+    failures = [path for path, by_size in counts.items() if len(set(by_size.values())) > 1]
+    print(json.dumps({
+        "benchmark": "check_sql_counts",
+        "db_mode": os.getenv("DB_MODE", "sync"),
+        "read_replica": bool(DATABASE_READ_URL),
+        "statements": counts,
+        "failures": failures,
+    }, indent=2))
+    if failures:
+        print(f"statement count grows with the data: {', '.join(failures)}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main_cli()
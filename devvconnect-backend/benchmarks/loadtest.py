@@ -0,0 +1,351 @@
+# File: devvconnect-backend/benchmarks/loadtest.py
+# Offline load test for every API endpoint.
+#
+# Seeds a synthetic dataset (users, jobs, proposals) into a throwaway SQLite database, swaps
+# the Firebase verifier for a fake one with configurable latency (get_current_user itself,
+# the principal cache and the auth executor stay in the path), then drives the ASGI app
+# in-process with httpx and N concurrent workers, one endpoint at a time. Reports p50, p95,
+# p99 and requests/second per endpoint as JSON, so runs can be diffed across commits.
+#
+#   cd devvconnect-backend
+#   pip install -r benchmarks/requirements.txt
+#   python benchmarks/loadtest.py --scale 1 --concurrency 16 --duration 5 --output before.json
+#   python benchmarks/loadtest.py --only freelancer_jobs,users_me --verify-latency-ms 50
+#   python benchmarks/loadtest.py --output after.json --compare before.json
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{tempfile.mkdtemp()}/loadtest.db")
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+os.environ.setdefault("LOG_STREAM", "stderr")  # keep stdout clean for the JSON report
+os.environ.setdefault("RATE_LIMIT_ENABLED", "0")  # measure the app, not the per-user limits
+# httpx's ASGITransport returns once the body is complete, so events_stream ends each stream
+# right after its "ready" event: it measures opening a stream (ticket, subscribe, first event)
+os.environ.setdefault("EVENTS_STREAM_MAX_SECONDS", "0")
+
+import httpx  # noqa: E402
+
+import main  # noqa: E402
+from database import SessionLocal  # noqa: E402
+from stream_tickets import issue_stream_ticket  # noqa: E402
+from models import Job, Proposal, User  # noqa: E402
+from principal_cache import principal_cache  # noqa: E402
+from recommendations import warm_recommendation_index  # noqa: E402
+from routes import auth as auth_routes  # noqa: E402
+from routes import users as users_routes  # noqa: E402
+from synthetic import TECH, fake_job_text, seed_jobs, seed_proposals, seed_users  # noqa: E402
+
+# Dataset size at --scale 1
+BASE_CLIENTS = 200
+BASE_FREELANCERS = 1000
+BASE_JOBS = 10_000
+PROPOSALS_PER_JOB = 3
+JOBS_PER_BATCH = 20  # client_jobs_batch
+TICKETS_PER_REFILL = 100  # events_stream
+
+
+def percentile(ordered, pct):
+    if not ordered:
+        return None
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+class Dataset:
+    """What the scenarios need to build valid requests: uids, ids and which pairs already exist."""
+
+    def __init__(self, db):
+        users = db.query(User.id, User.firebase_uid, User.role).filter(User.firebase_uid.like("bench-%")).all()
+        self.client_uids = [u.firebase_uid for u in users if u.role == "client"]
+        self.freelancer_uids = [u.firebase_uid for u in users if u.role == "freelancer"]
+        self.freelancer_id_by_uid = {u.firebase_uid: u.id for u in users if u.role == "freelancer"}
+        client_uid_by_id = {u.id: u.firebase_uid for u in users if u.role == "client"}
+        self.open_job_ids = [job_id for (job_id,) in db.query(Job.id).filter(Job.is_open == True).all()]
+        self.applied = set(db.query(Proposal.freelancer_id, Proposal.job_id).all())
+        pending = (
+            db.query(Proposal.id, Proposal.job_id, Job.client_id)
+            .join(Job, Job.id == Proposal.job_id)
+            .filter(Proposal.status == "pending")
+            .all()
+        )
+        # Even jobs feed client_approve_proposal, odd ones client_review, so neither decides a
+        # proposal the other already has
+        self.pending = [(proposal_id, client_uid_by_id[client_id]) for proposal_id, job_id, client_id in pending if client_id in client_uid_by_id and job_id % 2 == 0]
+        self.reviewable = {}  # job_id -> (client_uid, [pending proposal ids])
+        for proposal_id, job_id, client_id in pending:
+            if client_id in client_uid_by_id and job_id % 2 == 1:
+                self.reviewable.setdefault(job_id, (client_uid_by_id[client_id], []))[1].append(proposal_id)
+        self.new_users = 0
+        self.tickets = []
+
+def auth(uid):
+    return {"Authorization": f"Bearer {uid}"}
+
+
+# Each scenario returns (method, path, headers, json_body) for one request
+def _get(path, uid=None):
+    return "GET", path, auth(uid) if uid else {}, None
+
+
+def _post(path, uid):
+    return "POST", path, auth(uid), None
+
+
+def _unapplied_pair(data: Dataset, rng: random.Random):
+    for _ in range(100):
+        uid = rng.choice(data.freelancer_uids)
+        job_id = rng.choice(data.open_job_ids)
+        pair = (data.freelancer_id_by_uid[uid], job_id)
+        if pair not in data.applied:
+            data.applied.add(pair)
+            return uid, job_id
+    raise RuntimeError("could not find a job the sampled freelancers haven't applied to")
+
+
+def scenario_apply(data: Dataset, rng: random.Random):
+    uid, job_id = _unapplied_pair(data, rng)
+    return "POST", f"/freelancer/apply/{job_id}", auth(uid), None
+
+
+def scenario_create_proposal(data: Dataset, rng: random.Random):
+    uid, job_id = _unapplied_pair(data, rng)
+    body = {"job_id": job_id, "freelancer_id": data.freelancer_id_by_uid[uid], "cover_letter": "I have shipped this before."}
+    return "POST", "/proposals/proposals", auth(uid), body
+
+
+def scenario_approve(data: Dataset, rng: random.Random):
+    if not data.pending:
+        raise RuntimeError("ran out of pending proposals to approve; lower --duration or raise --scale")
+    proposal_id, client_uid = data.pending.pop(rng.randrange(len(data.pending)))
+    return "POST", f"/client/proposals/{proposal_id}/approve", auth(client_uid), None
+
+
+def scenario_review(data: Dataset, rng: random.Random):
+    if not data.reviewable:
+        raise RuntimeError("ran out of jobs with pending proposals to review; lower --duration or raise --scale")
+    job_id = rng.choice(list(data.reviewable))
+    client_uid, proposal_ids = data.reviewable.pop(job_id)
+    decisions = [{"proposal_id": proposal_id, "status": "rejected"} for proposal_id in proposal_ids]
+    decisions[0]["status"] = "approved"
+    # Every decision is explicit and the job stays open, so freelancer_apply can still pick it
+    body = {"decisions": decisions, "reject_pending": False, "close_job": False}
+    return "POST", f"/client/jobs/{job_id}/review", auth(client_uid), body
+
+
+def _job_body(rng: random.Random):
+    title, description, tech_stack = fake_job_text(rng)
+    return {"title": title, "description": description, "tech_stack": tech_stack, "budget": 500, "timeline": "2 weeks"}
+
+
+def scenario_create_job(data: Dataset, rng: random.Random):
+    return "POST", "/client/jobs", auth(rng.choice(data.client_uids)), _job_body(rng)
+
+
+def scenario_create_jobs_batch(data: Dataset, rng: random.Random):
+    body = [_job_body(rng) for _ in range(JOBS_PER_BATCH)]
+    return "POST", "/client/jobs/batch", auth(rng.choice(data.client_uids)), body
+
+
+def scenario_create_user(data: Dataset, rng: random.Random):
+    data.new_users += 1
+    uid = f"loadtest-user-{data.new_users}"
+    body = {"firebase_uid": uid, "name": f"New user {data.new_users}", "email": f"{uid}@example.com", "role": rng.choice(["client", "freelancer"])}
+    return "POST", "/users/", {}, body
+
+
+def scenario_events_stream(data: Dataset, rng: random.Random):
+    # Tickets are issued here, outside the timed request, a batch at a time
+    if not data.tickets:
+        db = SessionLocal()
+        try:
+            user_ids = rng.sample(list(data.freelancer_id_by_uid.values()), min(TICKETS_PER_REFILL, len(data.freelancer_id_by_uid)))
+            data.tickets = [issue_stream_ticket(db, user_id) for user_id in user_ids]
+        finally:
+            db.close()
+    return "GET", f"/events?ticket={data.tickets.pop()}", {}, None
+
+
+SCENARIOS = {
+    "root": lambda d, r: _get("/"),
+    "jobs_list": lambda d, r: _get("/jobs?limit=50"),
+    "jobs_list_filtered": lambda d, r: _get(f"/jobs?limit=50&is_open=true&tags={r.choice(TECH)}"),
+    "jobs_search": lambda d, r: _get(f"/jobs/search?q={r.choice(['python', 'react dashboard', 'payment', 'kubernetes'])}"),
+    "users_me": lambda d, r: _get("/users/me", r.choice(d.freelancer_uids)),
+    "users_by_uid": lambda d, r: _get(f"/users/{r.choice(d.client_uids)}", r.choice(d.freelancer_uids)),
+    "freelancer_jobs": lambda d, r: _get("/freelancer/jobs?limit=50", r.choice(d.freelancer_uids)),
+    "freelancer_approved_jobs": lambda d, r: _get("/freelancer/approved-jobs", r.choice(d.freelancer_uids)),
+    "freelancer_recommended_jobs": lambda d, r: _get("/freelancer/recommended-jobs?limit=20", r.choice(d.freelancer_uids)),
+    "proposals_approved_jobs": lambda d, r: _get("/proposals/freelancer/approved-jobs", r.choice(d.freelancer_uids)),
+    "client_jobs": lambda d, r: _get("/client/jobs", r.choice(d.client_uids)),
+    "client_jobs_with_proposals": lambda d, r: _get("/client/jobs-with-proposals", r.choice(d.client_uids)),
+    "client_stats": lambda d, r: _get("/client/stats", r.choice(d.client_uids)),
+    "client_export": lambda d, r: _get("/client/export?format=ndjson", r.choice(d.client_uids)),
+    "events_ticket": lambda d, r: _post("/events/ticket", r.choice(d.freelancer_uids)),
+    "events_stream": scenario_events_stream,
+    "freelancer_apply": scenario_apply,
+    "proposals_create": scenario_create_proposal,
+    "client_approve_proposal": scenario_approve,
+    "client_review": scenario_review,
+    "client_create_job": scenario_create_job,
+    "client_create_jobs_batch": scenario_create_jobs_batch,
+    "users_create": scenario_create_user,
+}
+
+
+async def run_endpoint(client, name, data, concurrency, duration, max_requests, seed):
+    build = SCENARIOS[name]
+    rng = random.Random(seed)
+    latencies = []
+    statuses = {}
+    deadline = time.perf_counter() + duration
+    issued = 0
+
+    async def worker():
+        nonlocal issued
+        while time.perf_counter() < deadline and (not max_requests or issued < max_requests):
+            issued += 1
+            method, path, headers, body = build(data, rng)
+            started = time.perf_counter()
+            response = await client.request(method, path, headers=headers, json=body)
+            latencies.append((time.perf_counter() - started) * 1000)
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    errors = sum(count for status, count in statuses.items() if status >= 400)
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "statuses": {str(status): count for status, count in sorted(statuses.items())},
+        "rps": round(len(latencies) / elapsed, 1) if elapsed else None,
+        "p50_ms": round(percentile(latencies, 50), 2) if latencies else None,
+        "p95_ms": round(percentile(latencies, 95), 2) if latencies else None,
+        "p99_ms": round(percentile(latencies, 99), 2) if latencies else None,
+        "max_ms": round(latencies[-1], 2) if latencies else None,
+    }
+
+
+def install_fake_verifier(latency_ms):
+    def fake_verify(token, check_revoked=False):
+        if latency_ms:
+            time.sleep(latency_ms / 1000)  # blocking, like the real network-bound revocation check
+        return {"uid": token, "exp": time.time() + 3600}
+
+    auth_routes.verify_id_token = fake_verify
+    users_routes.verify_id_token = fake_verify
+
+
+def seed(scale):
+    db = SessionLocal()
+    try:
+        started = time.perf_counter()
+        _, freelancer_ids = seed_users(db, clients=max(1, int(BASE_CLIENTS * scale)), freelancers=max(2, int(BASE_FREELANCERS * scale)))
+        client_ids = [user_id for (user_id,) in db.query(User.id).filter(User.role == "client").all()]
+        seed_jobs(db, max(1, int(BASE_JOBS * scale)), client_ids)
+        seed_proposals(db, freelancer_ids, per_job=PROPOSALS_PER_JOB)
+        seed_seconds = time.perf_counter() - started
+        counts = {"users": db.query(User).count(), "jobs": db.query(Job).count(), "proposals": db.query(Proposal).count()}
+        return Dataset(db), counts, round(seed_seconds, 1)
+    finally:
+        db.close()
+
+
+def compare(before: dict, after: dict) -> dict:
+    """Per-endpoint change in rps and p99 (percent) between two reports."""
+    deltas = {"against_revision": before.get("revision"), "endpoints": {}}
+    for name, new in after["endpoints"].items():
+        old = before.get("endpoints", {}).get(name)
+        if not old:
+            continue
+        deltas["endpoints"][name] = {
+            key: round((new[key] - old[key]) / old[key] * 100, 1) if old.get(key) and new.get(key) is not None else None
+            for key in ("rps", "p50_ms", "p99_ms")
+        }
+    return deltas
+
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR, capture_output=True, text=True, check=True).stdout.strip()
+    except Exception:
+        return None
+
+
+async def run(args, data):
+    names = args.only.split(",") if args.only else list(SCENARIOS)
+    unknown = [name for name in names if name not in SCENARIOS]
+    if unknown:
+        raise SystemExit(f"unknown endpoint(s): {', '.join(unknown)}; choose from {', '.join(SCENARIOS)}")
+    results = {}
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://loadtest", timeout=60) as client:
+        for i, name in enumerate(names):
+            if args.warmup:
+                await run_endpoint(client, name, data, args.concurrency, args.warmup, 0, seed=1000 + i)
+            results[name] = await run_endpoint(client, name, data, args.concurrency, args.duration, args.max_requests, seed=i)
+            print(f"{name}: {results[name]['rps']} req/s, p99 {results[name]['p99_ms']} ms", file=sys.stderr)
+    return results
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description="Offline load test for the DevvConnect API")
+    parser.add_argument("--scale", type=float, default=1.0, help=f"dataset multiplier ({BASE_JOBS} jobs, {BASE_FREELANCERS} freelancers at 1.0)")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=5.0, help="seconds per endpoint")
+    parser.add_argument("--warmup", type=float, default=1.0, help="seconds of unmeasured traffic per endpoint")
+    parser.add_argument("--max-requests", type=int, default=0, help="stop an endpoint after this many requests (0 = no limit)")
+    parser.add_argument("--verify-latency-ms", type=float, default=0.0, help="latency of the fake token verifier")
+    parser.add_argument("--no-principal-cache", action="store_true", help="verify the token on every request")
+    parser.add_argument("--only", help="comma-separated endpoint names")
+    parser.add_argument("--output", help="also write the JSON report to this file")
+    parser.add_argument("--compare", help="earlier report to diff against (adds per-endpoint deltas)")
+    args = parser.parse_args()
+
+    install_fake_verifier(args.verify_latency_ms)
+    if args.no_principal_cache:
+        principal_cache.max_entries = 0
+    data, counts, seed_seconds = seed(args.scale)
+    warm_recommendation_index()  # the app does this in a startup thread; ASGITransport skips startup events
+
+    results = asyncio.run(run(args, data))
+    report = {
+        "benchmark": "loadtest",
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "config": {
+            "scale": args.scale,
+            "concurrency": args.concurrency,
+            "duration_s": args.duration,
+            "verify_latency_ms": args.verify_latency_ms,
+            "principal_cache": not args.no_principal_cache,
+        },
+        "dataset": {**counts, "seed_seconds": seed_seconds},
+        "endpoints": results,
+    }
+    if args.compare:
+        with open(args.compare) as f:
+            report["comparison"] = compare(json.load(f), report)
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    print(text)
+
+
+if __name__ == "__main__":
+    main_cli()
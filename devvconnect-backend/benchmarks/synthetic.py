@@ -0,0 +1,97 @@
+# File: devvconnect-backend/benchmarks/synthetic.py
+# Synthetic data for the benchmarks: deterministic (seeded RNG) so runs are comparable.
+import random
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert
+
+from models import Job, Proposal, User
+
+TECH = [
+    "React", "Python", "FastAPI", "Django", "Node.js", "TypeScript", "Go", "Rust", "PostgreSQL",
+    "SQLite", "AWS", "Docker", "Kubernetes", "Flutter", "Swift", "Kotlin", "Vue", "Angular",
+    "GraphQL", "Redis", "Spark", "Pandas", "TensorFlow", "PyTorch", "Figma", "Tailwind",
+]
+NOUNS = [
+    "dashboard", "marketplace", "mobile app", "API", "landing page", "data pipeline", "chatbot",
+    "payment integration", "admin panel", "analytics report", "scraper", "design system",
+    "recommendation engine", "booking system", "CRM integration", "migration", "test suite",
+]
+VERBS = ["Build", "Fix", "Redesign", "Optimize", "Migrate", "Integrate", "Prototype", "Maintain"]
+FILLER = [
+    "looking", "experienced", "developer", "long", "term", "project", "remote", "startup",
+    "deadline", "weekly", "calls", "documentation", "clean", "code", "scalable", "secure",
+    "performance", "team", "agile", "sprint", "deliverables", "milestones", "budget", "flexible",
+]
+
+BATCH_SIZE = 5000
+
+
+def fake_job_text(rng: random.Random):
+    stack = rng.sample(TECH, rng.randint(1, 4))
+    noun = rng.choice(NOUNS)
+    title = f"{rng.choice(VERBS)} {noun} with {stack[0]}"
+    words = [rng.choice(FILLER) for _ in range(rng.randint(15, 40))]
+    description = f"We need help with a {noun}. " + " ".join(words) + f". Stack: {', '.join(stack)}."
+    return title, description, ", ".join(stack)
+
+
+def seed_users(db, clients: int, freelancers: int, prefix: str = "bench"):
+    """Insert users and return (client_ids, freelancer_ids). Firebase uid == f"{prefix}-client-{i}" etc."""
+    rows = [
+        {"firebase_uid": f"{prefix}-client-{i}", "name": f"Client {i}", "email": f"{prefix}-client-{i}@example.com", "role": "client"}
+        for i in range(clients)
+    ] + [
+        {"firebase_uid": f"{prefix}-freelancer-{i}", "name": f"Freelancer {i}", "email": f"{prefix}-freelancer-{i}@example.com", "role": "freelancer"}
+        for i in range(freelancers)
+    ]
+    for start in range(0, len(rows), BATCH_SIZE):
+        db.execute(insert(User), rows[start:start + BATCH_SIZE])
+    db.commit()
+    users = db.query(User.id, User.role).filter(User.firebase_uid.like(f"{prefix}-%")).order_by(User.id).all()
+    return [u.id for u in users if u.role == "client"], [u.id for u in users if u.role == "freelancer"]
+
+
+def seed_jobs(db, count: int, client_ids, seed: int = 42, open_ratio: float = 0.8):
+    rng = random.Random(seed)
+    started = datetime(2024, 1, 1)
+    batch = []
+    for i in range(count):
+        title, description, tech_stack = fake_job_text(rng)
+        batch.append({
+            "title": title,
+            "description": description,
+            "tech_stack": tech_stack,
+            "timeline": f"{rng.randint(1, 12)} weeks",
+            "budget": float(rng.randint(50, 20000)),
+            "client_id": rng.choice(client_ids),
+            "is_open": rng.random() < open_ratio,
+            "created_at": started + timedelta(seconds=i * 30),
+        })
+        if len(batch) >= BATCH_SIZE:
+            db.execute(insert(Job), batch)
+            batch = []
+    if batch:
+        db.execute(insert(Job), batch)
+    db.commit()
+
+
+def seed_proposals(db, freelancer_ids, per_job: int = 3, seed: int = 43, approved_ratio: float = 0.1):
+    """Give every job up to `per_job` proposals from distinct freelancers; about `approved_ratio` are approved."""
+    rng = random.Random(seed)
+    job_ids = [job_id for (job_id,) in db.query(Job.id).order_by(Job.id).all()]
+    batch = []
+    for job_id in job_ids:
+        for freelancer_id in rng.sample(freelancer_ids, min(per_job, len(freelancer_ids))):
+            batch.append({
+                "job_id": job_id,
+                "freelancer_id": freelancer_id,
+                "message": "I can help with this.",
+                "status": "approved" if rng.random() < approved_ratio else "pending",
+            })
+            if len(batch) >= BATCH_SIZE:
+                db.execute(insert(Proposal), batch)
+                batch = []
+    if batch:
+        db.execute(insert(Proposal), batch)
+    db.commit()
@@ -0,0 +1,199 @@
+# File: devvconnect-backend/client_stats.py
+# Client dashboard analytics (GET /client/stats) from a per-client daily summary table.
+#
+# client_daily_stats holds one row per (client, UTC day) with what happened that day: jobs
+# posted and their total budget, jobs closed, proposals received, approved and rejected. The
+# writes that cause them add to the row in their own transaction with one upsert
+#   INSERT ... ON CONFLICT (client_id, day) DO UPDATE SET jobs_posted = jobs_posted + excluded.jobs_posted, ...
+# so concurrent writes never lose an increment, and the endpoint reads the client's rows (one
+# per day with activity) instead of aggregating every job and proposal. Totals, open vs. closed
+# jobs, proposals per job and the approval rate are derived from those rows; the daily series
+# covers the last `days` days.
+#
+# rebuild_client_stats() recomputes the table from jobs and proposals, dating each event by
+# jobs.created_at / closed_at and proposals.created_at / decided_at. Rows written before those
+# columns existed are dated by their job's created_at. It runs at startup when the table is
+# empty but jobs exist, and from the command line (best while writes are quiet: increments
+# committed during the rebuild can be lost):
+#
+#   python client_stats.py rebuild
+import logging
+import sys
+from datetime import date, datetime, timedelta
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy import delete, func, insert, inspect, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from database import DATABASE_DIALECT, SessionLocal, engine
+from models import ClientDailyStats, Job, Proposal
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_STATS_DAYS = 30
+MAX_STATS_DAYS = 366
+
+STAT_COLUMNS = (
+    "jobs_posted",
+    "budget_posted",
+    "jobs_closed",
+    "proposals_received",
+    "proposals_approved",
+    "proposals_rejected",
+)
+
+# Event timestamps the rebuild dates rows by, added to existing tables by ensure_client_stats()
+TIMESTAMP_COLUMNS = ((Job.__table__, "closed_at"), (Proposal.__table__, "created_at"), (Proposal.__table__, "decided_at"))
+
+_UPSERT_INSERTS = {"sqlite": sqlite.insert, "postgresql": postgresql.insert}
+
+
+def utc_today() -> date:
+    return datetime.utcnow().date()
+
+
+def record_client_activity(db: Session, client_id: int, day: Optional[date] = None, **deltas):
+    """Add `deltas` (STAT_COLUMNS names) to the client's row for `day` (default today, UTC).
+    Runs in the caller's transaction."""
+    deltas = {name: value for name, value in deltas.items() if value}
+    if not deltas or client_id is None:
+        return
+    table = ClientDailyStats.__table__
+    key = {"client_id": client_id, "day": day or utc_today()}
+    row = {**key, **dict.fromkeys(STAT_COLUMNS, 0), **deltas}
+
+    dialect_insert = _UPSERT_INSERTS.get(DATABASE_DIALECT)
+    if dialect_insert is not None:
+        statement = dialect_insert(table).values(**row)
+        db.execute(statement.on_conflict_do_update(
+            index_elements=["client_id", "day"],
+            set_={name: table.c[name] + statement.excluded[name] for name in deltas},
+        ))
+        return
+    # Without ON CONFLICT: update the day's row, or create it
+    updated = db.execute(
+        update(table)
+        .where(table.c.client_id == key["client_id"], table.c.day == key["day"])
+        .values({name: table.c[name] + value for name, value in deltas.items()})
+    ).rowcount
+    if not updated:
+        db.execute(insert(table).values(**row))
+
+
+def _ratio(numerator, denominator) -> Optional[float]:
+    return round(numerator / denominator, 4) if denominator else None
+
+
+def client_stats(db: Session, client_id: int, days: int = DEFAULT_STATS_DAYS) -> dict:
+    """Totals over the client's whole history plus one entry per day for the last `days` days
+    (zeros on quiet days), from the summary rows alone."""
+    columns = [getattr(ClientDailyStats, name) for name in STAT_COLUMNS]
+    rows = db.execute(select(ClientDailyStats.day, *columns).where(ClientDailyStats.client_id == client_id)).all()
+
+    totals = {name: sum(getattr(row, name) for row in rows) for name in STAT_COLUMNS}
+    totals.update(
+        open_jobs=totals["jobs_posted"] - totals["jobs_closed"],
+        proposals_per_job=_ratio(totals["proposals_received"], totals["jobs_posted"]),
+        approval_rate=_ratio(totals["proposals_approved"], totals["proposals_approved"] + totals["proposals_rejected"]),
+    )
+
+    today = utc_today()
+    first_day = today - timedelta(days=days - 1)
+    by_day = {row.day: row for row in rows if row.day >= first_day}
+    daily = []
+    for offset in range(days):
+        day = first_day + timedelta(days=offset)
+        row = by_day.get(day)
+        daily.append({"day": day, **{name: getattr(row, name) if row is not None else 0 for name in STAT_COLUMNS}})
+    return {"totals": totals, "daily": daily}
+
+
+def _as_date(value) -> date:
+    # func.date() gives a string on SQLite and a date on PostgreSQL
+    return value if isinstance(value, date) else date.fromisoformat(str(value)[:10])
+
+
+def rebuild_client_stats(db: Session) -> int:
+    """Recompute client_daily_stats from jobs and proposals and commit. Returns the number of
+    (client, day) rows written."""
+    summary: Dict[Tuple[int, date], Dict[str, float]] = {}
+
+    def add(rows, *names):
+        for client_id, day, *amounts in rows:
+            if client_id is None or day is None:
+                continue
+            row = summary.setdefault((client_id, _as_date(day)), dict.fromkeys(STAT_COLUMNS, 0))
+            for name, amount in zip(names, amounts):
+                row[name] += amount or 0
+
+    posted = func.date(Job.created_at)
+    add(
+        db.execute(select(Job.client_id, posted, func.count(), func.sum(Job.budget)).group_by(Job.client_id, posted)),
+        "jobs_posted", "budget_posted",
+    )
+    closed = func.date(func.coalesce(Job.closed_at, Job.created_at))
+    add(
+        db.execute(select(Job.client_id, closed, func.count()).where(Job.is_open == False).group_by(Job.client_id, closed)),
+        "jobs_closed",
+    )
+    received = func.date(func.coalesce(Proposal.created_at, Job.created_at))
+    add(
+        db.execute(select(Job.client_id, received, func.count()).join(Job, Job.id == Proposal.job_id).group_by(Job.client_id, received)),
+        "proposals_received",
+    )
+    decided = func.date(func.coalesce(Proposal.decided_at, Proposal.created_at, Job.created_at))
+    for status, name in (("approved", "proposals_approved"), ("rejected", "proposals_rejected")):
+        add(
+            db.execute(
+                select(Job.client_id, decided, func.count())
+                .join(Job, Job.id == Proposal.job_id)
+                .where(Proposal.status == status)
+                .group_by(Job.client_id, decided)
+            ),
+            name,
+        )
+
+    db.execute(delete(ClientDailyStats))
+    if summary:
+        db.execute(
+            insert(ClientDailyStats),
+            [{"client_id": client_id, "day": day, **values} for (client_id, day), values in summary.items()],
+        )
+    db.commit()
+    return len(summary)
+
+
+def ensure_timestamp_columns():
+    # create_missing_schema() only creates whole tables
+    inspector = inspect(engine)
+    for table, name in TIMESTAMP_COLUMNS:
+        if name not in {column["name"] for column in inspector.get_columns(table.name)}:
+            with engine.begin() as conn:
+                conn.exec_driver_sql(f"ALTER TABLE {table.name} ADD COLUMN {name} {table.c[name].type.compile(engine.dialect)}")
+            logger.info("Added %s.%s", table.name, name)
+
+
+def ensure_client_stats():
+    """Add the event timestamp columns to existing tables and fill client_daily_stats if it is
+    empty while jobs exist. Safe to call on every startup."""
+    ensure_timestamp_columns()
+    with SessionLocal() as db:
+        if db.execute(select(ClientDailyStats.client_id).limit(1)).first() is not None:
+            return
+        if db.execute(select(Job.id).limit(1)).first() is None:
+            return
+        logger.info("Building client_daily_stats from existing jobs and proposals")
+        rebuild_client_stats(db)
+
+
+if __name__ == "__main__":
+    if sys.argv[1:] != ["rebuild"]:
+        print("usage: python client_stats.py rebuild")
+        sys.exit(2)
+    from database import create_missing_schema
+
+    create_missing_schema()
+    ensure_timestamp_columns()
+    with SessionLocal() as session:
+        print(f"Rebuilt client_daily_stats: {rebuild_client_stats(session)} client-days.")
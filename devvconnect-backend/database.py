@@ -1,10 +1,17 @@
 	
+import logging
 import os
-from sqlalchemy import create_engine
+import threading
+import time
+from typing import Any, Callable, Protocol
+from fastapi import Depends, Request
+from sqlalchemy import create_engine, event, make_url
+from sqlalchemy.exc import InterfaceError, OperationalError
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, Session # Session is used by get_db type hint
-# fastapi.Depends is not used in this file directly, but often associated with get_db usage in routes
-# from fastapi import Depends 
+from starlette.concurrency import run_in_threadpool
+
+logger = logging.getLogger(__name__)
 
 # Get the database URL from the environment variable
 DATABASE_URL_FROM_ENV = os.getenv("DATABASE_URL")
@@ -19,18 +26,19 @@ if DATABASE_URL_FROM_ENV:
     if SQLALCHEMY_DATABASE_URL.startswith("postgres://"):
         # Replace 'postgres://' with 'postgresql://' for SQLAlchemy compatibility
         SQLALCHEMY_DATABASE_URL = SQLALCHEMY_DATABASE_URL.replace("postgres://", "postgresql://", 1)
-        print(f"INFO: Using PostgreSQL database. Connection URL (modified for SQLAlchemy): {SQLALCHEMY_DATABASE_URL}")
+        logger.info("Using PostgreSQL database: %s", make_url(SQLALCHEMY_DATABASE_URL).render_as_string(hide_password=True))
         # PostgreSQL does not need 'check_same_thread': False
     elif SQLALCHEMY_DATABASE_URL.startswith("sqlite:///"):
-        print(f"INFO: Using SQLite database from DATABASE_URL: {SQLALCHEMY_DATABASE_URL}")
+        logger.info("Using SQLite database from DATABASE_URL: %s", SQLALCHEMY_DATABASE_URL)
         connect_args = {"check_same_thread": False} # For SQLite only
     else:
         # For other database types, you might need specific handling or connect_args
-        print(f"INFO: Using database from DATABASE_URL: {SQLALCHEMY_DATABASE_URL}")
+        logger.info("Using database from DATABASE_URL: %s", make_url(SQLALCHEMY_DATABASE_URL).render_as_string(hide_password=True))
 else:
-    print("WARNING: DATABASE_URL environment variable not found.")
-    print("         Falling back to local SQLite database: sqlite:///./dev.db")
-    print("         Ensure DATABASE_URL is set in your production environment (e.g., on Render).")
+    logger.warning(
+        "DATABASE_URL environment variable not found. Falling back to local SQLite database: sqlite:///./dev.db. "
+        "Ensure DATABASE_URL is set in your production environment (e.g., on Render)."
+    )
     SQLALCHEMY_DATABASE_URL = "sqlite:///./dev.db"
     connect_args = {"check_same_thread": False} # For SQLite only
 
@@ -38,12 +46,102 @@ else:
 if not SQLALCHEMY_DATABASE_URL:
     # This case should ideally not be reached if the fallback logic is sound,
     # but it's a good final check.
-    print("CRITICAL ERROR: SQLALCHEMY_DATABASE_URL is not configured. Application cannot start.")
+    logger.critical("SQLALCHEMY_DATABASE_URL is not configured. Application cannot start.")
     raise ValueError("SQLALCHEMY_DATABASE_URL is not configured. Set the DATABASE_URL environment variable.")
 
+# --- Engine tuning (all optional, from the environment) ---
+# Pool: DB_POOL_SIZE connections are kept open, up to DB_MAX_OVERFLOW more are opened under
+# load, and a request waits DB_POOL_TIMEOUT seconds for one before failing. DB_POOL_RECYCLE
+# replaces connections older than that many seconds (-1 = never); DB_POOL_PRE_PING tests a
+# connection before handing it out, so one the server (or Render's proxy) closed while idle is
+# replaced instead of failing the request. DB_STATEMENT_TIMEOUT_MS cancels statements that run
+# longer (PostgreSQL; 0 = no limit).
+_url = make_url(SQLALCHEMY_DATABASE_URL)
+IS_SQLITE = _url.get_backend_name() == "sqlite"
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "-1"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "0" if IS_SQLITE else "1") != "0"
+DB_STATEMENT_TIMEOUT_MS = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "0"))
+
+# SQLite pragmas, applied to every new connection. WAL lets readers run while a writer
+# commits (the default rollback journal blocks them); synchronous=NORMAL is durable in WAL mode
+# except for the last transactions before a power loss; busy_timeout makes a writer wait for
+# the lock instead of failing with "database is locked". Set one to an empty string to keep
+# SQLite's default.
+SQLITE_PRAGMAS = {
+    "journal_mode": os.getenv("SQLITE_JOURNAL_MODE", "WAL"),
+    "synchronous": os.getenv("SQLITE_SYNCHRONOUS", "NORMAL"),
+    "busy_timeout": os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"),
+    "mmap_size": os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)),
+    "cache_size": os.getenv("SQLITE_CACHE_SIZE", "-65536"),  # negative = KiB, so 64 MiB per connection
+}
+
+engine_options = {}
+# In-memory SQLite gets a single-connection pool that takes no sizing arguments
+if not (IS_SQLITE and _url.database in (None, "", ":memory:")):
+    engine_options = {
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+    }
+if DB_STATEMENT_TIMEOUT_MS > 0 and _url.get_backend_name() != "postgresql":
+    logger.warning("DB_STATEMENT_TIMEOUT_MS is only applied on PostgreSQL; ignored for %s", _url.get_backend_name())
+
+
+def engine_connect_args(url, read_only: bool = False, for_async: bool = False) -> dict:
+    """connect_args for an engine on `url`: check_same_thread for SQLite, server settings
+    (statement timeout, read-only transactions) for PostgreSQL."""
+    backend = url.get_backend_name()
+    if backend == "sqlite":
+        return {"check_same_thread": False}
+    if backend != "postgresql":
+        return {}
+    settings = {}
+    if DB_STATEMENT_TIMEOUT_MS > 0:
+        settings["statement_timeout"] = str(DB_STATEMENT_TIMEOUT_MS)
+    if read_only:
+        settings["default_transaction_read_only"] = "on"
+    if not settings:
+        return {}
+    if for_async:
+        # asyncpg takes server settings directly instead of a libpq options string
+        return {"server_settings": settings}
+    return {"options": " ".join(f"-c {name}={value}" for name, value in settings.items())}
+
+
+connect_args = engine_connect_args(_url)
+
+
+def apply_sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in SQLITE_PRAGMAS.items():
+            if value != "":
+                cursor.execute(f"PRAGMA {name}={value}")
+    finally:
+        cursor.close()
+
+
+def apply_sqlite_read_only_pragmas(dbapi_connection, connection_record):
+    apply_sqlite_pragmas(dbapi_connection, connection_record)
+    cursor = dbapi_connection.cursor()
+    try:
+        cursor.execute("PRAGMA query_only=ON")
+    finally:
+        cursor.close()
+
+
 # Create the SQLAlchemy engine
 # The connect_args will be empty {} for PostgreSQL or populated for SQLite
-engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args=connect_args)
+engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args=connect_args, **engine_options)
+if IS_SQLITE:
+    event.listen(engine, "connect", apply_sqlite_pragmas)
+# "sqlite", "postgresql", ... - used where SQL has to differ per database (e.g. full-text search)
+DATABASE_DIALECT = engine.dialect.name
 
 # Create a SessionLocal class to generate database sessions
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
@@ -51,10 +149,240 @@ SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 # Base class for SQLAlchemy models
 Base = declarative_base()
 
-# Dependency to get a DB session in FastAPI routes
+# Dependency to get a DB session in scripts, background jobs and sync code
 def get_db():
     db: Session = SessionLocal()
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+# --- Sync / async mode for the route handlers ---
+# DB_MODE=sync (default): handlers' database work runs on FastAPI's threadpool with the
+#   blocking engine above, so concurrency per worker is capped by the pool size.
+# DB_MODE=async: an async engine (aiosqlite / asyncpg) on the same database; database I/O is
+#   awaited on the event loop and no threadpool thread is held per request.
+# Handlers are `async def` in both modes and do their database work through
+# `await db.run_sync(fn, *args)`, where fn receives a regular Session. That is AsyncSession's
+# own API; in sync mode ThreadedSession provides the same call backed by the threadpool, so the
+# same handler code (and the Query-based helpers it uses) runs in either mode. The blocking
+# engine stays in use in both modes for startup schema work, CLIs and background threads.
+DB_MODE = os.getenv("DB_MODE", "sync").lower()
+if DB_MODE not in ("sync", "async"):
+    raise ValueError(f"DB_MODE must be 'sync' or 'async', got '{DB_MODE}'")
+
+_ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "sqlite+pysqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+}
+
+def async_database_url(url):
+    parsed = make_url(url)
+    if parsed.drivername in _ASYNC_DRIVERS.values():
+        return parsed
+    if parsed.drivername not in _ASYNC_DRIVERS:
+        raise ValueError(f"DB_MODE=async has no async driver configured for '{parsed.drivername}'")
+    return parsed.set(drivername=_ASYNC_DRIVERS[parsed.drivername])
+
+async_engine = None
+AsyncSessionLocal = None
+if DB_MODE == "async":
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+    async_engine = create_async_engine(async_database_url(SQLALCHEMY_DATABASE_URL), connect_args=engine_connect_args(_url, for_async=True), **engine_options)
+    if IS_SQLITE:
+        event.listen(async_engine.sync_engine, "connect", apply_sqlite_pragmas)
+    AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False)
+    logger.info("DB_MODE=async: route handlers use %s", async_engine.dialect.driver)
+
+
+class SessionRunner(Protocol):
+    """What route handlers get from get_session: AsyncSession, or ThreadedSession in sync mode."""
+
+    async def run_sync(self, fn: Callable[..., Any], *args, **kwargs) -> Any: ...
+
+
+class ThreadedSession:
+    """Sync-mode stand-in for AsyncSession.run_sync: fn(session, ...) runs on the threadpool."""
+
+    def __init__(self, session: Session):
+        self.sync_session = session
+
+    @property
+    def info(self) -> dict:
+        return self.sync_session.info
+
+    async def run_sync(self, fn, *args, **kwargs):
+        return await run_in_threadpool(fn, self.sync_session, *args, **kwargs)
+
+    async def close(self):
+        await run_in_threadpool(self.sync_session.close)
+
+
+def _open_session(sync_factory, async_factory) -> SessionRunner:
+    return async_factory() if async_factory is not None else ThreadedSession(sync_factory())
+
+
+# Dependency used by the route handlers (see DB_MODE above)
+async def get_session(request: Request):
+    db = _open_session(SessionLocal, AsyncSessionLocal)
+    # Lets the after_commit hook below attribute this session's writes to the request's user
+    db.info["request_state"] = request.state
+    try:
+        yield db
+    finally:
+        await db.close()
+
+# --- Optional read replica ---
+# DATABASE_READ_URL points at a read-only copy of the primary: a streaming replica on
+# PostgreSQL or, for local testing, a copy of the SQLite file. GET handlers take their session
+# from get_read_session, which reads from the replica except
+#   * for READ_AFTER_WRITE_SECONDS after the same user committed a write, so users see their
+#     own changes despite replication lag (get_current_user records request.state.firebase_uid,
+#     the after_commit hook notes the write);
+#   * while the replica is unreachable: a connection error marks it down for
+#     READ_REPLICA_RETRY_SECONDS and the read is retried on the primary.
+# The replica connections are read-only (default_transaction_read_only / PRAGMA query_only).
+# Without DATABASE_READ_URL, get_read_session is simply the request's primary session.
+# Recent writers are tracked per worker process, like the caches.
+DATABASE_READ_URL = os.getenv("DATABASE_READ_URL")
+READ_AFTER_WRITE_SECONDS = float(os.getenv("READ_AFTER_WRITE_SECONDS", "5"))
+READ_REPLICA_RETRY_SECONDS = float(os.getenv("READ_REPLICA_RETRY_SECONDS", "30"))
+READ_AFTER_WRITE_MAX_USERS = 100_000
+
+read_engine = None
+ReadSessionLocal = None
+async_read_engine = None
+AsyncReadSessionLocal = None
+if DATABASE_READ_URL:
+    _read_url = make_url(DATABASE_READ_URL.replace("postgres://", "postgresql://", 1))
+    read_engine = create_engine(_read_url, connect_args=engine_connect_args(_read_url, read_only=True), **engine_options)
+    if _read_url.get_backend_name() == "sqlite":
+        event.listen(read_engine, "connect", apply_sqlite_read_only_pragmas)
+    ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
+    if DB_MODE == "async":
+        async_read_engine = create_async_engine(
+            async_database_url(_read_url),
+            connect_args=engine_connect_args(_read_url, read_only=True, for_async=True),
+            **engine_options,
+        )
+        if _read_url.get_backend_name() == "sqlite":
+            event.listen(async_read_engine.sync_engine, "connect", apply_sqlite_read_only_pragmas)
+        AsyncReadSessionLocal = async_sessionmaker(async_read_engine, autoflush=False)
+    logger.info("Read replica for GET handlers: %s", _read_url.render_as_string(hide_password=True))
+
+
+class ReadRouting:
+    """Recent writers and replica health for get_read_session."""
+
+    def __init__(self, window_seconds: float = READ_AFTER_WRITE_SECONDS, retry_seconds: float = READ_REPLICA_RETRY_SECONDS):
+        self.window_seconds = window_seconds
+        self.retry_seconds = retry_seconds
+        self._writes = {}  # firebase_uid -> monotonic time of the last committed write
+        self._down_until = 0.0
+        self._lock = threading.Lock()
+        self.replica_reads = 0
+        self.sticky_reads = 0
+        self.fallbacks = 0
+
+    def note_write(self, firebase_uid: str):
+        with self._lock:
+            if len(self._writes) >= READ_AFTER_WRITE_MAX_USERS:
+                self._prune()
+            self._writes[firebase_uid] = time.monotonic()
+
+    def wrote_recently(self, firebase_uid) -> bool:
+        if firebase_uid is None:
+            return False
+        written_at = self._writes.get(firebase_uid)
+        return written_at is not None and time.monotonic() - written_at < self.window_seconds
+
+    def replica_available(self) -> bool:
+        return time.monotonic() >= self._down_until
+
+    def mark_replica_down(self):
+        with self._lock:
+            self._down_until = time.monotonic() + self.retry_seconds
+            self.fallbacks += 1
+
+    def _prune(self):
+        cutoff = time.monotonic() - self.window_seconds
+        for uid in [uid for uid, written_at in self._writes.items() if written_at < cutoff]:
+            del self._writes[uid]
+
+    def stats(self) -> dict:
+        return {
+            "enabled": read_engine is not None,
+            "replica_reads": self.replica_reads,
+            "sticky_reads": self.sticky_reads,
+            "fallbacks": self.fallbacks,
+            "replica_down": not self.replica_available(),
+        }
+
+
+read_routing = ReadRouting()
+
+
+@event.listens_for(Session, "after_commit")
+def _note_committed_write(session):
+    request_state = session.info.get("request_state")
+    firebase_uid = getattr(request_state, "firebase_uid", None) if request_state is not None else None
+    if firebase_uid is not None and read_engine is not None:
+        read_routing.note_write(firebase_uid)
+
+
+class ReadSession:
+    """SessionRunner for GET handlers. Picks the replica or the primary on its first run_sync,
+    once get_current_user has identified the user."""
+
+    def __init__(self, request_state, primary: SessionRunner):
+        self._request_state = request_state
+        self._primary = primary
+        self._replica = None
+        self._decided = False
+
+    async def run_sync(self, fn, *args, **kwargs):
+        if not self._decided:
+            self._decided = True
+            if read_routing.wrote_recently(getattr(self._request_state, "firebase_uid", None)):
+                read_routing.sticky_reads += 1
+            elif read_routing.replica_available():
+                self._replica = _open_session(ReadSessionLocal, AsyncReadSessionLocal)
+                read_routing.replica_reads += 1
+        if self._replica is not None:
+            try:
+                return await self._replica.run_sync(fn, *args, **kwargs)
+            except (OperationalError, InterfaceError, OSError) as e:
+                # Reads are safe to repeat, so retry this one (and the rest of the request) on the primary
+                logger.warning("Read replica unavailable (%s); using the primary for %ss", type(e).__name__, read_routing.retry_seconds)
+                read_routing.mark_replica_down()
+                await self.close()
+        return await self._primary.run_sync(fn, *args, **kwargs)
+
+    async def close(self):
+        replica, self._replica = self._replica, None
+        if replica is not None:
+            await replica.close()
+
+
+# Dependency for read-only (GET) handlers; see "Optional read replica" above
+async def get_read_session(request: Request, primary: SessionRunner = Depends(get_session)):
+    if read_engine is None:
+        yield primary
+        return
+    db = ReadSession(request.state, primary)
+    try:
+        yield db
+    finally:
+        await db.close()
+
+# Create missing tables and indexes.
+# Base.metadata.create_all only creates whole tables, so an index added to a model whose table
+# already exists (e.g. the Job pagination indexes) would never reach an existing database.
+def create_missing_schema():
+    Base.metadata.create_all(bind=engine)
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
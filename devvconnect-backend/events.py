@@ -0,0 +1,173 @@
+# File: devvconnect-backend/events.py
+# Pub/sub for dashboard updates pushed over Server-Sent Events (GET /events).
+#
+# Write paths call notify() inside the transaction of their write, addressing the event to the
+# users it concerns; it is published by a background task once that transaction has committed
+# (see tasks.py), so a rolled-back write notifies nobody and the request doesn't wait. With the
+# LocalBroker that task runs in the process that made the write, whose streams are the ones it
+# can reach; with a shared broker it goes through the durable outbox like any other task:
+#   proposal.created  -> the job's client           (submit_proposal: apply_to_job, create_proposal)
+#   proposal.updated  -> each affected freelancer    (apply_review: approved or rejected)
+#   job.created       -> the posting client          (add_job, insert_jobs: create_job, the batch import)
+#   job.closed        -> the job's client            (apply_review closed the job)
+# Each open /events stream subscribes for its user and only ever sees that user's events, so
+# a dashboard can refetch when something actually changed instead of polling.
+#
+# The broker is pluggable: EVENTS_BROKER names a "module:attribute" that is a Broker instance,
+# class or factory, e.g. a Redis pub/sub adapter so every worker of a multi-worker
+# deployment sees every event. The default LocalBroker only delivers within this process,
+# which is enough for a single worker and is the stand-in for tests and development.
+#
+# Delivery to open streams is best effort. Each subscriber has a bounded queue
+# (EVENTS_QUEUE_SIZE); a subscriber that falls behind has its backlog replaced by a single
+# "resync" event telling the client to refetch once.
+import asyncio
+import importlib
+import itertools
+import logging
+import os
+import threading
+import time
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Protocol, Set
+
+from sqlalchemy.orm import Session
+
+from tasks import enqueue, task
+
+logger = logging.getLogger(__name__)
+
+EVENTS_BROKER = os.getenv("EVENTS_BROKER", "local")
+EVENTS_QUEUE_SIZE = int(os.getenv("EVENTS_QUEUE_SIZE", "100"))
+
+RESYNC_EVENT = "resync"
+
+
+class Event(NamedTuple):
+    id: int
+    type: str
+    data: Dict[str, Any]
+    created_at: float
+
+
+class Subscription:
+    """One user's queue of events, consumed by one /events stream."""
+
+    def __init__(self, user_id: int, queue_size: int = EVENTS_QUEUE_SIZE):
+        self.user_id = user_id
+        self._loop = asyncio.get_running_loop()
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.dropped = 0
+
+    def offer(self, event: Event):
+        # Called from any thread; the queue is only touched on the subscriber's event loop
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is self._loop:
+            self._put(event)
+        else:
+            self._loop.call_soon_threadsafe(self._put, event)
+
+    def _put(self, event: Event):
+        if self._queue.full():
+            # The client fell behind: replace the backlog with one "refetch everything"
+            self.dropped += self._queue.qsize() + 1
+            while not self._queue.empty():
+                self._queue.get_nowait()
+            event = Event(event.id, RESYNC_EVENT, {}, event.created_at)
+        self._queue.put_nowait(event)
+
+    async def get(self, timeout: Optional[float] = None) -> Optional[Event]:
+        """The next event, or None if nothing arrived within `timeout` seconds."""
+        try:
+            return await asyncio.wait_for(self._queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class Broker(Protocol):
+    def publish(self, event_type: str, user_ids: Iterable[int], data: Dict[str, Any]): ...
+
+    def subscribe(self, user_id: int) -> Subscription: ...
+
+    def unsubscribe(self, subscription: Subscription): ...
+
+    def stats(self) -> dict: ...
+
+
+class LocalBroker:
+    """In-process broker: publish() hands the event to this process's subscribers."""
+
+    def __init__(self, queue_size: int = EVENTS_QUEUE_SIZE):
+        self.queue_size = queue_size
+        self._ids = itertools.count(1)
+        self._subscribers: Dict[int, Set[Subscription]] = {}
+        self._lock = threading.Lock()
+        self.published = 0
+        self.delivered = 0
+        self._dropped_by_closed = 0
+
+    def publish(self, event_type: str, user_ids: Iterable[int], data: Dict[str, Any]):
+        event = Event(next(self._ids), event_type, data, time.time())
+        with self._lock:
+            self.published += 1
+            targets = [subscription for user_id in set(user_ids) for subscription in self._subscribers.get(user_id, ())]
+            self.delivered += len(targets)
+        for subscription in targets:
+            subscription.offer(event)
+
+    def subscribe(self, user_id: int) -> Subscription:
+        subscription = Subscription(user_id, self.queue_size)
+        with self._lock:
+            self._subscribers.setdefault(user_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        with self._lock:
+            subscriptions = self._subscribers.get(subscription.user_id)
+            if subscriptions is not None:
+                subscriptions.discard(subscription)
+                if not subscriptions:
+                    del self._subscribers[subscription.user_id]
+            self._dropped_by_closed += subscription.dropped
+
+    def stats(self) -> dict:
+        with self._lock:
+            subscriptions = [subscription for group in self._subscribers.values() for subscription in group]
+            return {
+                "subscribers": len(subscriptions),
+                "published": self.published,
+                "delivered": self.delivered,
+                "dropped": self._dropped_by_closed + sum(subscription.dropped for subscription in subscriptions),
+            }
+
+
+def _load_broker(spec: str) -> Broker:
+    if spec == "local":
+        return LocalBroker()
+    module_name, _, attribute = spec.partition(":")
+    target = getattr(importlib.import_module(module_name), attribute)
+    broker = target() if isinstance(target, type) or not hasattr(target, "publish") else target
+    logger.info("Event broker: %s", spec)
+    return broker
+
+
+broker: Broker = _load_broker(EVENTS_BROKER)
+
+
+def set_broker(new_broker: Broker):
+    """Swap the broker (tests, or wiring up a shared one at startup)."""
+    global broker
+    broker = new_broker
+
+
+def notify(db: Session, event_type: str, user_ids: Iterable[int], **data):
+    """Publish the event once `db`'s transaction commits. `data` must be JSON serializable."""
+    enqueue(db, "events.publish", event_type=event_type, user_ids=[user_id for user_id in user_ids if user_id is not None], data=data)
+
+
+@task("events.publish", local=lambda: isinstance(broker, LocalBroker))
+def publish_event(event_type: str, user_ids: List[int], data: Dict[str, Any]):
+    # A broker error raises, so the task is retried
+    broker.publish(event_type, user_ids, data)
@@ -0,0 +1,131 @@
+# File: devvconnect-backend/exports.py
+# Streaming CSV / NDJSON export of a client's jobs and proposals (GET /client/export).
+#
+# One flat row per (job, proposal) pair, joined with the freelancer's name; a job without
+# proposals gives one row with empty proposal columns. The rows come from a single SELECT read
+# through a server-side cursor (yield_per: a named cursor on psycopg2 / asyncpg, SQLite steps
+# its cursor lazily anyway) and are encoded and sent EXPORT_BATCH_ROWS at a time, so the
+# worker holds one batch in memory however many proposals the client has.
+#
+# The response outlives the request's dependencies, so the stream opens its own session: the
+# read replica when one is configured and the user hasn't just written (see database.py),
+# otherwise the primary. Only columns are selected, never ORM objects, so nothing accumulates
+# in an identity map.
+import csv
+import io
+import json
+import os
+from typing import AsyncIterator, Iterable, Iterator, Optional, Sequence
+
+from sqlalchemy import Select, select
+from sqlalchemy.orm import aliased
+
+from database import (
+    AsyncReadSessionLocal,
+    AsyncSessionLocal,
+    ReadSessionLocal,
+    SessionLocal,
+    read_engine,
+    read_routing,
+)
+from models import Job, Proposal, User
+
+EXPORT_BATCH_ROWS = int(os.getenv("EXPORT_BATCH_ROWS", "1000"))
+
+EXPORT_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+
+_freelancer = aliased(User)
+
+EXPORT_COLUMNS = {
+    "job_id": Job.id,
+    "job_title": Job.title,
+    "job_description": Job.description,
+    "job_budget": Job.budget,
+    "job_tech_stack": Job.tech_stack,
+    "job_timeline": Job.timeline,
+    "job_is_open": Job.is_open,
+    "job_created_at": Job.created_at,
+    "proposal_id": Proposal.id,
+    "proposal_status": Proposal.status,
+    "proposal_hourly_rate": Proposal.hourly_rate,
+    "proposal_estimated_timeline": Proposal.estimated_timeline,
+    "proposal_message": Proposal.message,
+    "freelancer_id": Proposal.freelancer_id,
+    "freelancer_name": _freelancer.name,
+}
+
+
+def export_query(client_id: int) -> Select:
+    return (
+        select(*(column.label(name) for name, column in EXPORT_COLUMNS.items()))
+        .select_from(Job)
+        .outerjoin(Proposal, Proposal.job_id == Job.id)
+        .outerjoin(_freelancer, _freelancer.id == Proposal.freelancer_id)
+        .where(Job.client_id == client_id)
+        .order_by(Job.id, Proposal.id)
+        .execution_options(yield_per=EXPORT_BATCH_ROWS)
+    )
+
+
+def _encode_value(value):
+    return value.isoformat() if hasattr(value, "isoformat") else value
+
+
+def encode_ndjson(rows: Iterable[Sequence]) -> bytes:
+    names = list(EXPORT_COLUMNS)
+    lines = (json.dumps(dict(zip(names, map(_encode_value, row))), separators=(",", ":")) for row in rows)
+    return ("\n".join(lines) + "\n").encode("utf-8")
+
+
+def encode_csv(rows: Iterable[Sequence]) -> bytes:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows([_encode_value(value) for value in row] for row in rows)
+    return buffer.getvalue().encode("utf-8")
+
+
+def csv_header() -> bytes:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerow(EXPORT_COLUMNS)
+    return buffer.getvalue().encode("utf-8")
+
+
+_ENCODERS = {"ndjson": encode_ndjson, "csv": encode_csv}
+
+
+def _session_factories(firebase_uid: Optional[str]):
+    # Same choice get_read_session makes, taken once for the whole stream
+    if read_engine is not None and not read_routing.wrote_recently(firebase_uid) and read_routing.replica_available():
+        read_routing.replica_reads += 1
+        return ReadSessionLocal, AsyncReadSessionLocal
+    return SessionLocal, AsyncSessionLocal
+
+
+def stream_export(client_id: int, export_format: str, firebase_uid: Optional[str] = None):
+    """The response body for StreamingResponse: an async iterator in DB_MODE=async, otherwise a
+    sync one (Starlette pulls it on the threadpool, one batch per step)."""
+    sync_factory, async_factory = _session_factories(firebase_uid)
+    if async_factory is not None:
+        return _stream_async(async_factory, client_id, export_format)
+    return _stream_sync(sync_factory, client_id, export_format)
+
+
+def _stream_sync(session_factory, client_id: int, export_format: str) -> Iterator[bytes]:
+    encode = _ENCODERS[export_format]
+    if export_format == "csv":
+        yield csv_header()
+    with session_factory() as db:
+        for rows in db.execute(export_query(client_id)).partitions():
+            yield encode(rows)
+
+
+async def _stream_async(session_factory, client_id: int, export_format: str) -> AsyncIterator[bytes]:
+    encode = _ENCODERS[export_format]
+    if export_format == "csv":
+        yield csv_header()
+    async with session_factory() as db:
+        result = await db.stream(export_query(client_id))
+        async for rows in result.partitions():
+            yield encode(rows)
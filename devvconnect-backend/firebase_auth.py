@@ -1,8 +1,20 @@
 import firebase_admin
 from firebase_admin import credentials, auth
 from fastapi import HTTPException, Depends, Header
+import asyncio
+import logging
 import os
 import json
+from auth_executor import auth_executor, ExecutorSaturatedError
+from token_verifier import (
+    GOOGLE_SECURETOKEN_CERTS_URL,
+    FirebaseTokenVerifier,
+    HttpKeySource,
+    KeySource,
+    SigningKeyCache,
+)
+
+logger = logging.getLogger(__name__)
 
 # Initialize Firebase Admin SDK
 # Prioritize initializing from JSON string in environment variable for production
@@ -15,9 +27,9 @@ if cred_json_str:
         cred = credentials.Certificate(cred_json)
         firebase_admin.initialize_app(cred)
         app_initialized = True
-        print("Firebase Admin initialized from FIREBASE_CREDENTIALS_JSON.")
+        logger.info("Firebase Admin initialized from FIREBASE_CREDENTIALS_JSON.")
     except Exception as e:
-        print(f"Error initializing Firebase from JSON string: {e}")
+        logger.error("Error initializing Firebase from JSON string: %s", e)
         # Fallback or error, depending on your strategy
         pass # Potentially raise an error if this is critical for production
 
@@ -29,14 +41,93 @@ if not app_initialized:
             cred = credentials.Certificate(cred_path)
             firebase_admin.initialize_app(cred) # Default app
             app_initialized = True
-            print(f"Firebase Admin initialized from file path: {cred_path}.")
+            logger.info("Firebase Admin initialized from file path: %s", cred_path)
         except Exception as e:
-            print(f"Error initializing Firebase from file path '{cred_path}': {e}")
+            logger.error("Error initializing Firebase from file path '%s': %s", cred_path, e)
     else:
         # This case means neither FIREBASE_CREDENTIALS_JSON nor FIREBASE_CREDENTIALS (path) was effectively used.
         # This might be an issue if Firebase is critical.
-        print("Firebase Admin SDK not initialized. Ensure FIREBASE_CREDENTIALS_JSON (for production)"
-              " or FIREBASE_CREDENTIALS (path, for local) environment variable is set correctly.")
+        logger.warning("Firebase Admin SDK not initialized. Ensure FIREBASE_CREDENTIALS_JSON (for production)"
+                       " or FIREBASE_CREDENTIALS (path, for local) environment variable is set correctly.")
+
+
+# --- Local ID token verification ---
+# Tokens are verified in-process (see token_verifier.py) whenever we know the Firebase
+# project id. Set FIREBASE_LOCAL_VERIFY=0 to fall back to the Admin SDK's verify_id_token.
+FIREBASE_LOCAL_VERIFY = os.getenv("FIREBASE_LOCAL_VERIFY", "1") != "0"
+# Optional: fetch signing keys from somewhere other than Google (e.g. a local key server)
+FIREBASE_SIGNING_KEYS_URL = os.getenv("FIREBASE_SIGNING_KEYS_URL", GOOGLE_SECURETOKEN_CERTS_URL)
+FIREBASE_CLOCK_SKEW_SECONDS = int(os.getenv("FIREBASE_CLOCK_SKEW_SECONDS", "0"))
+
+
+def _resolve_project_id():
+    project_id = os.getenv("FIREBASE_PROJECT_ID")
+    if project_id:
+        return project_id
+    if app_initialized:
+        try:
+            return firebase_admin.get_app().project_id
+        except Exception as e:
+            logger.warning("Could not determine Firebase project id from the Admin SDK: %s", e)
+    return None
+
+
+signing_key_cache = SigningKeyCache(HttpKeySource(FIREBASE_SIGNING_KEYS_URL))
+_project_id = _resolve_project_id() if FIREBASE_LOCAL_VERIFY else None
+token_verifier = FirebaseTokenVerifier(_project_id, signing_key_cache, FIREBASE_CLOCK_SKEW_SECONDS) if _project_id else None
+if token_verifier is not None and not app_initialized:
+    logger.error("FIREBASE_PROJECT_ID is set but the Firebase Admin SDK is not initialized: tokens can't be checked for"
+                 " revocation or disabled accounts, so authenticated routes will answer 503. Set FIREBASE_CREDENTIALS_JSON"
+                 " or FIREBASE_CREDENTIALS.")
+
+
+class RevocationCheckUnavailableError(Exception):
+    """check_revoked=True, but without the Admin SDK revocation and disabled accounts can't be checked."""
+
+
+def set_key_source(source: KeySource, project_id: str = None):
+    """Swap where signing keys come from (tests/benchmarks use a StaticKeySource)."""
+    global token_verifier
+    signing_key_cache.source = source
+    signing_key_cache.refresh()
+    project_id = project_id or (token_verifier.project_id if token_verifier else _resolve_project_id())
+    if not project_id:
+        raise ValueError("A Firebase project id is required for local token verification.")
+    token_verifier = FirebaseTokenVerifier(project_id, signing_key_cache, FIREBASE_CLOCK_SKEW_SECONDS)
+
+
+def start_signing_key_refresh():
+    # Called on app startup: prefetch the keys and keep them fresh in the background
+    if token_verifier is not None:
+        signing_key_cache.start()
+
+
+def stop_signing_key_refresh():
+    signing_key_cache.stop()
+
+
+def verify_id_token(token: str, check_revoked: bool = False) -> dict:
+    """Single entry point for verifying a Firebase ID token.
+
+    Raises the same firebase_admin.auth exceptions as auth.verify_id_token, so callers
+    can keep handling InvalidIdTokenError / ExpiredIdTokenError / RevokedIdTokenError /
+    UserDisabledError the way they always have. With check_revoked=True and no Admin SDK it
+    raises RevocationCheckUnavailableError rather than returning unchecked claims.
+    """
+    if token_verifier is None:
+        return auth.verify_id_token(token, check_revoked=check_revoked)
+
+    claims = token_verifier.verify(token)
+    if check_revoked:
+        # Revocation and disabled state live in Firebase, so this part still needs the Admin SDK
+        if not app_initialized:
+            raise RevocationCheckUnavailableError("The Firebase Admin SDK is not initialized; can't check revocation.")
+        user_record = auth.get_user(claims["uid"])
+        if user_record.disabled:
+            raise auth.UserDisabledError("The user record is disabled.")
+        if user_record.tokens_valid_after_timestamp and claims["iat"] * 1000 < user_record.tokens_valid_after_timestamp:
+            raise auth.RevokedIdTokenError("The Firebase ID token has been revoked.")
+    return claims
 
 
 async def verify_token(authorization: str = Header(None)): # Changed to Header(None) for flexibility, can add checks
@@ -48,12 +139,15 @@ async def verify_token(authorization: str = Header(None)): # Changed to Header(N
     
     token = authorization.split("Bearer ")[1]
 
-    if not app_initialized:
+    if not app_initialized and token_verifier is None:
         raise HTTPException(status_code=500, detail="Firebase Admin SDK not initialized. Check server configuration.")
 
     try:
-        decoded_token = auth.verify_id_token(token)
+        # Blocking work goes to the dedicated auth executor, never onto the event loop
+        decoded_token = await auth_executor.run(verify_id_token, token)
         return decoded_token  # includes email, uid, etc.
+    except (asyncio.TimeoutError, ExecutorSaturatedError):
+        raise HTTPException(status_code=503, detail="Token verification is temporarily unavailable. Please retry.", headers={"Retry-After": "1"})
     except firebase_admin.auth.InvalidIdTokenError:
         raise HTTPException(status_code=401, detail="Invalid Firebase ID token")
     except Exception as e:
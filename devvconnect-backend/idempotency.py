@@ -0,0 +1,100 @@
+# File: devvconnect-backend/idempotency.py
+# Idempotency-Key support for POST endpoints (POST /client/jobs).
+#
+# A client that retries a POST (after a timeout, a dropped connection, a double click) sends the
+# same Idempotency-Key header. The first request's response is stored in idempotency_keys in the
+# same transaction as its write; a retry with that key gets the stored response back, marked
+# with "Idempotent-Replayed: true", and nothing is written twice. Keys are scoped to the user
+# and honoured for IDEMPOTENCY_KEY_TTL_SECONDS. Reusing a key with a different request body is
+# rejected with 422. When two requests with the same key race, the unique (user_id, key) index
+# lets one of them commit; the other rolls back its write and replays the winner's response.
+import hashlib
+import json
+import logging
+import os
+from datetime import datetime, timedelta
+from typing import Any, Callable, NamedTuple, Optional, Tuple
+
+from fastapi import HTTPException, Response
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from database import engine
+from models import IdempotencyKey
+
+logger = logging.getLogger(__name__)
+
+IDEMPOTENCY_KEY_HEADER = "Idempotency-Key"
+IDEMPOTENT_REPLAYED_HEADER = "Idempotent-Replayed"
+IDEMPOTENCY_KEY_TTL_SECONDS = int(os.getenv("IDEMPOTENCY_KEY_TTL_SECONDS", str(24 * 3600)))
+MAX_IDEMPOTENCY_KEY_LENGTH = 255
+
+
+class StoredResponse(NamedTuple):
+    status_code: int
+    body: str
+
+    def to_response(self, replayed: bool) -> Response:
+        headers = {IDEMPOTENT_REPLAYED_HEADER: "true"} if replayed else {}
+        return Response(content=self.body, status_code=self.status_code, media_type="application/json", headers=headers)
+
+
+def validate_idempotency_key(key: str):
+    if not key or len(key) > MAX_IDEMPOTENCY_KEY_LENGTH:
+        raise HTTPException(status_code=400, detail=f"{IDEMPOTENCY_KEY_HEADER} must be 1-{MAX_IDEMPOTENCY_KEY_LENGTH} characters.")
+
+
+def request_hash(payload) -> str:
+    canonical = json.dumps(jsonable_encoder(payload), sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def run_idempotent(db: Session, user_id: int, key: str, payload, write: Callable[[Session], Any]) -> Tuple[StoredResponse, Optional[Any]]:
+    """Run `write(db)` at most once per (user, key) and commit it together with its response.
+
+    `write` adds an ORM row to the session without committing; the response body is that row's
+    columns. Returns (response, row), with row None when the response is a replay. The row is
+    detached and fully loaded."""
+    fingerprint = request_hash(payload)
+    stored = _lookup(db, user_id, key, fingerprint)
+    if stored is not None:
+        return stored, None
+
+    row = write(db)
+    db.flush()
+    body = json.dumps(jsonable_encoder({column.key: getattr(row, column.key) for column in row.__table__.columns}))
+    db.add(IdempotencyKey(user_id=user_id, key=key, request_hash=fingerprint, status_code=200, response_body=body))
+    try:
+        db.flush()
+    except IntegrityError:
+        # A concurrent request with the same key committed first: drop our write, replay theirs
+        db.rollback()
+        stored = _lookup(db, user_id, key, fingerprint)
+        if stored is None:
+            raise
+        logger.info("Idempotency-Key race for user_id=%s; replaying the committed response", user_id)
+        return stored, None
+    db.expunge(row)  # keep the flushed values instead of expiring them on commit
+    db.commit()
+    return StoredResponse(200, body), row
+
+
+def _lookup(db: Session, user_id: int, key: str, fingerprint: str) -> Optional[StoredResponse]:
+    stored = db.query(IdempotencyKey).filter(IdempotencyKey.user_id == user_id, IdempotencyKey.key == key).first()
+    if stored is None:
+        return None
+    if stored.created_at < datetime.utcnow() - timedelta(seconds=IDEMPOTENCY_KEY_TTL_SECONDS):
+        db.delete(stored)  # expired; the key can be used again
+        db.flush()
+        return None
+    if stored.request_hash != fingerprint:
+        raise HTTPException(status_code=422, detail=f"{IDEMPOTENCY_KEY_HEADER} was already used with a different request body.")
+    return StoredResponse(stored.status_code, stored.response_body)
+
+
+def prune_idempotency_keys() -> int:
+    """Delete expired keys. Safe to call on every startup."""
+    cutoff = datetime.utcnow() - timedelta(seconds=IDEMPOTENCY_KEY_TTL_SECONDS)
+    with engine.begin() as conn:
+        return conn.execute(IdempotencyKey.__table__.delete().where(IdempotencyKey.created_at < cutoff)).rowcount
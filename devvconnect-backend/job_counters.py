@@ -0,0 +1,155 @@
+# File: devvconnect-backend/job_counters.py
+# Denormalized proposal counters on jobs: proposal_count, pending_count, approved_count.
+#
+# Job cards show "N applicants, M approved" from the job row alone instead of loading every
+# proposal. The counters change in the same transaction as the proposal write that moves them:
+#   * submitting a proposal increments proposal_count and pending_count in place
+#     (UPDATE jobs SET proposal_count = proposal_count + 1 ...), so concurrent applies to one
+#     job never lose an update;
+#   * a review recounts the job's proposals in the UPDATE that may also close the job, while
+#     the job row is locked by the review.
+# reconcile_job_counters() repairs drift (writes made outside these paths, manual fixes) by
+# recounting in batches and only touching rows that are off. A background thread runs it after
+# startup and then every JOB_COUNTERS_RECONCILE_SECONDS; it also runs from the command line:
+#
+#   python job_counters.py reconcile
+import logging
+import os
+import sys
+import threading
+from typing import Dict, Optional
+
+from sqlalchemy import func, inspect, or_, select, update
+from sqlalchemy.orm import Session
+
+from database import SessionLocal, engine
+from models import Job, Proposal
+
+logger = logging.getLogger(__name__)
+
+JOB_COUNTERS_RECONCILE_SECONDS = float(os.getenv("JOB_COUNTERS_RECONCILE_SECONDS", "3600"))  # 0 disables
+RECONCILE_BATCH_SIZE = 1000
+
+COUNTER_COLUMNS = ("proposal_count", "pending_count", "approved_count")
+
+
+def _count_proposals(*criteria):
+    return select(func.count()).where(Proposal.job_id == Job.id, *criteria).correlate(Job).scalar_subquery()
+
+
+def recounted_values() -> Dict[str, object]:
+    """Column -> correlated COUNT(*) for UPDATE jobs SET ..., recomputing a job's counters."""
+    return {
+        "proposal_count": _count_proposals(),
+        "pending_count": _count_proposals(Proposal.status == "pending"),
+        "approved_count": _count_proposals(Proposal.status == "approved"),
+    }
+
+
+def count_new_proposal(db: Session, job_id: int):
+    # A new proposal is always pending; runs in the caller's transaction
+    db.execute(
+        update(Job)
+        .where(Job.id == job_id)
+        .values(proposal_count=Job.proposal_count + 1, pending_count=Job.pending_count + 1)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def reconcile_job_counters(db: Session, batch_size: int = RECONCILE_BATCH_SIZE) -> int:
+    """Recount every job's counters, committing per batch of job ids. Returns the number of
+    jobs whose counters were wrong."""
+    recounted = recounted_values()
+    repaired = 0
+    last_id = 0
+    while True:
+        upper = db.execute(
+            select(func.max(Job.id)).where(Job.id.in_(select(Job.id).where(Job.id > last_id).order_by(Job.id).limit(batch_size)))
+        ).scalar()
+        if upper is None:
+            break
+        repaired += db.execute(
+            update(Job)
+            .where(
+                Job.id > last_id,
+                Job.id <= upper,
+                or_(*(getattr(Job, name) != recounted[name] for name in COUNTER_COLUMNS)),
+            )
+            .values(**recounted)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        db.commit()
+        last_id = upper
+    if repaired:
+        logger.warning("Repaired proposal counters on %s jobs", repaired)
+    return repaired
+
+
+def ensure_job_counter_columns():
+    """Add the counter columns to an existing jobs table and fill them. Safe to call on every
+    startup; create_missing_schema() only creates whole tables."""
+    existing = {column["name"] for column in inspect(engine).get_columns(Job.__tablename__)}
+    missing = [name for name in COUNTER_COLUMNS if name not in existing]
+    if not missing:
+        return
+    with engine.begin() as conn:
+        for name in missing:
+            conn.exec_driver_sql(f"ALTER TABLE jobs ADD COLUMN {name} INTEGER NOT NULL DEFAULT 0")
+    logger.info("Added %s to jobs; counting existing proposals", ", ".join(missing))
+    with SessionLocal() as db:
+        reconcile_job_counters(db)
+
+
+class CounterReconciler:
+    """Runs reconcile_job_counters every `interval_seconds` on a daemon thread."""
+
+    def __init__(self, interval_seconds: float = JOB_COUNTERS_RECONCILE_SECONDS):
+        self.interval_seconds = interval_seconds
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.runs = 0
+        self.repaired = 0
+
+    def start(self):
+        if self.interval_seconds <= 0 or (self._thread is not None and self._thread.is_alive()):
+            return
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, name="job-counter-reconcile", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+
+    def run_once(self) -> int:
+        with SessionLocal() as db:
+            repaired = reconcile_job_counters(db)
+        self.runs += 1
+        self.repaired += repaired
+        return repaired
+
+    def _run(self):
+        # First pass right after startup, then every interval
+        while not self._stopped.is_set():
+            try:
+                self.run_once()
+            except Exception:
+                logger.exception("Proposal counter reconciliation failed")
+            self._stopped.wait(timeout=self.interval_seconds)
+
+    def stats(self) -> dict:
+        return {"runs": self.runs, "repaired": self.repaired}
+
+
+counter_reconciler = CounterReconciler()
+
+
+if __name__ == "__main__":
+    if sys.argv[1:] != ["reconcile"]:
+        print("usage: python job_counters.py reconcile")
+        sys.exit(2)
+    from database import create_missing_schema
+
+    create_missing_schema()
+    ensure_job_counter_columns()
+    with SessionLocal() as session:
+        print(f"Repaired proposal counters on {reconcile_job_counters(session)} jobs.")
@@ -0,0 +1,205 @@
+# File: devvconnect-backend/log_config.py
+# Logging setup for the backend.
+#
+# Request handlers only hand a LogRecord to a queue; a background listener thread does the
+# formatting and the (possibly slow) write to stdout/stderr. Log calls use %-style arguments, so
+# with a logger's level above DEBUG a debug call is a single isEnabledFor() check and never
+# builds its message string.
+#
+#   LOG_LEVEL=INFO                                  root level
+#   LOG_LEVELS=routes.auth=DEBUG,sqlalchemy.engine=WARNING   per-module overrides
+#   LOG_FORMAT=text | json
+#   LOG_DEBUG_SAMPLE_RATE=0.01                      keep debug lines for ~1% of requests
+#   LOG_STREAM=stdout | stderr
+#
+# Every record carries the request id (X-Request-ID, taken from the caller or generated by
+# RequestIDMiddleware) so the lines of one request can be pulled out of interleaved output.
+# Never log tokens or email addresses; log user ids / Firebase UIDs instead.
+import atexit
+import contextvars
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import re
+import sys
+import time
+import uuid
+import zlib
+
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_LEVELS = os.getenv("LOG_LEVELS", "")
+LOG_FORMAT = os.getenv("LOG_FORMAT", "text").lower()
+LOG_DEBUG_SAMPLE_RATE = float(os.getenv("LOG_DEBUG_SAMPLE_RATE", "1.0"))
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+LOG_STREAM = os.getenv("LOG_STREAM", "stdout").lower()
+
+REQUEST_ID_HEADER = b"x-request-id"
+_VALID_REQUEST_ID = re.compile(r"^[A-Za-z0-9._\-]{1,64}$")
+
+request_id_var = contextvars.ContextVar("request_id", default="-")
+
+# Message arguments of these types are immutable, so they can cross to the listener thread
+# unformatted. Anything else (ORM objects, dicts, ...) is formatted before enqueueing.
+_SAFE_ARG_TYPES = (str, int, float, bool, type(None))
+
+
+class RequestContextFilter(logging.Filter):
+    """Stamps the current request id on the record (runs in the caller's thread)."""
+
+    def filter(self, record):
+        record.request_id = request_id_var.get()
+        return True
+
+
+class DebugSamplingFilter(logging.Filter):
+    """Keeps DEBUG records for a sample of requests. The decision hashes the request id, so a
+    sampled request keeps all of its debug lines instead of a random scattering of them."""
+
+    def __init__(self, rate: float):
+        super().__init__()
+        self.threshold = int(max(0.0, min(1.0, rate)) * 10000)
+
+    def filter(self, record):
+        if record.levelno > logging.DEBUG or self.threshold >= 10000:
+            return True
+        request_id = getattr(record, "request_id", "-")
+        if request_id == "-":
+            return random.randrange(10000) < self.threshold
+        return zlib.crc32(request_id.encode("utf-8")) % 10000 < self.threshold
+
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that defers formatting to the listener thread and drops records instead of
+    blocking when the queue is full."""
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record):
+        if record.args:
+            args = record.args.values() if isinstance(record.args, dict) else record.args
+            if not all(isinstance(arg, _SAFE_ARG_TYPES) for arg in args):
+                record.msg = record.getMessage()
+                record.args = None
+        if record.exc_info:
+            # Tracebacks hold frames; render them here so nothing else is kept alive
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {
+            "ts": round(record.created, 3),
+            "level": record.levelname,
+            "logger": record.name,
+            "request_id": getattr(record, "request_id", "-"),
+            "msg": record.getMessage(),
+        }
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+_listener = None
+_queue_handler = None
+
+
+def configure_logging():
+    """Install the queue handler on the root logger and start the listener (idempotent)."""
+    global _listener, _queue_handler
+    if _listener is not None:
+        return
+
+    log_queue = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+    _queue_handler = NonBlockingQueueHandler(log_queue)
+    _queue_handler.addFilter(RequestContextFilter())
+    if LOG_DEBUG_SAMPLE_RATE < 1.0:
+        _queue_handler.addFilter(DebugSamplingFilter(LOG_DEBUG_SAMPLE_RATE))
+
+    output = logging.StreamHandler(sys.stderr if LOG_STREAM == "stderr" else sys.stdout)
+    if LOG_FORMAT == "json":
+        output.setFormatter(JsonFormatter())
+    else:
+        formatter = logging.Formatter("%(asctime)s.%(msecs)03dZ %(levelname)s %(name)s [%(request_id)s] %(message)s", "%Y-%m-%dT%H:%M:%S")
+        formatter.converter = time.gmtime
+        output.setFormatter(formatter)
+
+    root = logging.getLogger()
+    root.setLevel(LOG_LEVEL)
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(_queue_handler)
+    for name, level in parse_module_levels(LOG_LEVELS).items():
+        logging.getLogger(name).setLevel(level)
+
+    _listener = logging.handlers.QueueListener(log_queue, output, respect_handler_level=False)
+    _listener.start()
+    atexit.register(shutdown_logging)
+
+
+def shutdown_logging():
+    """Flush queued records and stop the listener thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def dropped_records() -> int:
+    return _queue_handler.dropped if _queue_handler is not None else 0
+
+
+def parse_module_levels(spec: str) -> dict:
+    """'routes.auth=DEBUG, sqlalchemy.engine=WARNING' -> {'routes.auth': 'DEBUG', ...}"""
+    levels = {}
+    for part in spec.split(","):
+        name, _, level = part.partition("=")
+        if name.strip() and level.strip():
+            levels[name.strip()] = level.strip().upper()
+    return levels
+
+
+class RequestIDMiddleware:
+    """Binds a request id for the duration of the request and echoes it in X-Request-ID."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = None
+        for name, value in scope.get("headers", []):
+            if name == REQUEST_ID_HEADER:
+                candidate = value.decode("latin-1")
+                if _VALID_REQUEST_ID.match(candidate):
+                    request_id = candidate
+                break
+        request_id = request_id or uuid.uuid4().hex
+        token = request_id_var.set(request_id)
+
+        async def send_with_request_id(message):
+            if message["type"] == "http.response.start":
+                headers = [(name, value) for name, value in message.get("headers", []) if name != REQUEST_ID_HEADER]
+                headers.append((REQUEST_ID_HEADER, request_id.encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_request_id)
+        finally:
+            request_id_var.reset(token)
@@ -1,16 +1,52 @@
+from log_config import configure_logging, shutdown_logging, RequestIDMiddleware
+configure_logging() # Before the other imports, so their startup messages go through the log queue
 from fastapi import FastAPI, Depends
+from fastapi.responses import ORJSONResponse, PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
-from firebase_auth import verify_token # Assuming firebase_auth.py is in the same directory or accessible in PYTHONPATH
-from routes import users, jobs, proposals, auth, client, freelancer # Ensure these route files exist
-from database import Base, engine # Ensure database.py and engine are correctly set up
+from firebase_auth import verify_token, start_signing_key_refresh, stop_signing_key_refresh # Assuming firebase_auth.py is in the same directory or accessible in PYTHONPATH
+from routes import users, jobs, proposals, auth, client, freelancer, events as event_routes # Ensure these route files exist
+from database import Base, engine, SessionLocal, create_missing_schema, read_routing # Ensure database.py and engine are correctly set up
+from auth_executor import auth_executor
+from sql_counter import SQLStatementCountMiddleware
+from metrics import METRICS_ENABLED, MetricsMiddleware, registry as metrics_registry, render_metrics
+from principal_cache import principal_cache
+from rate_limit import RateLimitMiddleware, rate_limiter
+from response_cache import response_cache
+from log_config import dropped_records
+from pagination import NEXT_CURSOR_HEADER, PREV_CURSOR_HEADER, ensure_job_created_at
+from schemas import Message
+from search import ensure_search_index
+from applications import dedupe_proposals
+from idempotency import IDEMPOTENT_REPLAYED_HEADER, prune_idempotency_keys
+from stream_tickets import prune_stream_tickets
+from job_counters import counter_reconciler, ensure_job_counter_columns
+from client_stats import ensure_client_stats
+import events
+from tasks import local_task_queue, outbox_tasks_registered, task_queue
+from tags import backfill_job_tags_once
+from recommendations import warm_recommendation_index
 import models # Ensure models.py is correctly set up
+import logging
 import os
+import threading
 
-# Create database tables if they don't exist
+logger = logging.getLogger(__name__)
+
+# Create database tables (and any indexes added to existing tables) if they don't exist
 # This is okay for development, but for production, you might use Alembic migrations
-Base.metadata.create_all(bind=engine)
+dedupe_proposals() # Once, so the unique (job_id, freelancer_id) index can be created on an existing database
+create_missing_schema()
+ensure_job_counter_columns() # Proposal counters on an existing jobs table
+ensure_job_created_at() # Keyset pagination needs every job dated (NOT NULL, backfilled)
+ensure_client_stats() # Event timestamps on existing tables; builds the client stats table on first run
+prune_idempotency_keys() # Expired Idempotency-Key responses
+prune_stream_tickets() # Expired GET /events tickets
+ensure_search_index() # FTS5 table (SQLite) or tsvector + GIN index (PostgreSQL) for /jobs/search
+with SessionLocal() as startup_db:
+    backfill_job_tags_once(startup_db) # Tag jobs created before skill tags existed (recorded once done)
 
-app = FastAPI()
+# orjson renders every JSON response; routes declare typed response models (schemas.py)
+app = FastAPI(default_response_class=ORJSONResponse)
 
 # --- CORS Configuration ---
 # Default origins for local development
@@ -32,7 +68,11 @@ if cors_allowed_origins_env:
     # Remove duplicates just in case
     origins = list(set(origins)) 
 
-print(f"Configured CORS origins: {origins}") # For debugging startup
+logger.info("Configured CORS origins: %s", origins) # For debugging startup
+
+# Per-user token buckets and concurrency caps on expensive routes (see rate_limit.py). Added
+# before CORS so CORS wraps it: a 429 still carries the CORS headers the browser needs to read it
+app.add_middleware(RateLimitMiddleware)
 
 app.add_middleware(
     CORSMiddleware,
@@ -40,23 +80,78 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],    # Allows all methods
     allow_headers=["*"],    # Allows all headers
+    expose_headers=[NEXT_CURSOR_HEADER, PREV_CURSOR_HEADER, "ETag", IDEMPOTENT_REPLAYED_HEADER],  # Pagination cursors, cache validators, idempotent replays
 )
 
+# Prefetch Firebase signing keys before serving traffic and keep them fresh in the background,
+# so token verification never waits on a key download.
+@app.on_event("startup")
+def prefetch_signing_keys():
+    start_signing_key_refresh()
+
+@app.on_event("startup")
+def warm_recommendations():
+    threading.Thread(target=warm_recommendation_index, name="recommendation-warmup", daemon=True).start()
+
+@app.on_event("startup")
+def start_counter_reconciler():
+    counter_reconciler.start() # Repairs proposal counter drift (see job_counters.py)
+
+@app.on_event("startup")
+def start_task_workers():
+    task_queue.start(when_used=not outbox_tasks_registered()) # Runs queued side effects of writes (see tasks.py)
+    local_task_queue.start() # ... and the ones only this process can apply: notifications, index updates
+
+@app.on_event("shutdown")
+def stop_signing_keys_refresh():
+    stop_signing_key_refresh()
+    counter_reconciler.stop()
+    task_queue.stop() # Unfinished tasks stay in the outbox for the next start
+    local_task_queue.stop()
+    auth_executor.shutdown()
+    shutdown_logging() # Flush anything still queued
+
+# Per-route latency/size/SQL/auth-time metrics, scraped from GET /metrics (see metrics.py)
+if METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+    metrics_registry.register_stats("principal_cache", principal_cache.stats, counters=("hits", "misses", "evictions", "invalidations"))
+    metrics_registry.register_stats("response_cache", response_cache.stats, counters=("hits", "misses", "not_modified", "evictions", "invalidations"))
+    metrics_registry.register_stats("auth_executor", auth_executor.stats, counters=("completed", "timeouts", "rejected"))
+    metrics_registry.register_stats("log", lambda: {"dropped_records": dropped_records()}, counters=("dropped_records",))
+    metrics_registry.register_stats("read_replica", read_routing.stats, counters=("replica_reads", "sticky_reads", "fallbacks"))
+    metrics_registry.register_stats("events", lambda: events.broker.stats(), counters=("published", "delivered", "dropped"))
+    metrics_registry.register_stats("job_counters", counter_reconciler.stats, counters=("runs", "repaired"))
+    metrics_registry.register_stats("tasks", task_queue.stats)
+    if local_task_queue is not task_queue:
+        metrics_registry.register_stats("local_tasks", local_task_queue.stats)
+    metrics_registry.register_stats("rate_limit", rate_limiter.stats, counters=("evictions",))
+
+# Reports the number of SQL statements each request ran in the X-SQL-Statements header
+app.add_middleware(SQLStatementCountMiddleware)
+# Outermost: binds the request id (X-Request-ID) that every log line of the request carries
+app.add_middleware(RequestIDMiddleware)
+
 app.include_router(users.router, prefix="/users", tags=["Users"])
 app.include_router(jobs.router, tags=["Jobs"]) # Add prefix if needed, e.g., prefix="/jobs"
 app.include_router(proposals.router, prefix="/proposals", tags=["Proposals"])
 app.include_router(auth.router, prefix="/auth", tags=["Auth"])
 app.include_router(client.router, tags=["Client"]) # Add prefix if needed
 app.include_router(freelancer.router, tags=["Freelancer"]) # Add prefix if needed
+app.include_router(event_routes.router, tags=["Events"]) # Server-Sent Events for dashboards
 
 
 # --- Example Protected Route ---
-@app.get("/protected", tags=["Protected"])
+@app.get("/protected", tags=["Protected"], response_model=Message)
 async def protected_route(user_data: dict = Depends(verify_token)):
     return {"message": f"Hello {user_data.get('email', 'user')}! This is a protected route."}
 
+# --- Prometheus metrics ---
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
 # --- Root Endpoint (Optional, good for health checks) ---
-@app.get("/", tags=["Root"])
+@app.get("/", tags=["Root"], response_model=Message)
 async def read_root():
     return {"message": "Welcome to the DevvConnect API!"}
 
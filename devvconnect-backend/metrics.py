@@ -0,0 +1,265 @@
+# File: devvconnect-backend/metrics.py
+# Request metrics in the Prometheus text format, served at GET /metrics.
+#
+# MetricsMiddleware records, per method + route template ("/freelancer/apply/{job_id}", not
+# the concrete URL), request latency, response size, SQL statements and SQL time (from the
+# engine hooks in sql_counter.py) and time spent verifying tokens (get_current_user).
+#
+# Collectors are built to stay on in production: every thread writes to its own shard of
+# each metric (a plain dict reached through threading.local), so recording an observation
+# takes no lock. The shards are only summed up when /metrics is scraped. Component stats
+# (principal cache, response cache, auth executor, ...) are read from their stats() methods
+# at scrape time and cost nothing in between.
+import bisect
+import contextvars
+import math
+import os
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Tuple
+
+from sql_counter import current_counter, track_statements
+
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "1") != "0"
+METRICS_NAMESPACE = "devvconnect"
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (128, 512, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+STATEMENT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 50, 100)
+
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+class _ShardedMetric:
+    """Base for lock-free-on-write metrics: one dict of label tuple -> row per thread."""
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...], width: int):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._width = width
+        self._local = threading.local()
+        self._shards: List[Dict[tuple, list]] = []
+        self._shards_lock = threading.Lock()  # only taken once per thread, when its shard is created
+
+    def _row(self, labels: tuple) -> list:
+        try:
+            shard = self._local.shard
+        except AttributeError:
+            shard = self._local.shard = {}
+            with self._shards_lock:
+                self._shards.append(shard)
+        row = shard.get(labels)
+        if row is None:
+            row = shard[labels] = [0] * self._width
+        return row
+
+    def _merged(self) -> Dict[tuple, list]:
+        merged: Dict[tuple, list] = {}
+        with self._shards_lock:
+            shards = list(self._shards)
+        for shard in shards:
+            for labels, row in list(shard.items()):
+                total = merged.setdefault(labels, [0] * self._width)
+                for i, value in enumerate(row):
+                    total[i] += value
+        return merged
+
+
+class Counter(_ShardedMetric):
+    def __init__(self, name, documentation, labelnames=()):
+        super().__init__(name, documentation, tuple(labelnames), 1)
+
+    def inc(self, labels: tuple = (), amount: float = 1):
+        self._row(labels)[0] += amount
+
+    def render(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} counter"
+        for labels, row in sorted(self._merged().items()):
+            yield f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(row[0])}"
+
+
+class Histogram(_ShardedMetric):
+    # Row layout: one count per bucket (plus +Inf), then sum, then count
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, documentation, tuple(labelnames), len(self.buckets) + 3)
+
+    def observe(self, labels: tuple, value: float):
+        row = self._row(labels)
+        row[bisect.bisect_left(self.buckets, value)] += 1
+        row[-2] += value
+        row[-1] += 1
+
+    def render(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} histogram"
+        bounds = [_format_value(bound) for bound in self.buckets] + ["+Inf"]
+        for labels, row in sorted(self._merged().items()):
+            cumulative = 0
+            for bound, count in zip(bounds, row):
+                cumulative += count
+                le_labels = _format_labels(self.labelnames + ("le",), labels + (bound,))
+                yield f"{self.name}_bucket{le_labels} {cumulative}"
+            plain = _format_labels(self.labelnames, labels)
+            yield f"{self.name}_sum{plain} {_format_value(row[-2])}"
+            yield f"{self.name}_count{plain} {row[-1]}"
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = []
+        self._stats_sources: List[Tuple[str, Callable[[], dict], frozenset]] = []
+
+    def counter(self, name, documentation, labelnames=()) -> Counter:
+        metric = Counter(f"{METRICS_NAMESPACE}_{name}", documentation, labelnames)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS) -> Histogram:
+        metric = Histogram(f"{METRICS_NAMESPACE}_{name}", documentation, labelnames, buckets)
+        self._metrics.append(metric)
+        return metric
+
+    def register_stats(self, prefix: str, stats: Callable[[], dict], counters: Iterable[str] = ()):
+        """Expose every numeric value of `stats()` as <namespace>_<prefix>_<key>. Keys listed in
+        `counters` are monotonic and exported as counters, the rest as gauges."""
+        self._stats_sources.append((prefix, stats, frozenset(counters)))
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        for prefix, stats, counters in self._stats_sources:
+            try:
+                values = stats()
+            except Exception:
+                continue  # a broken stats source must not take /metrics down
+            for key, value in values.items():
+                if isinstance(value, bool) or not isinstance(value, (int, float)):
+                    continue
+                name = f"{METRICS_NAMESPACE}_{prefix}_{key}"
+                kind = "gauge"
+                if key in counters:
+                    name, kind = f"{name}_total", "counter"
+                lines.append(f"# TYPE {name} {kind}")
+                lines.append(f"{name} {_format_value(value)}")
+        lines.append("")
+        return "\n".join(lines)
+
+
+registry = Registry()
+
+ROUTE_LABELS = ("method", "route")
+requests_total = registry.counter("http_requests_total", "HTTP requests by route template and status code.", ROUTE_LABELS + ("status",))
+request_duration = registry.histogram("http_request_duration_seconds", "Time from request start to the end of the response body.", ROUTE_LABELS)
+response_size = registry.histogram("http_response_size_bytes", "Response body size.", ROUTE_LABELS, SIZE_BUCKETS)
+db_statements = registry.histogram("db_statements_per_request", "SQL statements executed per request.", ROUTE_LABELS, STATEMENT_BUCKETS)
+db_time = registry.histogram("db_time_per_request_seconds", "Time spent executing SQL per request.", ROUTE_LABELS)
+auth_time = registry.histogram("auth_verify_seconds", "Time spent verifying ID tokens per request (requests that verified one).", ROUTE_LABELS)
+
+
+class RequestStats:
+    __slots__ = ("auth_seconds", "auth_calls")
+
+    def __init__(self):
+        self.auth_seconds = 0.0
+        self.auth_calls = 0
+
+
+_current_stats = contextvars.ContextVar("request_metrics", default=None)
+
+
+class auth_timer:
+    """Wrap token verification so its time is attributed to the current request's route:
+
+        with auth_timer():
+            claims = await auth_executor.run(verify_id_token, token)
+    """
+
+    __slots__ = ("_started",)
+
+    def __enter__(self):
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        stats = _current_stats.get()
+        if stats is not None:
+            stats.auth_seconds += time.perf_counter() - self._started
+            stats.auth_calls += 1
+        return False
+
+
+class MetricsMiddleware:
+    def __init__(self, app):
+        self.app = app
+        self.in_flight = 0
+        registry.register_stats("http", lambda: {"requests_in_flight": self.in_flight})
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        stats = RequestStats()
+        stats_token = _current_stats.set(stats)
+        # Reuse the X-SQL-Statements counter if SQLStatementCountMiddleware is outside us
+        own_counter = None
+        counter = current_counter()
+        if counter is None:
+            own_counter = track_statements()
+            counter = own_counter.__enter__()
+        status_code = 500
+        body_bytes = 0
+
+        async def send_with_metrics(message):
+            nonlocal status_code, body_bytes
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            elif message["type"] == "http.response.body":
+                body_bytes += len(message.get("body", b""))
+            await send(message)
+
+        self.in_flight += 1
+        try:
+            await self.app(scope, receive, send_with_metrics)
+        finally:
+            self.in_flight -= 1
+            route = scope.get("route")
+            labels = (scope["method"], getattr(route, "path", None) or UNMATCHED_ROUTE)
+            request_duration.observe(labels, time.perf_counter() - started)
+            requests_total.inc(labels + (str(status_code),))
+            response_size.observe(labels, body_bytes)
+            db_statements.observe(labels, counter.count)
+            db_time.observe(labels, counter.seconds)
+            if stats.auth_calls:
+                auth_time.observe(labels, stats.auth_seconds)
+            if own_counter is not None:
+                own_counter.__exit__(None, None, None)
+            _current_stats.reset(stats_token)
+
+
+def render_metrics() -> str:
+    return registry.render()
+
+
+def _format_labels(names: Tuple[str, ...], values: tuple) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{name}="{_escape(str(value))}"' for name, value in zip(names, values))
+    return "{" + pairs + "}"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value) -> str:
+    if isinstance(value, float):
+        if math.isinf(value):
+            return "+Inf" if value > 0 else "-Inf"
+        return repr(value)
+    return str(value)
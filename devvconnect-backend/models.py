@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, Float, Boolean, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, Float, Boolean, Date, DateTime, ForeignKey, Index, Table
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from database import Base
@@ -14,6 +14,24 @@ class User(Base):
     jobs = relationship("Job", back_populates="client")
     proposals = relationship("Proposal", back_populates="freelancer")
 
+# Job <-> Tag association. The primary key (job_id, tag_id) serves job -> tags lookups and
+# the (tag_id, job_id) index is the inverted index used for tag filtering (tag -> jobs).
+job_tags = Table(
+    "job_tags",
+    Base.metadata,
+    Column("job_id", Integer, ForeignKey("jobs.id", ondelete="CASCADE"), primary_key=True),
+    Column("tag_id", Integer, ForeignKey("tags.id", ondelete="CASCADE"), primary_key=True),
+    Index("ix_job_tags_tag_id_job_id", "tag_id", "job_id"),
+)
+
+class Tag(Base):
+    __tablename__ = "tags"
+
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String, unique=True, index=True, nullable=False)  # normalized, see tags.normalize_tag
+
+    jobs = relationship("Job", secondary=job_tags, back_populates="tags")
+
 class Job(Base):
     __tablename__ = "jobs"
     
@@ -25,10 +43,23 @@ class Job(Base):
     timeline = Column(String, nullable=True)
     client_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     is_open = Column(Boolean, default=True)
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)  # keyset pagination key, see pagination.py
+    closed_at = Column(DateTime, nullable=True)  # set when a review closes the job
+    # Denormalized proposal rollups for job cards, maintained with the proposal writes
+    # (see job_counters.py)
+    proposal_count = Column(Integer, nullable=False, default=0, server_default="0")
+    pending_count = Column(Integer, nullable=False, default=0, server_default="0")
+    approved_count = Column(Integer, nullable=False, default=0, server_default="0")
     
     client = relationship("User", back_populates="jobs")
     proposals = relationship("Proposal", back_populates="job")
+    tags = relationship("Tag", secondary=job_tags, back_populates="jobs")  # parsed from tech_stack
+
+    __table_args__ = (
+        # Keyset pagination (see pagination.py): every page is a range scan on one of these
+        Index("ix_jobs_created_at_id", "created_at", "id"),
+        Index("ix_jobs_is_open_created_at_id", "is_open", "created_at", "id"),
+    )
     
 class Proposal(Base):
     __tablename__ = "proposals"
@@ -41,6 +72,88 @@ class Proposal(Base):
     job_id = Column(Integer, ForeignKey("jobs.id"))
     freelancer_id = Column(Integer, ForeignKey("users.id")) # This is the correct field for the user ID
     status = Column(String, default="pending") # Added status field
+    # Dates for the client's daily stats (see client_stats.py); NULL on rows older than the columns
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=True)
+    decided_at = Column(DateTime, nullable=True)  # approved or rejected
 
     job = relationship("Job", back_populates="proposals")
-    freelancer = relationship("User", back_populates="proposals")
\ No newline at end of file
+    freelancer = relationship("User", back_populates="proposals")
+
+    __table_args__ = (
+        # One proposal per freelancer per job; applications.submit_proposal relies on it (ON CONFLICT)
+        Index("uq_proposals_job_id_freelancer_id", "job_id", "freelancer_id", unique=True),
+    )
+
+class IdempotencyKey(Base):
+    """Stored response of a POST made with an Idempotency-Key header (see idempotency.py)."""
+    __tablename__ = "idempotency_keys"
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    key = Column(String(255), nullable=False)
+    request_hash = Column(String(64), nullable=False)  # sha256 of the request body
+    status_code = Column(Integer, nullable=False)
+    response_body = Column(Text, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    __table_args__ = (
+        Index("uq_idempotency_keys_user_id_key", "user_id", "key", unique=True),
+        Index("ix_idempotency_keys_created_at", "created_at"),
+    )
+
+class CompletedMigration(Base):
+    """A one-time data migration that has finished, so startup doesn't run it again (e.g. tags.py)."""
+    __tablename__ = "completed_migrations"
+
+    name = Column(String(100), primary_key=True)
+    completed_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+class ResponseCacheVersion(Base):
+    """Version of one response cache scope, bumped by writes and shared by every worker (see response_cache.py)."""
+    __tablename__ = "response_cache_versions"
+
+    scope = Column(String(255), primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+    bumped_at = Column(DateTime, nullable=False)
+
+class StreamTicket(Base):
+    """A short-lived, single-use ticket that opens one GET /events stream (see stream_tickets.py)."""
+    __tablename__ = "stream_tickets"
+
+    digest = Column(String(64), primary_key=True)  # sha256 of the ticket; the ticket itself isn't stored
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    expires_at = Column(DateTime, nullable=False)
+
+    __table_args__ = (
+        Index("ix_stream_tickets_expires_at", "expires_at"),
+    )
+
+class OutboxTask(Base):
+    """A background task waiting to run (see tasks.py). Deleted once it has run."""
+    __tablename__ = "task_outbox"
+
+    id = Column(Integer, primary_key=True)
+    name = Column(String(100), nullable=False)
+    payload = Column(Text, nullable=False)  # JSON keyword arguments
+    status = Column(String(16), nullable=False, default="pending")  # pending, running (leased) or failed
+    attempts = Column(Integer, nullable=False, default=0)
+    run_at = Column(DateTime, nullable=False)  # when it is due; for a running task, when its lease expires
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    last_error = Column(Text, nullable=True)
+
+    __table_args__ = (
+        Index("ix_task_outbox_status_run_at", "status", "run_at"),
+    )
+
+class ClientDailyStats(Base):
+    """One client's activity on one UTC day, behind GET /client/stats (see client_stats.py)."""
+    __tablename__ = "client_daily_stats"
+
+    client_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    day = Column(Date, primary_key=True)
+    jobs_posted = Column(Integer, nullable=False, default=0, server_default="0")
+    budget_posted = Column(Float, nullable=False, default=0, server_default="0")
+    jobs_closed = Column(Integer, nullable=False, default=0, server_default="0")
+    proposals_received = Column(Integer, nullable=False, default=0, server_default="0")
+    proposals_approved = Column(Integer, nullable=False, default=0, server_default="0")
+    proposals_rejected = Column(Integer, nullable=False, default=0, server_default="0")
@@ -0,0 +1,133 @@
+# File: devvconnect-backend/pagination.py
+# Keyset (cursor) pagination helpers.
+#
+# Pages are ordered newest first by (created_at, id) and a cursor is just the
+# (created_at, id) of the row at the page edge, base64-encoded. Fetching the next page is
+# "WHERE (created_at, id) < cursor ORDER BY created_at DESC, id DESC LIMIT n", which is an
+# index range scan on a (created_at, id) index: page cost stays the same no matter how deep
+# into the table you are, unlike OFFSET.
+#
+# A NULL created_at can't take part in that comparison (nor be encoded in a cursor), so
+# jobs.created_at is NOT NULL; ensure_job_created_at() brings older databases in line.
+import base64
+import json
+import logging
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy import func, inspect, select, tuple_, update
+from sqlalchemy.orm import Query
+
+from database import DATABASE_DIALECT, engine
+from models import Job
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+PREV_CURSOR_HEADER = "X-Prev-Cursor"
+
+
+def encode_cursor(created_at: datetime, row_id: int) -> str:
+    raw = json.dumps([created_at.isoformat(), row_id], separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, row_id = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        return datetime.fromisoformat(created_at), int(row_id)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid pagination cursor")
+
+
+class Page:
+    def __init__(self, items: List, next_cursor: Optional[str], prev_cursor: Optional[str]):
+        self.items = items
+        self.next_cursor = next_cursor
+        self.prev_cursor = prev_cursor
+
+    def set_headers(self, response):
+        if self.next_cursor:
+            response.headers[NEXT_CURSOR_HEADER] = self.next_cursor
+        if self.prev_cursor:
+            response.headers[PREV_CURSOR_HEADER] = self.prev_cursor
+
+
+def keyset_paginate(query: Query, created_at_col, id_col, limit: int,
+                    after: Optional[str] = None, before: Optional[str] = None) -> Page:
+    """Return one page of `query`, newest first.
+
+    `after` continues towards older rows (the "next" page), `before` goes back towards
+    newer rows. Only one of them may be given.
+    """
+    if after and before:
+        raise HTTPException(status_code=400, detail="Use either 'after' or 'before', not both")
+    key = tuple_(created_at_col, id_col)
+
+    if before:
+        # Walk backwards in ascending order, then flip the page back to newest first
+        query = query.filter(key > tuple(decode_cursor(before)))
+        rows = query.order_by(created_at_col.asc(), id_col.asc()).limit(limit + 1).all()
+        has_more = len(rows) > limit
+        rows = list(reversed(rows[:limit]))
+        if not rows:
+            return Page([], None, None)
+        return Page(
+            rows,
+            next_cursor=_cursor_for(rows[-1]),
+            prev_cursor=_cursor_for(rows[0]) if has_more else None,
+        )
+
+    if after:
+        query = query.filter(key < tuple(decode_cursor(after)))
+    rows = query.order_by(created_at_col.desc(), id_col.desc()).limit(limit + 1).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    if not rows:
+        return Page([], None, None)
+    return Page(
+        rows,
+        next_cursor=_cursor_for(rows[-1]) if has_more else None,
+        prev_cursor=_cursor_for(rows[0]) if after else None,
+    )
+
+
+def _cursor_for(row) -> str:
+    return encode_cursor(row.created_at, row.id)
+
+
+def ensure_job_created_at():
+    """Backfill NULL jobs.created_at and make the column NOT NULL on databases created before it
+    was. Safe to call on every startup."""
+    with engine.begin() as conn:
+        oldest = conn.execute(select(func.min(Job.created_at))).scalar()
+        # Undated rows predate the ones that have a date: file them with the oldest job
+        backfilled = conn.execute(
+            update(Job).where(Job.created_at.is_(None)).values(created_at=oldest or datetime.utcnow())
+        ).rowcount
+    if backfilled:
+        logger.info("Backfilled created_at on %d jobs", backfilled)
+
+    created_at = next(column for column in inspect(engine).get_columns(Job.__tablename__) if column["name"] == "created_at")
+    if not created_at["nullable"]:
+        return
+    with engine.begin() as conn:
+        if DATABASE_DIALECT == "sqlite":
+            # SQLite can't add a constraint to an existing column; these triggers enforce it instead
+            triggers = {"jobs_created_at_not_null_insert": "INSERT", "jobs_created_at_not_null_update": "UPDATE OF created_at"}
+            existing = {name for (name,) in conn.exec_driver_sql("SELECT name FROM sqlite_master WHERE type = 'trigger'")}
+            if existing.issuperset(triggers):
+                return
+            for name, event in triggers.items():
+                conn.exec_driver_sql(
+                    f"CREATE TRIGGER IF NOT EXISTS {name} BEFORE {event} ON jobs WHEN NEW.created_at IS NULL "
+                    "BEGIN SELECT RAISE(ABORT, 'NOT NULL constraint failed: jobs.created_at'); END"
+                )
+        else:
+            conn.exec_driver_sql("ALTER TABLE jobs ALTER COLUMN created_at SET NOT NULL")
+    logger.info("jobs.created_at is now NOT NULL")
@@ -0,0 +1,171 @@
+# File: devvconnect-backend/principal_cache.py
+# Bounded in-process cache of authenticated principals.
+#
+# get_current_user used to verify the Firebase ID token (including a remote
+# revocation lookup) and query the users table on every single request. The
+# dashboards re-send the same token many times a minute, so we keep the decoded
+# claims plus a detached snapshot of the User row here, keyed by a digest of the
+# token (the raw token itself is never stored as a key).
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from sqlalchemy import event, inspect
+
+from models import User
+
+# Maximum number of cached tokens before the least recently used one is evicted
+PRINCIPAL_CACHE_MAX_ENTRIES = int(os.getenv("PRINCIPAL_CACHE_MAX_ENTRIES", "10000"))
+# Upper bound on how long an entry lives, even if the token's exp is further away
+PRINCIPAL_CACHE_MAX_TTL_SECONDS = float(os.getenv("PRINCIPAL_CACHE_MAX_TTL_SECONDS", "600"))
+# How often a cached token is re-checked against Firebase for revocation
+PRINCIPAL_CACHE_REVOCATION_CHECK_SECONDS = float(os.getenv("PRINCIPAL_CACHE_REVOCATION_CHECK_SECONDS", "60"))
+
+
+def token_digest(token: str) -> str:
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
+def snapshot_user(user: User) -> User:
+    # A transient copy of the row's columns, safe to share between requests and
+    # sessions (it is never attached to a Session, so nothing lazy-loads or flushes).
+    return User(**{column.key: getattr(user, column.key) for column in User.__table__.columns})
+
+
+class PrincipalEntry:
+    __slots__ = ("claims", "user", "expires_at", "revocation_checked_at")
+
+    def __init__(self, claims: dict, user: User, expires_at: float, revocation_checked_at: float):
+        self.claims = claims
+        self.user = user
+        self.expires_at = expires_at
+        self.revocation_checked_at = revocation_checked_at
+
+    def revocation_check_due(self, now: float = None) -> bool:
+        now = time.time() if now is None else now
+        return now - self.revocation_checked_at >= PRINCIPAL_CACHE_REVOCATION_CHECK_SECONDS
+
+
+class PrincipalCache:
+    """LRU of token digest -> PrincipalEntry with hit/miss/eviction counters."""
+
+    def __init__(self, max_entries: int = PRINCIPAL_CACHE_MAX_ENTRIES, max_ttl: float = PRINCIPAL_CACHE_MAX_TTL_SECONDS):
+        self.max_entries = max_entries
+        self.max_ttl = max_ttl
+        self._entries = OrderedDict()
+        self._digests_by_uid = {}  # firebase_uid -> set of token digests, used for invalidation
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, digest: str):
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(digest)
+            if entry is None:
+                self.misses += 1
+                return None
+            if entry.expires_at <= now:
+                self._remove(digest)
+                self.evictions += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(digest)
+            self.hits += 1
+            return entry
+
+    def uid_for(self, digest: str):
+        """The firebase_uid of a cached, unexpired token, or None. Counts no hit or miss and
+        doesn't refresh the entry (used by rate_limit.py to key requests before routing)."""
+        with self._lock:
+            entry = self._entries.get(digest)
+        if entry is None or entry.expires_at <= time.time():
+            return None
+        return entry.user.firebase_uid
+
+    def put(self, digest: str, claims: dict, user: User) -> PrincipalEntry:
+        now = time.time()
+        expires_at = now + self.max_ttl
+        token_exp = claims.get("exp")
+        if token_exp is not None:
+            expires_at = min(expires_at, float(token_exp))
+        entry = PrincipalEntry(claims, snapshot_user(user), expires_at, revocation_checked_at=now)
+        with self._lock:
+            if digest in self._entries:
+                self._remove(digest)
+            self._entries[digest] = entry
+            self._digests_by_uid.setdefault(entry.user.firebase_uid, set()).add(digest)
+            while len(self._entries) > self.max_entries:
+                oldest_digest = next(iter(self._entries))
+                self._remove(oldest_digest)
+                self.evictions += 1
+        return entry
+
+    def mark_revocation_checked(self, digest: str):
+        with self._lock:
+            entry = self._entries.get(digest)
+            if entry is not None:
+                entry.revocation_checked_at = time.time()
+
+    def invalidate_token(self, digest: str):
+        with self._lock:
+            if digest in self._entries:
+                self._remove(digest)
+                self.invalidations += 1
+
+    def invalidate_uid(self, firebase_uid: str):
+        with self._lock:
+            for digest in list(self._digests_by_uid.get(firebase_uid, ())):
+                self._remove(digest)
+                self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._digests_by_uid.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            size = len(self._entries)
+        return {
+            "size": size,
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
+
+    def _remove(self, digest: str):
+        # Caller must hold self._lock
+        entry = self._entries.pop(digest, None)
+        if entry is None:
+            return
+        digests = self._digests_by_uid.get(entry.user.firebase_uid)
+        if digests is not None:
+            digests.discard(digest)
+            if not digests:
+                del self._digests_by_uid[entry.user.firebase_uid]
+
+
+principal_cache = PrincipalCache()
+
+
+# Any write to a users row (role change, email change, delete...) drops the cached
+# principals for that firebase_uid so the next request re-reads the row.
+# Note: bulk query(User).update()/delete() bypass mapper events; call
+# principal_cache.invalidate_uid() yourself in that case.
+@event.listens_for(User, "after_insert")
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidate_user_principals(mapper, connection, target):
+    uids = {target.firebase_uid}
+    history = inspect(target).attrs.firebase_uid.history
+    uids.update(history.deleted or ())
+    for uid in uids:
+        if uid:
+            principal_cache.invalidate_uid(uid)
@@ -0,0 +1,223 @@
+# File: devvconnect-backend/rate_limit.py
+# Per-user rate limiting and admission control, applied by RateLimitMiddleware before routing.
+#
+# Every request is charged to a key:
+#   * "uid:<firebase uid>" when its bearer token is one get_current_user has already verified
+#     (looked up in principal_cache; nothing is verified here);
+#   * "ip:<client address>" otherwise, including a token's first request.
+# A forged token can't drain a real user's buckets. Behind a proxy, run uvicorn with
+# --proxy-headers so the client address is the caller's, not the proxy's.
+#
+# Each key has a token bucket for every rule below that matches the request, plus a default
+# bucket shared by all routes (RATE_LIMIT_PER_MINUTE, RATE_LIMIT_BURST). A request that finds
+# a bucket empty gets 429 with Retry-After set to the seconds until a token is back. Rules with
+# the same name share a bucket (POST /jobs and POST /client/jobs both post a job).
+#
+# Expensive routes also have a per-process concurrency cap. When that many are in flight in
+# this worker, further requests get 429 (Retry-After: RATE_LIMIT_SHED_RETRY_AFTER) at once
+# instead of queueing for a DB connection and holding everyone else's pool slots.
+#
+# Bucket state lives in a RateLimitStore. The default MemoryStore is per process, so with N
+# workers a user gets up to N times the configured rates. RATE_LIMIT_STORE names a
+# "module:attribute" store instance, class or factory shared by every worker (e.g. Redis).
+import importlib
+import logging
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, NamedTuple, Optional, Protocol, Tuple
+
+from starlette.responses import JSONResponse
+from starlette.routing import compile_path
+
+from metrics import registry as metrics_registry
+from principal_cache import principal_cache, token_digest
+
+logger = logging.getLogger(__name__)
+
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "1") != "0"
+RATE_LIMIT_STORE = os.getenv("RATE_LIMIT_STORE", "memory")
+RATE_LIMIT_PER_MINUTE = float(os.getenv("RATE_LIMIT_PER_MINUTE", "600"))  # default bucket, every route
+RATE_LIMIT_BURST = int(os.getenv("RATE_LIMIT_BURST", "100"))
+RATE_LIMIT_SHED_RETRY_AFTER = int(os.getenv("RATE_LIMIT_SHED_RETRY_AFTER", "1"))
+RATE_LIMIT_MAX_KEYS = 100_000  # MemoryStore evicts the least recently used bucket beyond this
+
+EXEMPT_PATHS = frozenset({"/", "/metrics"})  # health checks and scrapes
+
+
+class RateRule(NamedTuple):
+    name: str  # bucket name and metrics label
+    method: str
+    path: str  # route template, as in the router
+    per_minute: float
+    burst: int
+    max_concurrent: Optional[int] = None  # per process, across all users
+
+
+RATE_RULES = (
+    RateRule("apply", "POST", "/freelancer/apply/{job_id}", per_minute=20, burst=10),
+    RateRule("apply", "POST", "/proposals/proposals", per_minute=20, burst=10),
+    RateRule("post_job", "POST", "/jobs", per_minute=30, burst=10),
+    RateRule("post_job", "POST", "/client/jobs", per_minute=30, burst=10),
+    RateRule("job_batch", "POST", "/client/jobs/batch", per_minute=6, burst=3, max_concurrent=2),
+    RateRule("review", "POST", "/client/jobs/{job_id}/review", per_minute=60, burst=20),
+    RateRule("job_list", "GET", "/jobs", per_minute=120, burst=30, max_concurrent=32),
+    RateRule("search", "GET", "/jobs/search", per_minute=60, burst=20, max_concurrent=16),
+    RateRule("recommended", "GET", "/freelancer/recommended-jobs", per_minute=60, burst=20, max_concurrent=8),
+    RateRule("jobs_with_proposals", "GET", "/client/jobs-with-proposals", per_minute=60, burst=20, max_concurrent=16),
+    RateRule("export", "GET", "/client/export", per_minute=6, burst=3, max_concurrent=4),
+)
+
+DEFAULT_RULE = RateRule("default", "*", "*", per_minute=RATE_LIMIT_PER_MINUTE, burst=RATE_LIMIT_BURST)
+
+limited_total = metrics_registry.counter("rate_limited_total", "Requests answered 429, by rule and reason (rate, concurrency).", ("rule", "reason"))
+
+
+class RateLimitStore(Protocol):
+    async def take(self, key: str, rate_per_second: float, burst: int) -> float:
+        """Take one token from the bucket `key` (created full). Returns 0 if one was available,
+        else the seconds until one will be."""
+        ...
+
+    def stats(self) -> dict: ...
+
+
+class MemoryStore:
+    """Token buckets in this process: key -> [tokens, last update (monotonic)]."""
+
+    def __init__(self, max_keys: int = RATE_LIMIT_MAX_KEYS):
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    async def take(self, key: str, rate_per_second: float, burst: int) -> float:
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = [float(burst), now]
+                if len(self._buckets) > self.max_keys:
+                    self._buckets.popitem(last=False)  # an evicted bucket comes back full
+                    self.evictions += 1
+            else:
+                self._buckets.move_to_end(key)
+            tokens = min(float(burst), bucket[0] + (now - bucket[1]) * rate_per_second)
+            bucket[1] = now
+            if tokens >= 1.0:
+                bucket[0] = tokens - 1.0
+                return 0.0
+            bucket[0] = tokens
+            return (1.0 - tokens) / rate_per_second
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"keys": len(self._buckets), "evictions": self.evictions}
+
+
+def _load_store(spec: str) -> RateLimitStore:
+    if spec == "memory":
+        return MemoryStore()
+    module_name, _, attribute = spec.partition(":")
+    target = getattr(importlib.import_module(module_name), attribute)
+    store = target() if isinstance(target, type) or not hasattr(target, "take") else target
+    logger.info("Rate limit store: %s", spec)
+    return store
+
+
+def _compile_rules(rules) -> Dict[str, List[Tuple[object, RateRule]]]:
+    compiled: Dict[str, List[Tuple[object, RateRule]]] = {}
+    for rule in rules:
+        path_regex, _, _ = compile_path(rule.path)
+        compiled.setdefault(rule.method, []).append((path_regex, rule))
+    return compiled
+
+
+def request_key(scope) -> str:
+    for name, value in scope["headers"]:
+        if name == b"authorization":
+            scheme, _, credentials = value.decode("latin-1").partition(" ")
+            if scheme.lower() == "bearer" and credentials:
+                firebase_uid = principal_cache.uid_for(token_digest(credentials))
+                if firebase_uid is not None:
+                    return f"uid:{firebase_uid}"
+            break
+    client = scope.get("client")
+    return f"ip:{client[0] if client else 'unknown'}"
+
+
+class RateLimiter:
+    def __init__(self, store: RateLimitStore, rules=RATE_RULES, default_rule: RateRule = DEFAULT_RULE):
+        self.store = store
+        self.default_rule = default_rule
+        self._rules = _compile_rules(rules)
+        self._in_flight: Dict[str, int] = {}  # rule name -> requests in flight; only touched on the event loop
+
+    def match(self, method: str, path: str) -> Optional[RateRule]:
+        for path_regex, rule in self._rules.get(method, ()):
+            if path_regex.match(path):
+                return rule
+        return None
+
+    async def retry_after(self, key: str, rule: Optional[RateRule]) -> float:
+        """0 if the request may go ahead, else the seconds to wait. Charges every bucket it checks."""
+        for bucket_rule in (rule, self.default_rule) if rule is not None else (self.default_rule,):
+            wait = await self.store.take(f"{bucket_rule.name}:{key}", bucket_rule.per_minute / 60.0, bucket_rule.burst)
+            if wait:
+                limited_total.inc((bucket_rule.name, "rate"))
+                return wait
+        return 0.0
+
+    def admit(self, rule: RateRule) -> bool:
+        in_flight = self._in_flight.get(rule.name, 0)
+        if in_flight >= rule.max_concurrent:
+            limited_total.inc((rule.name, "concurrency"))
+            return False
+        self._in_flight[rule.name] = in_flight + 1
+        return True
+
+    def release(self, rule: RateRule):
+        self._in_flight[rule.name] -= 1
+
+    def stats(self) -> dict:
+        return {**self.store.stats(), "in_flight_capped": sum(self._in_flight.values())}
+
+
+rate_limiter = RateLimiter(_load_store(RATE_LIMIT_STORE))
+
+
+def too_many_requests(retry_after: float) -> JSONResponse:
+    return JSONResponse(
+        {"detail": "Too many requests, retry later."},
+        status_code=429,
+        headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+    )
+
+
+class RateLimitMiddleware:
+    def __init__(self, app, limiter: RateLimiter = None):
+        self.app = app
+        self.limiter = limiter or rate_limiter
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not RATE_LIMIT_ENABLED or scope["path"] in EXEMPT_PATHS:
+            await self.app(scope, receive, send)
+            return
+
+        rule = self.limiter.match(scope["method"], scope["path"])
+        capped = rule is not None and rule.max_concurrent is not None
+        # Shed on concurrency first, so a request turned away for load doesn't spend the user's tokens
+        if capped and not self.limiter.admit(rule):
+            await too_many_requests(RATE_LIMIT_SHED_RETRY_AFTER)(scope, receive, send)
+            return
+        try:
+            wait = await self.limiter.retry_after(request_key(scope), rule)
+            if wait:
+                await too_many_requests(wait)(scope, receive, send)
+                return
+            await self.app(scope, receive, send)
+        finally:
+            if capped:
+                self.limiter.release(rule)
@@ -0,0 +1,286 @@
+# File: devvconnect-backend/recommendations.py
+# In-process job recommendations for freelancers.
+#
+# Every open job is a sparse, L2-normalised term-frequency vector over hashed features
+# (words from the title/description plus its skill tags, which weigh more). The vectors live
+# in one CSR matrix held as three NumPy arrays, so scoring all open jobs against a
+# freelancer's profile is a single vectorised sparse mat-vec, and the top k come out of
+# np.argpartition instead of a full sort. IDF is applied on the query side from document
+# frequencies that are maintained incrementally, so adding or closing a job never requires
+# re-weighting the matrix.
+#
+# The index is built from the database on first use, then updated in place: new jobs are
+# appended and closed jobs are masked out and compacted away later, by the background tasks
+# below that job creation and reviews enqueue (see tasks.py). They are local tasks: they update
+# the index of the process that made the write. With several workers, each one also picks up
+# jobs created elsewhere every RECOMMENDATION_SYNC_SECONDS and drops closed jobs it finds when
+# loading results.
+import os
+import re
+import threading
+import time
+import zlib
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from models import Job, Proposal
+from tags import parse_tags
+from tasks import enqueue, task
+
+N_FEATURES = 1 << 18  # hashed feature space; collisions are rare enough at this size
+TITLE_WEIGHT = 2.0
+TAG_WEIGHT = 3.0
+COMPACT_DEAD_RATIO = 0.25  # compact the matrix once a quarter of its rows are closed jobs
+RECOMMENDATION_SYNC_SECONDS = float(os.getenv("RECOMMENDATION_SYNC_SECONDS", "60"))
+
+_WORD_RE = re.compile(r"[a-z0-9][a-z0-9+#.]*")
+STOPWORDS = frozenset(
+    "a an and are as at be but by for from has have i in is it its of on or our that the this "
+    "to we with will you your need needs looking help".split()
+)
+
+
+def _feature(token: str) -> int:
+    # crc32 rather than hash(): stable across processes and restarts
+    return zlib.crc32(token.encode("utf-8")) % N_FEATURES
+
+
+def text_features(title: Optional[str], description: Optional[str], tech_stack: Optional[str]) -> Dict[int, float]:
+    features: Dict[int, float] = {}
+
+    def add(token, weight):
+        key = _feature(token)
+        features[key] = features.get(key, 0.0) + weight
+
+    for source, weight in ((title, TITLE_WEIGHT), (description, 1.0)):
+        for word in _WORD_RE.findall((source or "").lower()):
+            word = word.rstrip(".")
+            if len(word) > 1 and word not in STOPWORDS:
+                add(word, weight)
+    for tag in parse_tags(tech_stack):
+        add("tag:" + tag, TAG_WEIGHT)
+    return features
+
+
+def job_features(job) -> Dict[int, float]:
+    return text_features(job.title, job.description, job.tech_stack)
+
+
+class JobVectorIndex:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._sync_lock = threading.Lock()  # one worker thread loads from the DB at a time
+        self._reset()
+
+    def _reset(self):
+        self._job_ids = np.zeros(0, dtype=np.int64)
+        self._indptr = np.zeros(1, dtype=np.int64)
+        self._indices = np.zeros(0, dtype=np.int32)
+        self._data = np.zeros(0, dtype=np.float32)
+        self._alive = np.zeros(0, dtype=bool)
+        self._row_of: Dict[int, int] = {}
+        self._doc_freq = np.zeros(N_FEATURES, dtype=np.int32)
+        self._pending: List[Tuple[int, Dict[int, float]]] = []
+        self._live_count = 0
+        self.loaded = False
+        self.max_job_id = 0
+        self.synced_at = 0.0
+
+    def __len__(self):
+        return self._live_count + len(self._pending)
+
+    # --- maintenance -------------------------------------------------------------------
+
+    def add(self, job_id: int, features: Dict[int, float]):
+        with self._lock:
+            if job_id in self._row_of or any(pending_id == job_id for pending_id, _ in self._pending):
+                return
+            self._pending.append((job_id, features))
+            self.max_job_id = max(self.max_job_id, job_id)
+
+    def add_job(self, job):
+        if self.loaded and job.is_open:
+            self.add(job.id, job_features(job))
+
+    def remove(self, job_id: int):
+        with self._lock:
+            self._pending = [(pid, f) for pid, f in self._pending if pid != job_id]
+            row = self._row_of.pop(job_id, None)
+            if row is None or not self._alive[row]:
+                return
+            self._alive[row] = False
+            self._live_count -= 1
+            start, end = self._indptr[row], self._indptr[row + 1]
+            np.subtract.at(self._doc_freq, self._indices[start:end], 1)
+            if len(self._alive) and (len(self._alive) - self._live_count) / len(self._alive) > COMPACT_DEAD_RATIO:
+                self._compact()
+
+    def rebuild(self, rows: Iterable[Tuple[int, Dict[int, float]]]):
+        rows = list(rows)
+        with self._lock:
+            self._reset()
+            self._pending = rows
+            self._flush_pending()
+            self.max_job_id = int(self._job_ids.max()) if len(self._job_ids) else 0
+            self.loaded = True
+            self.synced_at = time.time()
+
+    def _flush_pending(self):
+        # Caller holds the lock. Appends pending rows to the CSR arrays in one concatenate.
+        if not self._pending:
+            return
+        new_ids, new_indptr, new_indices, new_data = [], [], [], []
+        offset = int(self._indptr[-1])
+        for job_id, features in self._pending:
+            keys = np.fromiter(features.keys(), dtype=np.int32, count=len(features))
+            values = np.fromiter(features.values(), dtype=np.float32, count=len(features))
+            norm = float(np.sqrt(np.dot(values, values))) or 1.0
+            new_ids.append(job_id)
+            new_indices.append(keys)
+            new_data.append(values / norm)
+            offset += len(keys)
+            new_indptr.append(offset)
+        # Feature keys are unique within a job, so counting them gives document frequencies
+        self._doc_freq += np.bincount(np.concatenate(new_indices), minlength=N_FEATURES).astype(np.int32)
+        first_row = len(self._job_ids)
+        self._job_ids = np.concatenate([self._job_ids, np.asarray(new_ids, dtype=np.int64)])
+        self._indptr = np.concatenate([self._indptr, np.asarray(new_indptr, dtype=np.int64)])
+        self._indices = np.concatenate([self._indices, *new_indices])
+        self._data = np.concatenate([self._data, *new_data])
+        self._alive = np.concatenate([self._alive, np.ones(len(new_ids), dtype=bool)])
+        for i, job_id in enumerate(new_ids):
+            self._row_of[job_id] = first_row + i
+        self._live_count += len(new_ids)
+        self._pending = []
+
+    def _compact(self):
+        # Caller holds the lock. Drops closed rows from the CSR arrays.
+        keep_rows = np.flatnonzero(self._alive)
+        lengths = np.diff(self._indptr)[keep_rows]
+        starts = self._indptr[:-1][keep_rows]
+        take = np.repeat(starts - np.concatenate([[0], np.cumsum(lengths)[:-1]]), lengths) + np.arange(lengths.sum())
+        self._indices = self._indices[take]
+        self._data = self._data[take]
+        self._indptr = np.concatenate([[0], np.cumsum(lengths)]).astype(np.int64)
+        self._job_ids = self._job_ids[keep_rows]
+        self._alive = np.ones(len(keep_rows), dtype=bool)
+        self._row_of = {int(job_id): row for row, job_id in enumerate(self._job_ids)}
+
+    # --- scoring -----------------------------------------------------------------------
+
+    def top_k(self, query: Dict[int, float], k: int, exclude_job_ids: Iterable[int] = ()) -> List[Tuple[int, float]]:
+        if not query or k <= 0:
+            return []
+        with self._lock:
+            self._flush_pending()
+            n_rows = len(self._job_ids)
+            if n_rows == 0 or self._live_count == 0:
+                return []
+            keys = np.fromiter(query.keys(), dtype=np.int64, count=len(query))
+            values = np.fromiter(query.values(), dtype=np.float32, count=len(query))
+            idf = np.log((1.0 + self._live_count) / (1.0 + self._doc_freq[keys])).astype(np.float32) + 1.0
+            weights = np.zeros(N_FEATURES, dtype=np.float32)
+            weights[keys] = values * idf * idf
+
+            # Sparse mat-vec: per-nonzero products, summed per row with reduceat
+            products = np.append(self._data * weights[self._indices], np.float32(0))
+            scores = np.add.reduceat(products, self._indptr[:-1])
+            scores[self._indptr[:-1] == self._indptr[1:]] = 0.0  # reduceat quirk for empty rows
+            scores[~self._alive] = -np.inf
+            for job_id in exclude_job_ids:
+                row = self._row_of.get(job_id)
+                if row is not None:
+                    scores[row] = -np.inf
+
+            k = min(k, n_rows)
+            candidates = np.argpartition(-scores, k - 1)[:k]
+            candidates = candidates[np.argsort(-scores[candidates], kind="stable")]
+            return [
+                (int(self._job_ids[row]), float(scores[row]))
+                for row in candidates
+                if scores[row] > 0 and np.isfinite(scores[row])
+            ]
+
+    # --- database sync -----------------------------------------------------------------
+
+    def ensure_synced(self, db: Session):
+        if self.loaded and time.time() - self.synced_at < RECOMMENDATION_SYNC_SECONDS:
+            return
+        with self._sync_lock:
+            self._sync(db)
+
+    def _sync(self, db: Session):
+        if not self.loaded:
+            rows = db.query(Job.id, Job.title, Job.description, Job.tech_stack).filter(Job.is_open == True)
+            self.rebuild((row.id, text_features(row.title, row.description, row.tech_stack)) for row in rows.yield_per(2000))
+            return
+        if time.time() - self.synced_at < RECOMMENDATION_SYNC_SECONDS:
+            return
+        # Jobs created by other workers since we last looked
+        rows = (
+            db.query(Job.id, Job.title, Job.description, Job.tech_stack)
+            .filter(Job.is_open == True, Job.id > self.max_job_id)
+            .order_by(Job.id)
+            .all()
+        )
+        for row in rows:
+            self.add(row.id, text_features(row.title, row.description, row.tech_stack))
+        self.synced_at = time.time()
+
+
+recommendation_index = JobVectorIndex()
+
+
+def queue_index_update(db: Session, new_job_ids: Iterable[int] = (), closed_job_id: Optional[int] = None):
+    """Update the index once `db`'s transaction commits: add new jobs, drop a closed one."""
+    new_job_ids = list(new_job_ids)
+    if new_job_ids:
+        enqueue(db, "recommendations.add_jobs", job_ids=new_job_ids)
+    if closed_job_id is not None:
+        enqueue(db, "recommendations.remove_job", job_id=closed_job_id)
+
+
+@task("recommendations.add_jobs", local=True)
+def index_new_jobs(job_ids: List[int]):
+    if not recommendation_index.loaded:
+        return  # they are read with the rest when the index is built
+    from database import SessionLocal
+
+    with SessionLocal() as db:
+        rows = db.query(Job.id, Job.title, Job.description, Job.tech_stack).filter(Job.id.in_(job_ids), Job.is_open == True)
+        for row in rows:
+            recommendation_index.add(row.id, text_features(row.title, row.description, row.tech_stack))
+
+
+@task("recommendations.remove_job", local=True)
+def unindex_closed_job(job_id: int):
+    recommendation_index.remove(job_id)
+
+
+def warm_recommendation_index():
+    # Started in a background thread at app startup so the first request doesn't pay for the build
+    from database import SessionLocal
+
+    with SessionLocal() as db:
+        recommendation_index.ensure_synced(db)
+
+
+def freelancer_profile(db: Session, user, skills: Optional[str] = None) -> Dict[int, float]:
+    """Query vector for a freelancer: explicit skills if given, else the jobs they were approved for,
+    else every job they applied to."""
+    if skills:
+        return text_features(None, skills, skills)
+    for statuses in (("approved",), None):
+        query = db.query(Job.title, Job.description, Job.tech_stack).join(Proposal, Proposal.job_id == Job.id)
+        query = query.filter(Proposal.freelancer_id == user.id)
+        if statuses:
+            query = query.filter(Proposal.status.in_(statuses))
+        profile: Dict[int, float] = {}
+        for row in query.limit(50).all():
+            for key, value in text_features(row.title, row.description, row.tech_stack).items():
+                profile[key] = profile.get(key, 0.0) + value
+        if profile:
+            return profile
+    return {}
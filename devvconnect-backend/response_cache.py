@@ -0,0 +1,276 @@
+# File: devvconnect-backend/response_cache.py
+# ETag-validated response cache for the job listing endpoints.
+#
+# Each cache scope ("jobs" for the public listings, "client:<id>" for one client's
+# dashboard) has a version that write handlers bump after they commit. A response's strong
+# ETag is derived from (scope, version, path + query string) alone, so:
+#   * If-None-Match with the current ETag -> 304 after reading the scope's version, without
+#     running the listing's queries or serializing anything;
+#   * otherwise the serialized body is served from a size-bounded LRU if it's there, or built,
+#     stored and returned.
+# The versions live in a ScopeVersionStore. The default DatabaseVersionStore keeps them in the
+# response_cache_versions table (one primary-key read per cached GET, one upsert per write),
+# so a bump by any worker retires every worker's ETags and cached bodies at once. The cached
+# bodies themselves are per worker; one built for an older version is never served.
+# RESPONSE_CACHE_VERSIONS=memory keeps versions in the process instead: only correct with a
+# single worker. A "module:attribute" names any other shared store (e.g. Redis).
+# With a read replica (DATABASE_READ_URL) a body built right after a bump may come from a replica
+# that hasn't caught up yet, so for READ_AFTER_WRITE_SECONDS after a bump the scope is served
+# uncached and without an ETag; the first build after that becomes the cached version.
+import hashlib
+import importlib
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Callable, Iterable, Optional, Protocol, Tuple
+
+import orjson
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
+from starlette.concurrency import run_in_threadpool
+
+from database import DATABASE_DIALECT, DATABASE_READ_URL, READ_AFTER_WRITE_SECONDS, engine
+from models import ResponseCacheVersion
+
+logger = logging.getLogger(__name__)
+
+RESPONSE_CACHE_MAX_BYTES = int(os.getenv("RESPONSE_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+# A single body bigger than this is served but not cached
+RESPONSE_CACHE_MAX_ENTRY_BYTES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRY_BYTES", str(1024 * 1024)))
+RESPONSE_CACHE_VERSIONS = os.getenv("RESPONSE_CACHE_VERSIONS", "database")
+
+PUBLIC_JOBS_SCOPE = "jobs"
+
+_UPSERT_INSERTS = {"sqlite": sqlite.insert, "postgresql": postgresql.insert}
+
+
+def client_scope(client_id: int) -> str:
+    return f"client:{client_id}"
+
+
+class ScopeVersionStore(Protocol):
+    async def get(self, scope: str) -> Tuple[int, Optional[datetime]]:
+        """(version, when it was last bumped) of `scope`; (0, None) if it never was."""
+        ...
+
+    async def bump(self, scopes: Iterable[str]): ...
+
+
+class MemoryVersionStore:
+    """Versions in this process. Other workers never see its bumps: single worker only."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._versions = {}  # scope -> (version, bumped_at)
+        # Stands in for "never bumped", so a restarted process doesn't reissue old ETags
+        self._started_at = datetime.utcnow()
+
+    async def get(self, scope: str):
+        with self._lock:
+            return self._versions.get(scope, (0, self._started_at))
+
+    async def bump(self, scopes):
+        now = datetime.utcnow()
+        with self._lock:
+            for scope in scopes:
+                self._versions[scope] = (self._versions.get(scope, (0, None))[0] + 1, now)
+
+
+class DatabaseVersionStore:
+    """Versions in the response_cache_versions table, shared by every worker."""
+
+    async def get(self, scope: str):
+        return await run_in_threadpool(self._get, scope)
+
+    async def bump(self, scopes):
+        await run_in_threadpool(self._bump, sorted(set(scopes)))  # sorted: concurrent bumps lock rows in one order
+
+    def _get(self, scope: str):
+        # Always the primary: a lagging replica would hand out the version from before a write
+        with engine.connect() as conn:
+            row = conn.execute(
+                select(ResponseCacheVersion.version, ResponseCacheVersion.bumped_at).where(ResponseCacheVersion.scope == scope)
+            ).first()
+        return (row.version, row.bumped_at) if row is not None else (0, None)
+
+    def _bump(self, scopes):
+        table = ResponseCacheVersion.__table__
+        now = datetime.utcnow()
+        dialect_insert = _UPSERT_INSERTS.get(DATABASE_DIALECT)
+        with engine.begin() as conn:
+            for scope in scopes:
+                if dialect_insert is not None:
+                    statement = dialect_insert(table).values(scope=scope, version=1, bumped_at=now)
+                    conn.execute(statement.on_conflict_do_update(
+                        index_elements=["scope"], set_={"version": table.c.version + 1, "bumped_at": now},
+                    ))
+                    continue
+                # Without ON CONFLICT: bump the row, or create it
+                if not conn.execute(
+                    update(table).where(table.c.scope == scope).values(version=table.c.version + 1, bumped_at=now)
+                ).rowcount:
+                    try:
+                        with conn.begin_nested():
+                            conn.execute(table.insert().values(scope=scope, version=1, bumped_at=now))
+                    except IntegrityError:
+                        # Created concurrently: bump that row instead
+                        conn.execute(update(table).where(table.c.scope == scope).values(version=table.c.version + 1, bumped_at=now))
+
+
+def _load_version_store(spec: str) -> ScopeVersionStore:
+    if spec == "database":
+        return DatabaseVersionStore()
+    if spec == "memory":
+        return MemoryVersionStore()
+    module_name, _, attribute = spec.partition(":")
+    target = getattr(importlib.import_module(module_name), attribute)
+    store = target() if isinstance(target, type) or not hasattr(target, "bump") else target
+    logger.info("Response cache version store: %s", spec)
+    return store
+
+
+class _HeaderCarrier:
+    # Handed to the build function so it can set extra headers (e.g. pagination cursors)
+    def __init__(self):
+        self.headers = {}
+
+
+class ResponseCache:
+    def __init__(
+        self,
+        versions: ScopeVersionStore,
+        max_bytes: int = RESPONSE_CACHE_MAX_BYTES,
+        max_entry_bytes: int = RESPONSE_CACHE_MAX_ENTRY_BYTES,
+        settle_seconds: float = 0.0,
+    ):
+        self.versions = versions
+        self.max_bytes = max_bytes
+        self.max_entry_bytes = max_entry_bytes
+        self.settle_seconds = settle_seconds
+        self._entries = OrderedDict()  # key -> (scope, etag, body, headers)
+        self._keys_by_scope = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    async def bump(self, *scopes: str):
+        """Call after committing a write that changes what `scopes` would return."""
+        await self.versions.bump(scopes)
+        with self._lock:
+            # This worker's bodies for the old versions; other workers' stop matching their ETag
+            for scope in scopes:
+                self._drop_scope(scope)
+
+    def _drop_scope(self, scope: str):
+        for key in self._keys_by_scope.pop(scope, ()):
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                self._bytes -= len(entry[2])
+                self.invalidations += 1
+
+    async def respond(self, request: Request, scope: str, build: Callable, private: bool = False) -> Response:
+        """Serve `await build(headers)` for this request through the cache.
+
+        `build` receives an object with a `headers` dict it may fill in and returns (an awaitable
+        of) the content, ideally plain dicts/lists of JSON types and datetimes, which orjson
+        serializes directly; anything else goes through jsonable_encoder. It is only called on a
+        cache miss.
+        """
+        version, bumped_at = await self.versions.get(scope)
+        if self.settle_seconds and bumped_at is not None and (datetime.utcnow() - bumped_at).total_seconds() < self.settle_seconds:
+            carrier = _HeaderCarrier()
+            content = await build(carrier)
+            return Response(content=self._serialize(content), media_type="application/json", headers={**carrier.headers, "Cache-Control": "no-store"})
+
+        key = f"{scope}|{request.url.path}|{request.url.query}"
+        etag = _etag_for(key, version, bumped_at)
+        cache_headers = {"ETag": etag, "Cache-Control": "private, no-cache" if private else "no-cache"}
+
+        if _etag_matches(request.headers.get("if-none-match"), etag):
+            with self._lock:
+                self.not_modified += 1
+            return Response(status_code=304, headers=cache_headers)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] == etag:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return Response(content=entry[2], media_type="application/json", headers={**entry[3], **cache_headers})
+            self.misses += 1
+
+        carrier = _HeaderCarrier()
+        content = await build(carrier)
+        body = self._serialize(content)
+        self._store(key, scope, etag, body, carrier.headers)
+        return Response(content=body, media_type="application/json", headers={**carrier.headers, **cache_headers})
+
+    @staticmethod
+    def _serialize(content) -> bytes:
+        return orjson.dumps(content, default=jsonable_encoder, option=orjson.OPT_NON_STR_KEYS)
+
+    def _store(self, key, scope, etag, body, headers):
+        # A body built while another worker bumped the scope is stored under the ETag of the
+        # version read before the build, which no longer matches: it is never served
+        if len(body) > self.max_entry_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= len(old[2])
+            self._entries[key] = (scope, etag, body, dict(headers))
+            self._keys_by_scope.setdefault(scope, set()).add(key)
+            self._bytes += len(body)
+            while self._bytes > self.max_bytes and self._entries:
+                old_key, (old_scope, _, old_body, _) = self._entries.popitem(last=False)
+                self._bytes -= len(old_body)
+                self._keys_by_scope.get(old_scope, set()).discard(old_key)
+                self.evictions += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses + self.not_modified
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "not_modified": self.not_modified,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                # 304s and body hits both skipped the listing queries
+                "hit_ratio": round((self.hits + self.not_modified) / lookups, 4) if lookups else 0.0,
+            }
+
+
+def _etag_for(key: str, version: int, bumped_at: Optional[datetime]) -> str:
+    # bumped_at keeps ETags unique if the versions ever start over (a new table, a new process
+    # with the memory store)
+    stamp = bumped_at.isoformat() if bumped_at is not None else ""
+    digest = hashlib.sha1(f"{key}|{version}|{stamp}".encode("utf-8")).hexdigest()[:20]
+    return f'"{version}-{digest}"'
+
+
+def _etag_matches(if_none_match, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = [candidate.strip() for candidate in if_none_match.split(",")]
+    return etag in candidates or f"W/{etag}" in candidates
+
+
+response_cache = ResponseCache(
+    _load_version_store(RESPONSE_CACHE_VERSIONS), settle_seconds=READ_AFTER_WRITE_SECONDS if DATABASE_READ_URL else 0.0
+)
@@ -1,17 +1,26 @@
 # File: devvconnect-backend/routes/auth.py
-from fastapi import APIRouter, Depends, HTTPException, status
+import asyncio
+import logging
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.orm import Session
 # from jose import JWTError, jwt # Not used in this specific get_current_user for Firebase tokens
 import firebase_admin
-from firebase_admin import auth as firebase_auth_admin # Aliased to avoid conflicts
 # from firebase_admin import credentials # Not directly used here if firebase_auth.py initializes
 
-from database import get_db
+from database import SessionRunner, get_session
 from models import User
+from auth_executor import auth_executor, ExecutorSaturatedError
+from principal_cache import principal_cache, snapshot_user, token_digest
+from stream_tickets import consume_stream_ticket
+from metrics import auth_timer
 # Assuming your separate 'firebase_auth.py' file handles SDK initialization.
 # Importing it ensures its top-level code (initialization) runs.
 import firebase_auth as firebase_auth_initializer_module 
+from firebase_auth import RevocationCheckUnavailableError, verify_id_token # Single verifier shared by every route (local RS256 check + revocation)
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
@@ -19,10 +28,34 @@ router = APIRouter()
 # The tokenUrl is for OpenAPI documentation; not directly used by this Firebase token verification.
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token") 
 
-async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
-    # This very first print will tell us if the function is entered at all with a token from the dependency.
-    print(f"====== get_current_user: ENTERED. Token received by oauth2_scheme (first 20 chars if str): {token[:20] if token and isinstance(token, str) else 'TOKEN IS NONE or NOT A STRING'} ======")
+async def get_current_user(request: Request, token: str = Depends(oauth2_scheme), db: SessionRunner = Depends(get_session)):
+    return await authenticate(request, token, db)
+
+async def get_current_user_from_ticket(
+    request: Request,
+    ticket: Optional[str] = Query(None, description="Single-use ticket from POST /events/ticket, for clients that can't set headers (EventSource)"),
+    db: SessionRunner = Depends(get_session),
+):
+    # A stream ticket (see stream_tickets.py), never an ID token, in the query string; without
+    # one, the same checks as get_current_user on the Authorization header
+    if ticket is None:
+        scheme, _, credentials = request.headers.get("authorization", "").partition(" ")
+        return await authenticate(request, credentials if scheme.lower() == "bearer" else None, db)
+    user = await db.run_sync(_consume_ticket, ticket)
+    if user is None:
+        logger.info("get_current_user: unknown, used or expired stream ticket rejected")
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Stream ticket is invalid, used, or expired.")
+    request.state.firebase_uid = user.firebase_uid # For read-your-writes routing (database.py)
+    return user
+
+def _consume_ticket(session: Session, ticket: str):
+    user_id = consume_stream_ticket(session, ticket)
+    if user_id is None:
+        return None
+    user = session.get(User, user_id)
+    return snapshot_user(user) if user is not None else None
 
+async def authenticate(request: Request, token: Optional[str], db: SessionRunner):
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials (token is invalid, expired, or revoked).",
@@ -34,49 +67,87 @@ async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = De
     )
 
     if not token or not isinstance(token, str): # Extra check if token wasn't provided by scheme
-        print(f"====== get_current_user: Token provided by oauth2_scheme is problematic (None or not string). Raising 401. ======")
+        logger.debug("get_current_user: no bearer token in request")
         raise credentials_exception
 
+    # Fast path: this exact token was verified recently and its user row is cached.
+    digest = token_digest(token)
+    cached_principal = principal_cache.get(digest)
+
     try:
-        print(f"-------------------get_current_user (inside try)-----------------------")
-        print(f"Attempting to verify Firebase ID token (first 20 chars): {token[:20]}...")
-        
-        # Verify the ID token using Firebase Admin SDK
-        decoded_token = firebase_auth_admin.verify_id_token(token, check_revoked=True)
+        if cached_principal is not None:
+            request.state.firebase_uid = cached_principal.user.firebase_uid # For read-your-writes routing (database.py)
+            if not cached_principal.revocation_check_due():
+                return cached_principal.user
+            # Periodically re-check revocation for cached tokens; the users query is still skipped.
+            logger.debug("get_current_user: revocation re-check for cached uid=%s", cached_principal.user.firebase_uid)
+            with auth_timer():
+                await auth_executor.run(verify_id_token, token, check_revoked=True)
+            principal_cache.mark_revocation_checked(digest)
+            return cached_principal.user
+
+        # Verify the ID token (signature/claims checked in-process, revocation via Firebase)
+        # Runs on the dedicated auth executor: the revocation check is blocking network I/O
+        with auth_timer():
+            decoded_token = await auth_executor.run(verify_id_token, token, check_revoked=True)
         firebase_uid = decoded_token.get("uid")
         
         if firebase_uid is None:
-            print(f"Firebase UID is None in decoded token. Decoded token: {decoded_token}")
+            logger.warning("get_current_user: verified token has no uid claim")
             raise credentials_exception # Should be caught by the more generic exception below if this happens
         
-        print(f"Successfully verified token. Firebase UID from token: '{firebase_uid}'")
+        logger.debug("get_current_user: token verified for uid=%s", firebase_uid)
+        request.state.firebase_uid = firebase_uid
 
     except firebase_admin.auth.RevokedIdTokenError:
-        print(f"Firebase ID token has been revoked for UID: {decoded_token.get('uid', 'unknown') if 'decoded_token' in locals() else 'unknown'}.")
+        logger.info("get_current_user: revoked token rejected")
+        if cached_principal is not None:
+            principal_cache.invalidate_uid(cached_principal.user.firebase_uid)
         raise credentials_exception 
     except firebase_admin.auth.UserDisabledError:
-        print(f"Firebase user account is disabled for UID: {decoded_token.get('uid', 'unknown') if 'decoded_token' in locals() else 'unknown'}.")
+        logger.info("get_current_user: token for a disabled account rejected")
+        if cached_principal is not None:
+            principal_cache.invalidate_uid(cached_principal.user.firebase_uid)
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="User account is disabled.")
     except firebase_admin.auth.InvalidIdTokenError as e:
-        print(f"Invalid Firebase ID token received: {e}")
+        logger.info("get_current_user: invalid token rejected (%s)", type(e).__name__)
+        principal_cache.invalidate_token(digest)
         raise credentials_exception
+    except HTTPException:
+        raise
+    except RevocationCheckUnavailableError:
+        # Misconfigured (no Admin SDK): refuse rather than accept tokens that might be revoked
+        logger.error("get_current_user: revocation check unavailable, the Firebase Admin SDK is not initialized")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Token verification is unavailable: the server can't check token revocation.",
+        )
+    except (asyncio.TimeoutError, ExecutorSaturatedError) as e:
+        logger.warning("get_current_user: token verification unavailable (%s); auth executor stats: %s", type(e).__name__, auth_executor.stats())
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Token verification is temporarily unavailable. Please retry.",
+            headers={"Retry-After": "1"},
+        )
     except Exception as e: 
         # This will catch other errors during token verification, like network issues to Firebase, etc.
-        print(f"An unexpected error occurred during Firebase token verification: {type(e).__name__} - {e}")
+        logger.exception("get_current_user: unexpected error during token verification")
         raise credentials_exception
 
     # If token verification was successful and firebase_uid was extracted:
-    print(f"Querying database for user with firebase_uid: '{firebase_uid}'")
-    user = db.query(User).filter(User.firebase_uid == firebase_uid).first()
+    user = await db.run_sync(_load_user, firebase_uid)
 
     if user is None:
-        print(f"User with firebase_uid '{firebase_uid}' NOT FOUND in local database.")
-        print("-------------------get_current_user END (User Not Found in DB)-----")
+        logger.info("get_current_user: no local user for uid=%s", firebase_uid)
         raise user_not_found_in_db_exception
     
-    print(f"User with firebase_uid '{firebase_uid}' FOUND in database: ID={user.id}, Email='{user.email}', Role='{user.role}'")
-    print("-------------------get_current_user END (User Found)---------")
-    return user
+    logger.debug("get_current_user: resolved uid=%s to user_id=%s role=%s", firebase_uid, user.id, user.role)
+    # Hand out the cache's detached snapshot, like the cached path does: it stays readable after
+    # the handler commits (nothing to lazy-load, which an async session couldn't do implicitly)
+    return principal_cache.put(digest, decoded_token, user).user
+
+def _load_user(session: Session, firebase_uid: str):
+    return session.query(User).filter(User.firebase_uid == firebase_uid).first()
 
 # Note: This auth.py does not define any routes itself if it's only for the get_current_user dependency.
 # The router = APIRouter() might be unused here if no routes like /token are defined in this file.
\ No newline at end of file
@@ -1,65 +1,128 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from .auth import get_current_user, get_db
+from fastapi import APIRouter, Body, Depends, Header, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
+from sqlalchemy.orm import Session, selectinload
+from .auth import get_current_user
+from .jobs import add_job, insert_job, insert_jobs, job_columns, job_created, job_dicts, job_fields, jobs_created
+from applications import JobNotFoundError, NotJobOwnerError, UnknownProposalsError, apply_review, review_proposals
+from client_stats import DEFAULT_STATS_DAYS, MAX_STATS_DAYS, client_stats
+from database import SessionRunner, get_read_session, get_session
+from exports import EXPORT_MEDIA_TYPES, stream_export
+from idempotency import IDEMPOTENCY_KEY_HEADER, run_idempotent, validate_idempotency_key
 from models import User, Job, Proposal
-from schemas import JobCreate # Assuming JobCreate might be used for other client routes, keeping it
+from response_cache import PUBLIC_JOBS_SCOPE, client_scope, response_cache
+from schemas import MAX_JOB_BATCH, ClientStatsRead, JobBatchResult, JobCreate, JobRead, JobWithProposals, ProposalResponse, ProposalReview, ProposalReviewResult # Assuming JobCreate might be used for other client routes, keeping it
+from typing import Any, List, Literal, Optional, Tuple
 
 router = APIRouter(
     prefix="/client",
     tags=["client"],
 )
 
-@router.post("/jobs")
-def create_job(job: JobCreate, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+@router.post("/jobs", response_model=JobRead)
+async def create_job(
+    job: JobCreate,
+    db: SessionRunner = Depends(get_session),
+    current_user: User = Depends(get_current_user),
+    idempotency_key: Optional[str] = Header(None, alias=IDEMPOTENCY_KEY_HEADER),
+):
     # Check if user is a client
     if current_user.role != "client":
         raise HTTPException(status_code=403, detail="Not authorized")
     
-    # Create new job
-    # Note: Assuming JobCreate schema might not have tech_stack and timeline,
-    # or they are optional and default to None if not provided by JobCreate.
-    # The Job model allows them to be nullable.
-    new_job = Job(
-        title=job.title,
-        description=job.description,
-        budget=job.budget,
-        tech_stack=getattr(job, 'tech_stack', None), # Safely access tech_stack
-        timeline=getattr(job, 'timeline', None),   # Safely access timeline
-        client_id=current_user.id,
-        is_open=True
-    )
-    db.add(new_job)
-    db.commit()
-    db.refresh(new_job)
-    return new_job
+    # Create new job (tech_stack and timeline are optional and nullable)
+    if idempotency_key is None:
+        new_job = await db.run_sync(insert_job, job, current_user.id)
+        await job_created(new_job)
+        return new_job
+
+    # Retries with the same key get the first response back instead of a second job
+    validate_idempotency_key(idempotency_key)
+    client_id = current_user.id
+    stored, new_job = await db.run_sync(run_idempotent, client_id, idempotency_key, job, lambda session: add_job(session, job, client_id))
+    if new_job is not None:
+        await job_created(new_job)
+    return stored.to_response(replayed=new_job is None)
 
-@router.get("/jobs")
-def get_client_jobs(db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+@router.post("/jobs/batch", response_model=JobBatchResult)
+async def create_jobs_batch(
+    jobs: List[Any] = Body(..., max_length=MAX_JOB_BATCH),
+    db: SessionRunner = Depends(get_session),
+    current_user: User = Depends(get_current_user),
+):
     # Check if user is a client
     if current_user.role != "client":
         raise HTTPException(status_code=403, detail="Not authorized")
-    
-    # Get jobs posted by this client
-    jobs = db.query(Job).filter(Job.client_id == current_user.id).all()
-    return jobs
 
-@router.get("/jobs-with-proposals")
-def get_jobs_with_proposals(db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+    # Items are validated one by one so a bad posting is reported by index instead of failing
+    # the whole import; the valid ones are inserted together in one transaction
+    valid, errors = [], []
+    for index, item in enumerate(jobs):
+        try:
+            valid.append((index, JobCreate.model_validate(item)))
+        except ValidationError as exc:
+            errors.append({"index": index, "errors": exc.errors(include_url=False, include_context=False, include_input=False)})
+
+    new_jobs = await db.run_sync(insert_jobs, [job for _, job in valid], current_user.id)
+    if new_jobs:
+        await jobs_created(new_jobs, current_user.id)
+    return {
+        "created": [{"index": index, "id": new_job.id} for (index, _), new_job in zip(valid, new_jobs)],
+        "errors": errors,
+    }
+
+@router.get("/jobs", response_model=List[JobRead])
+async def get_client_jobs(
+    request: Request,
+    fields: Tuple[str, ...] = Depends(job_fields),
+    db: SessionRunner = Depends(get_read_session),
+    current_user: User = Depends(get_current_user),
+):
     # Check if user is a client
     if current_user.role != "client":
         raise HTTPException(status_code=403, detail="Not authorized")
     
-    # Get jobs with their proposals
-    jobs = db.query(Job).filter(Job.client_id == current_user.id).all()
+    # Get jobs posted by this client (ETag-validated per client, see response_cache.py)
+    return await response_cache.respond(
+        request,
+        client_scope(current_user.id),
+        lambda response: db.run_sync(_client_jobs, current_user.id, fields),
+        private=True,
+    )
+
+def _client_jobs(db: Session, client_id: int, fields: Tuple[str, ...]):
+    # Only the requested columns, serialized straight from the rows (see job_fields)
+    return job_dicts(db.query(*job_columns(fields)).filter(Job.client_id == client_id).all(), fields)
+
+@router.get("/jobs-with-proposals", response_model=List[JobWithProposals])
+async def get_jobs_with_proposals(request: Request, db: SessionRunner = Depends(get_read_session), current_user: User = Depends(get_current_user)):
+    # Check if user is a client
+    if current_user.role != "client":
+        raise HTTPException(status_code=403, detail="Not authorized")
+
+    # Shares the client's cache scope: any job/proposal write for this client invalidates it
+    return await response_cache.respond(
+        request,
+        client_scope(current_user.id),
+        lambda response: db.run_sync(_build_jobs_with_proposals, current_user),
+        private=True,
+    )
+
+def _build_jobs_with_proposals(db: Session, current_user: User):
+    # Get jobs with their proposals and each proposal's freelancer in a constant number of
+    # queries (jobs, proposals IN (...), users IN (...)) instead of one query per job/proposal.
+    jobs = (
+        db.query(Job)
+        .options(selectinload(Job.proposals).selectinload(Proposal.freelancer))
+        .filter(Job.client_id == current_user.id)
+        .all()
+    )
     
     result = []
     for job_item in jobs: # Renamed job to job_item to avoid conflict with models.Job
-        proposals_query = db.query(Proposal).filter(Proposal.job_id == job_item.id).all()
-        
         proposals_with_freelancer = []
-        for proposal_item in proposals_query: # Renamed proposal to proposal_item
-            # Fetch freelancer using proposal_item.freelancer_id
-            freelancer = db.query(User).filter(User.id == proposal_item.freelancer_id).first()
+        for proposal_item in job_item.proposals: # Renamed proposal to proposal_item
+            freelancer = proposal_item.freelancer # Already loaded by selectinload
             proposal_dict = {
                 "id": proposal_item.id,
                 "job_id": proposal_item.job_id,
@@ -83,31 +146,105 @@ def get_jobs_with_proposals(db: Session = Depends(get_db), current_user: User =
             "title": job_item.title,
             "description": job_item.description,
             "budget": job_item.budget,
+            "proposal_count": job_item.proposal_count,
+            "pending_count": job_item.pending_count,
+            "approved_count": job_item.approved_count,
             "proposals": proposals_with_freelancer
         }
         result.append(job_dict)
     
     return result
 
-@router.post("/proposals/{proposal_id}/approve")
-def approve_proposal_route(proposal_id: int, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)): # Renamed function
+@router.post("/jobs/{job_id}/review", response_model=ProposalReviewResult)
+async def review_job_proposals(job_id: int, review: ProposalReview, db: SessionRunner = Depends(get_session), current_user: User = Depends(get_current_user)):
     # Check if user is a client
     if current_user.role != "client":
         raise HTTPException(status_code=403, detail="Not authorized")
+
+    # All decisions, rejecting the other pending proposals and closing the job commit together
+    approve = [decision.proposal_id for decision in review.decisions if decision.status == "approved"]
+    reject = [decision.proposal_id for decision in review.decisions if decision.status == "rejected"]
+    try:
+        result = await db.run_sync(review_proposals, job_id, current_user.id, approve, reject, review.reject_pending, review.close_job)
+    except JobNotFoundError:
+        raise HTTPException(status_code=404, detail="Job not found")
+    except NotJobOwnerError:
+        raise HTTPException(status_code=403, detail="Not authorized to review this job")
+    except UnknownProposalsError as exc:
+        raise HTTPException(status_code=404, detail=f"Proposals not found for this job: {exc.proposal_ids}")
+    await _review_applied(current_user.id)
+
+    return {"job_id": job_id, "approved": result.approved, "rejected": result.rejected, "job_closed": result.job_closed}
+
+@router.get("/stats", response_model=ClientStatsRead)
+async def get_client_stats(
+    days: int = Query(DEFAULT_STATS_DAYS, ge=1, le=MAX_STATS_DAYS),
+    db: SessionRunner = Depends(get_read_session),
+    current_user: User = Depends(get_current_user),
+):
+    # Check if user is a client
+    if current_user.role != "client":
+        raise HTTPException(status_code=403, detail="Not authorized")
+
+    # Read from the client's daily summary rows, not from every job and proposal (see client_stats.py)
+    return await db.run_sync(client_stats, current_user.id, days)
+
+@router.get("/export")
+async def export_jobs(
+    request: Request,
+    format: Literal["ndjson", "csv"] = Query("ndjson"),
+    current_user: User = Depends(get_current_user),
+):
+    # Check if user is a client
+    if current_user.role != "client":
+        raise HTTPException(status_code=403, detail="Not authorized")
+
+    # Streamed in batches from a server-side cursor on its own session (see exports.py)
+    filename = f"devvconnect-jobs-{current_user.id}.{format}"
+    return StreamingResponse(
+        stream_export(current_user.id, format, getattr(request.state, "firebase_uid", None)),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"', "Cache-Control": "no-store"},
+    )
+
+@router.post("/proposals/{proposal_id}/approve", response_model=ProposalResponse)
+async def approve_proposal_route(proposal_id: int, db: SessionRunner = Depends(get_session), current_user: User = Depends(get_current_user)): # Renamed function
+    # Check if user is a client
+    if current_user.role != "client":
+        raise HTTPException(status_code=403, detail="Not authorized")
+
+    # Approves this one proposal only; the job stays open and its other proposals are untouched
+    # (rejecting the rest and closing the job is POST /client/jobs/{job_id}/review)
+    proposal_to_approve = await db.run_sync(_approve_proposal, proposal_id, current_user.id)
+    await _review_applied(current_user.id)
     
-    # Get the proposal
-    proposal_to_approve = db.query(Proposal).filter(Proposal.id == proposal_id).first() # Renamed variable
-    if not proposal_to_approve:
+    return {"message": "Proposal approved", "proposal": proposal_to_approve}
+
+def _approve_proposal(db: Session, proposal_id: int, client_id: int):
+    # Get the proposal and its job's owner in one query
+    row = (
+        db.query(Proposal, Job.client_id, Job.is_open)
+        .join(Job, Job.id == Proposal.job_id)
+        .filter(Proposal.id == proposal_id)
+        .with_for_update(of=Job)
+        .first()
+    )
+    if row is None:
         raise HTTPException(status_code=404, detail="Proposal not found")
+    proposal_to_approve, job_client_id, is_open = row
     
     # Check if the job belongs to this client
-    job_of_proposal = db.query(Job).filter(Job.id == proposal_to_approve.job_id).first() # Renamed variable
-    if not job_of_proposal or job_of_proposal.client_id != current_user.id:
+    if job_client_id != client_id:
         raise HTTPException(status_code=403, detail="Not authorized to approve this proposal")
     
-    # Approve the proposal
+    # Approve the proposal with the same set-based UPDATEs as the bulk review
+    db.expunge(proposal_to_approve)
+    apply_review(
+        db, proposal_to_approve.job_id, client_id, is_open, approve=[proposal_id], reject=[], reject_pending=False, close_job=False
+    )
     proposal_to_approve.status = "approved"
-    db.commit()
-    db.refresh(proposal_to_approve)
-    
-    return {"message": "Proposal approved", "proposal": proposal_to_approve}
\ No newline at end of file
+    return proposal_to_approve
+
+async def _review_applied(client_id: int):
+    # Notifications and the recommendation index were queued with the review (see applications.py)
+    await response_cache.bump(PUBLIC_JOBS_SCOPE, client_scope(client_id))
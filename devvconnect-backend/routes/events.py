@@ -0,0 +1,69 @@
+# File: devvconnect-backend/routes/events.py
+# GET /events: the signed-in user's dashboard events as a Server-Sent Events stream (see events.py).
+#
+#   const { ticket } = await api.post("/events/ticket");  // Authorization: Bearer <ID token>
+#   const source = new EventSource(`${API}/events?ticket=${ticket}`);
+#   source.addEventListener("proposal.created", () => refetchJobsWithProposals());
+#   source.onerror = () => { if (source.readyState === EventSource.CLOSED) reopenWithNewTicket(); };
+#
+# EventSource can't send headers, and an ID token in the URL would end up in access logs, so
+# the stream is opened with a short-lived, single-use ticket (see stream_tickets.py; the
+# Authorization header works too). Streams end after EVENTS_STREAM_MAX_SECONDS. The browser's
+# own reconnect reuses the spent ticket and gets a 401, which closes the EventSource: the
+# dashboard then gets a new ticket, which re-checks the ID token. A comment line goes out
+# every EVENTS_HEARTBEAT_SECONDS so proxies don't close an idle stream.
+import json
+import os
+import time
+
+from fastapi import APIRouter, Depends
+from fastapi.responses import StreamingResponse
+
+from .auth import get_current_user, get_current_user_from_ticket
+from database import SessionRunner, get_session
+import events
+from events import Event
+from models import User
+from schemas import StreamTicketRead
+from stream_tickets import STREAM_TICKET_TTL_SECONDS, issue_stream_ticket
+
+EVENTS_HEARTBEAT_SECONDS = float(os.getenv("EVENTS_HEARTBEAT_SECONDS", "15"))
+EVENTS_STREAM_MAX_SECONDS = float(os.getenv("EVENTS_STREAM_MAX_SECONDS", "900"))
+RECONNECT_DELAY_MS = 3000
+
+router = APIRouter()
+
+
+def format_sse(event: Event) -> bytes:
+    data = json.dumps(event.data, separators=(",", ":"), default=str)
+    return f"id: {event.id}\nevent: {event.type}\ndata: {data}\n\n".encode("utf-8")
+
+
+@router.post("/events/ticket", response_model=StreamTicketRead)
+async def create_stream_ticket(current_user: User = Depends(get_current_user), db: SessionRunner = Depends(get_session)):
+    ticket = await db.run_sync(issue_stream_ticket, current_user.id)
+    return {"ticket": ticket, "expires_in": STREAM_TICKET_TTL_SECONDS}
+
+
+@router.get("/events")
+async def stream_events(current_user: User = Depends(get_current_user_from_ticket)):
+    user_id = current_user.id
+
+    async def stream():
+        # Subscribed inside the generator so the finally below always pairs with it
+        broker = events.broker
+        subscription = broker.subscribe(user_id)
+        deadline = time.monotonic() + EVENTS_STREAM_MAX_SECONDS
+        try:
+            yield f"retry: {RECONNECT_DELAY_MS}\nevent: ready\ndata: {{}}\n\n".encode("utf-8")
+            while time.monotonic() < deadline:
+                event = await subscription.get(timeout=min(EVENTS_HEARTBEAT_SECONDS, max(deadline - time.monotonic(), 0)))
+                yield format_sse(event) if event is not None else b": keepalive\n\n"
+        finally:
+            broker.unsubscribe(subscription)
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-store", "X-Accel-Buffering": "no"},  # nginx: don't buffer the stream
+    )
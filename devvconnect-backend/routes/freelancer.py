@@ -1,105 +1,157 @@
-from fastapi import APIRouter, Depends, HTTPException
+import logging
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from sqlalchemy.orm import Session
-# Use .auth for get_current_user if it's defined there and get_db if it's there too
-# Or import directly from database if get_db is there.
 from .auth import get_current_user 
-from database import get_db # Assuming get_db is in database.py
+from .jobs import JobListParams, job_fields, list_jobs_page_items
+from applications import JobNotFoundError, submit_proposal
+from database import SessionRunner, get_read_session, get_session
 from models import User, Job, Proposal
-from typing import List, Dict, Any # For type hinting
+from recommendations import freelancer_profile, recommendation_index
+from response_cache import PUBLIC_JOBS_SCOPE, client_scope, response_cache
+from schemas import ApprovedJob, JobRead, ProposalResponse, RecommendedJob
+from typing import List, Dict, Any, Optional, Tuple # For type hinting
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(
     prefix="/freelancer",
     tags=["freelancer"],
 )
 
-@router.get("/jobs")
-def list_available_jobs(db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
-    print(f"\n--- Request to /freelancer/jobs ---")
+@router.get("/jobs", response_model=List[JobRead])
+async def list_available_jobs(
+    request: Request,
+    params: JobListParams = Depends(),
+    fields: Tuple[str, ...] = Depends(job_fields),
+    db: SessionRunner = Depends(get_read_session),
+    current_user: User = Depends(get_current_user),
+):
     if current_user:
-        print(f"list_available_jobs: User accessing -> ID: {current_user.id}, Email: '{current_user.email}', Role: '{current_user.role}'")
+        logger.debug("list_available_jobs: user_id=%s role=%s", current_user.id, current_user.role)
     else:
-        print(f"list_available_jobs: current_user is None (authentication failed)")
         # This should ideally be caught by get_current_user
         raise HTTPException(status_code=401, detail="Authentication failed")
 
-    jobs = db.query(Job).filter(Job.is_open == True).all()
-    print(f"list_available_jobs: Found {len(jobs)} open jobs.")
-    return jobs
+    # One page of open jobs (newest first); cursors for more are in the response headers.
+    # Same data for every freelancer, so it shares the public jobs cache scope.
+    return await response_cache.respond(
+        request,
+        PUBLIC_JOBS_SCOPE,
+        lambda response: db.run_sync(list_jobs_page_items, params, response, is_open=True, fields=fields),
+    )
 
-@router.post("/apply/{job_id}")
-def apply_to_job(job_id: int, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
-    print(f"\n--- Request to /freelancer/apply/{job_id} ---")
+@router.post("/apply/{job_id}", response_model=ProposalResponse)
+async def apply_to_job(job_id: int, db: SessionRunner = Depends(get_session), current_user: User = Depends(get_current_user)):
     if current_user:
-        print(f"apply_to_job: User applying -> ID: {current_user.id}, Email: '{current_user.email}', Role: '{current_user.role}'")
+        logger.debug("apply_to_job: user_id=%s role=%s job_id=%s", current_user.id, current_user.role, job_id)
     else:
-        print(f"apply_to_job: current_user is None (authentication failed)")
         raise HTTPException(status_code=401, detail="Authentication failed")
 
     if current_user.role != "freelancer":
-        print(f"Role check FAILED for /freelancer/apply. User role is '{current_user.role}'. Expected 'freelancer'.")
+        logger.debug("apply_to_job: role check failed for user_id=%s (role=%s)", current_user.id, current_user.role)
         raise HTTPException(status_code=403, detail="Not authorized")
-    print(f"Role check PASSED for /freelancer/apply. User '{current_user.email}' has role 'freelancer'.")
 
-    existing_proposal = db.query(Proposal).filter(
-        Proposal.job_id == job_id,
-        Proposal.freelancer_id == current_user.id
-    ).first()
+    proposal, job_client_id = await db.run_sync(_create_application, job_id, current_user.id)
+    await response_cache.bump(PUBLIC_JOBS_SCOPE, client_scope(job_client_id))
+    logger.info("apply_to_job: proposal_id=%s created for job_id=%s by user_id=%s", proposal.id, job_id, current_user.id)
+    return {"message": "Application submitted", "proposal": proposal}
 
-    if existing_proposal:
-        print(f"apply_to_job: User {current_user.email} already applied to job {job_id}.")
+def _create_application(db: Session, job_id: int, freelancer_id: int):
+    # Duplicate check, insert and client lookup in one statement (see applications.py)
+    # You might want to allow sending other proposal details (message, rate, etc.) in the request body
+    try:
+        proposal, job_client_id = submit_proposal(db, job_id, freelancer_id)
+    except JobNotFoundError:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if proposal is None:
+        logger.debug("apply_to_job: user_id=%s already applied to job_id=%s", freelancer_id, job_id)
         raise HTTPException(status_code=400, detail="Already applied")
+    return proposal, job_client_id
 
-    proposal = Proposal(
-        job_id=job_id, 
-        freelancer_id=current_user.id
-        # status will default to "pending" as per the model
-        # You might want to allow sending other proposal details (message, rate, etc.) in the request body
-    )
-    db.add(proposal)
-    db.commit()
-    db.refresh(proposal)
-    print(f"apply_to_job: Proposal created with ID {proposal.id} for job {job_id} by freelancer {current_user.email}.")
-    return {"message": "Application submitted", "proposal": proposal}
-
-@router.get("/approved-jobs", response_model=List[Dict[str, Any]]) # Added response_model for clarity
-def get_approved_jobs(db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
-    print(f"\n--- Request to /freelancer/approved-jobs ---")
+@router.get("/approved-jobs", response_model=List[ApprovedJob])
+async def get_approved_jobs(db: SessionRunner = Depends(get_read_session), current_user: User = Depends(get_current_user)):
     if current_user:
-        print(f"get_approved_jobs: User accessing -> ID: {current_user.id}, Email: '{current_user.email}', Role: '{current_user.role}'")
+        logger.debug("get_approved_jobs: user_id=%s role=%s", current_user.id, current_user.role)
     else:
-        print(f"get_approved_jobs: current_user is None (authentication failed).")
         raise HTTPException(status_code=401, detail="Authentication failed")
 
     if current_user.role != "freelancer":
-        print(f"Role check FAILED for /freelancer/approved-jobs. User role is '{current_user.role}'. Expected 'freelancer'.")
+        logger.debug("get_approved_jobs: role check failed for user_id=%s (role=%s)", current_user.id, current_user.role)
         raise HTTPException(status_code=403, detail="Not authorized")
+
+    return await db.run_sync(_approved_jobs, current_user.id)
+
+def _approved_jobs(db: Session, freelancer_id: int):
+    # One query: approved proposals joined to their jobs (previously one Job lookup per proposal).
+    # The inner join also drops proposals whose job no longer exists. Only ApprovedJob's columns
+    # are selected; the rows are validated into it as they are.
+    approved_rows = (
+        db.query(
+            Job.id,
+            Job.title,
+            Job.description,
+            Job.budget,
+            Job.tech_stack,
+            Job.timeline,
+            Proposal.id.label("proposal_id"), # Include proposal ID if needed
+            Proposal.status.label("proposal_status"), # Could be useful for display
+        )
+        .select_from(Proposal)
+        .join(Job, Job.id == Proposal.job_id)
+        .filter(
+            Proposal.freelancer_id == freelancer_id,
+            Proposal.status == "approved"
+        )
+        .all()
+    )
     
-    print(f"Role check PASSED for /freelancer/approved-jobs. User '{current_user.email}' has role 'freelancer'.")
-        
-    approved_proposals = db.query(Proposal).filter(
-        Proposal.freelancer_id == current_user.id,
-        Proposal.status == "approved"
-    ).all()
-    
-    print(f"get_approved_jobs: Found {len(approved_proposals)} approved proposals for user {current_user.email}.")
-
-    # MODIFICATION: Return job details instead of just proposal objects
-    approved_jobs_details = []
-    for proposal in approved_proposals:
-        job = db.query(Job).filter(Job.id == proposal.job_id).first()
-        if job:
-            approved_jobs_details.append({
-                "id": job.id, # Using job.id as the primary identifier for the job card
-                "title": job.title,
-                "description": job.description,
-                "budget": job.budget,
-                "tech_stack": job.tech_stack,
-                "timeline": job.timeline,
-                "proposal_id": proposal.id, # Include proposal ID if needed
-                "proposal_status": proposal.status # Could be useful for display
-            })
-        else:
-            print(f"get_approved_jobs: Warning - Job with ID {proposal.job_id} not found for proposal {proposal.id}")
-            
-    print(f"get_approved_jobs: Returning {len(approved_jobs_details)} approved job details.")
-    return approved_jobs_details
\ No newline at end of file
+    logger.debug("get_approved_jobs: %d approved proposals for user_id=%s", len(approved_rows), freelancer_id)
+
+    # Job details (job.id is the job card's identifier), not the proposal objects
+    return approved_rows
+
+@router.get("/recommended-jobs", response_model=List[RecommendedJob])
+async def get_recommended_jobs(
+    limit: int = Query(20, ge=1, le=100),
+    skills: Optional[str] = Query(None, description="Comma-separated skills; defaults to the freelancer's past jobs"),
+    db: SessionRunner = Depends(get_read_session),
+    current_user: User = Depends(get_current_user),
+):
+    if current_user.role != "freelancer":
+        raise HTTPException(status_code=403, detail="Not authorized")
+
+    return await db.run_sync(_recommended_jobs, current_user, limit, skills)
+
+def _recommended_jobs(db: Session, current_user: User, limit: int, skills: Optional[str]) -> List[Dict[str, Any]]:
+    # Open jobs ranked by similarity to the freelancer's skills / past approved jobs.
+    # Scoring runs over the in-memory matrix (recommendations.py); the DB only supplies the
+    # profile and the final rows.
+    recommendation_index.ensure_synced(db)
+    profile = freelancer_profile(db, current_user, skills)
+    if not profile:
+        return []
+    applied_job_ids = [job_id for (job_id,) in db.query(Proposal.job_id).filter(Proposal.freelancer_id == current_user.id)]
+    # Over-fetch a little: some candidates may have been closed by another worker
+    ranked = recommendation_index.top_k(profile, limit * 2, exclude_job_ids=applied_job_ids)
+    jobs_by_id = {job.id: job for job in db.query(Job).filter(Job.id.in_([job_id for job_id, _ in ranked])).all()}
+
+    recommended = []
+    for job_id, score in ranked:
+        job = jobs_by_id.get(job_id)
+        if job is None or not job.is_open:
+            recommendation_index.remove(job_id)
+            continue
+        recommended.append({
+            "id": job.id,
+            "title": job.title,
+            "description": job.description,
+            "budget": job.budget,
+            "tech_stack": job.tech_stack,
+            "timeline": job.timeline,
+            "proposal_count": job.proposal_count,
+            "approved_count": job.approved_count,
+            "score": round(score, 4),
+        })
+        if len(recommended) == limit:
+            break
+    return recommended
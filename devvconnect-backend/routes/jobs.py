@@ -1,34 +1,198 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import ORJSONResponse
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
-from database import get_db
+from client_stats import record_client_activity
+from database import SessionRunner, get_read_session, get_session
+from events import notify
 from .auth import get_current_user # Fixed import path for routes folder
 from models import Job, Proposal, User
-from schemas import JobCreate # Uses the JobCreate from your schemas.py
-from typing import List
+from schemas import JOB_FIELDS, JobCreate, JobRead, Message # Uses the JobCreate from your schemas.py
+from search import MAX_SEARCH_OFFSET, search_jobs
+from pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, Page, keyset_paginate
+from recommendations import queue_index_update
+from response_cache import PUBLIC_JOBS_SCOPE, client_scope, response_cache
+from tags import MAX_FILTER_TAGS, filter_jobs_by_tags, insert_job_tags, set_job_tags
+from typing import List, Literal, Optional, Tuple
 
 router = APIRouter()
 
-@router.post("/jobs")
-def create_job(job: JobCreate, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+@router.post("/jobs", response_model=JobRead)
+async def create_job(job: JobCreate, db: SessionRunner = Depends(get_session), current_user: User = Depends(get_current_user)):
     if current_user.role != "client":
         raise HTTPException(status_code=403, detail="Only clients can post jobs.")
+    new_job = await db.run_sync(insert_job, job, current_user.id)
+    await job_created(new_job)
+    return new_job
+
+def insert_job(db: Session, job: JobCreate, client_id: int) -> Job:
+    # Shared by POST /jobs and POST /client/jobs
+    new_job = add_job(db, job, client_id)
+    db.commit()
+    db.refresh(new_job)
+    return new_job
+
+def add_job(db: Session, job: JobCreate, client_id: int) -> Job:
+    # Adds the job (and its tags) and queues its side effects, flushed but not committed
     new_job = Job(
         title=job.title,
         description=job.description,
         budget=job.budget,
         tech_stack=job.tech_stack,  # Will be None if not sent by client
         timeline=job.timeline,    # Will be None if not sent by client
-        client_id=current_user.id
+        client_id=client_id,
+        is_open=True
     )
+    set_job_tags(db, new_job, job.tech_stack) # Normalized tags used by the tag filter
     db.add(new_job)
-    db.commit()
-    db.refresh(new_job)
+    db.flush() # The tasks need the job's id
+    jobs_added(db, [new_job], client_id)
     return new_job
 
-@router.get("/jobs")
-def get_jobs(db: Session = Depends(get_db)):
-    return db.query(Job).all()
+def insert_jobs(db: Session, jobs: List[JobCreate], client_id: int) -> List[Job]:
+    # Bulk version of insert_job: one multi-row INSERT ... RETURNING for the jobs, one tag
+    # lookup and one executemany for their tags, one commit. Returns detached, loaded jobs
+    # in the order given.
+    if not jobs:
+        return []
+    rows = [
+        {
+            "title": job.title,
+            "description": job.description,
+            "budget": job.budget,
+            "tech_stack": job.tech_stack,
+            "timeline": job.timeline,
+            "client_id": client_id,
+            "is_open": True,
+        }
+        for job in jobs
+    ]
+    # Ids are assigned in VALUES order, so sorting by id restores the input order without
+    # sort_by_parameter_order (which SQLite can only honour by inserting row by row)
+    new_jobs = sorted(db.scalars(insert(Job).returning(Job), rows), key=lambda new_job: new_job.id)
+    insert_job_tags(db, {new_job.id: new_job.tech_stack for new_job in new_jobs})
+    jobs_added(db, new_jobs, client_id)
+    for new_job in new_jobs:
+        db.expunge(new_job)  # keep the RETURNING values instead of expiring them on commit
+    db.commit()
+    return new_jobs
+
+def jobs_added(db: Session, new_jobs: List[Job], client_id: int):
+    # Writes and background tasks (see tasks.py) that commit together with new, flushed jobs
+    job_ids = [new_job.id for new_job in new_jobs]
+    record_client_activity(db, client_id, jobs_posted=len(new_jobs), budget_posted=sum(new_job.budget for new_job in new_jobs))
+    queue_index_update(db, new_job_ids=job_ids) # Incremental update of the recommendation matrix
+    notify(db, "job.created", [client_id], job_ids=job_ids) # The client's other open dashboards
+
+async def job_created(new_job: Job):
+    # What to update once a new job is committed
+    await jobs_created([new_job], new_job.client_id)
+
+async def jobs_created(new_jobs: List[Job], client_id: int):
+    # Read-your-writes: the listings must not serve the cached page from before the commit
+    await response_cache.bump(PUBLIC_JOBS_SCOPE, client_scope(client_id))
+
+class JobListParams:
+    """Query parameters shared by the job listing endpoints (keyset pagination + filters)."""
+
+    def __init__(
+        self,
+        limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+        after: Optional[str] = Query(None, description="Cursor from X-Next-Cursor: older jobs"),
+        before: Optional[str] = Query(None, description="Cursor from X-Prev-Cursor: newer jobs"),
+        min_budget: Optional[float] = Query(None, ge=0),
+        max_budget: Optional[float] = Query(None, ge=0),
+        is_open: Optional[bool] = None,
+        tags: Optional[str] = Query(None, description="Comma-separated skill tags, e.g. react,python"),
+        tag_match: Literal["all", "any"] = Query("all", description="all = AND, any = OR"),
+    ):
+        self.limit = limit
+        self.after = after
+        self.before = before
+        self.min_budget = min_budget
+        self.max_budget = max_budget
+        self.is_open = is_open
+        self.tags = [t for t in tags.split(",") if t.strip()][:MAX_FILTER_TAGS] if tags else []
+        self.tag_match = tag_match
+
+
+def job_fields(
+    fields: Optional[str] = Query(None, description="Comma-separated job fields to return, e.g. id,title,budget (default: all)"),
+) -> Tuple[str, ...]:
+    """?fields= for the job list endpoints: the JobRead fields to return, in JobRead order."""
+    if not fields:
+        return JOB_FIELDS
+    requested = {name.strip() for name in fields.split(",") if name.strip()}
+    unknown = requested.difference(JOB_FIELDS)
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown job fields: {', '.join(sorted(unknown))}. Available: {', '.join(JOB_FIELDS)}")
+    return tuple(name for name in JOB_FIELDS if name in requested) or JOB_FIELDS
+
+
+def job_columns(fields: Tuple[str, ...], *extra: str) -> list:
+    # Only the requested columns are selected; `extra` ones the query itself needs (the
+    # pagination key) go after them and are left out of the response by job_dicts()
+    return [getattr(Job, name) for name in fields + tuple(name for name in extra if name not in fields)]
+
+
+def job_dicts(rows, fields: Tuple[str, ...]) -> List[dict]:
+    # Rows of job_columns(fields, ...) as response items, ready for orjson
+    return [dict(zip(fields, row)) for row in rows]
+
+
+def list_jobs_page(db: Session, params: JobListParams, is_open: Optional[bool] = None, fields: Tuple[str, ...] = JOB_FIELDS) -> Page:
+    # is_open overrides the query parameter (e.g. /freelancer/jobs only ever lists open jobs).
+    # The page's items are rows of the requested columns plus the cursor's (created_at, id).
+    if is_open is None:
+        is_open = params.is_open
+    query = db.query(Job)
+    if is_open is not None:
+        query = query.filter(Job.is_open == is_open)
+    if params.min_budget is not None:
+        query = query.filter(Job.budget >= params.min_budget)
+    if params.max_budget is not None:
+        query = query.filter(Job.budget <= params.max_budget)
+    if params.tags:
+        query = filter_jobs_by_tags(db, query, params.tags, match_all=params.tag_match == "all")
+    query = query.with_entities(*job_columns(fields, "created_at", "id"))
+    return keyset_paginate(query, Job.created_at, Job.id, params.limit, params.after, params.before)
+
+
+def list_jobs_page_items(db: Session, params: JobListParams, response, is_open: Optional[bool] = None, fields: Tuple[str, ...] = JOB_FIELDS):
+    # One page for response_cache builders: cursors go on the response, items are returned
+    page = list_jobs_page(db, params, is_open=is_open, fields=fields)
+    page.set_headers(response)
+    return job_dicts(page.items, fields)
+
+
+# Returns one page (newest first); the cursors for the neighbouring pages are in the
+# X-Next-Cursor / X-Prev-Cursor response headers.
+@router.get("/jobs", response_model=List[JobRead])
+async def get_jobs(
+    request: Request,
+    params: JobListParams = Depends(),
+    fields: Tuple[str, ...] = Depends(job_fields),
+    db: SessionRunner = Depends(get_read_session),
+):
+    # ETag-validated: a matching If-None-Match gets a 304 without touching the database
+    return await response_cache.respond(
+        request,
+        PUBLIC_JOBS_SCOPE,
+        lambda response: db.run_sync(list_jobs_page_items, params, response, fields=fields),
+    )
+
+# Ranked full-text search over open jobs' title, description and tech stack
+@router.get("/jobs/search", response_model=List[JobRead])
+async def search_jobs_route(
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    offset: int = Query(0, ge=0, le=MAX_SEARCH_OFFSET),
+    fields: Tuple[str, ...] = Depends(job_fields),
+    db: SessionRunner = Depends(get_read_session),
+):
+    rows = await db.run_sync(search_jobs, q, limit=limit, offset=offset, columns=job_columns(fields))
+    return ORJSONResponse(job_dicts(rows, fields))
 
-@router.get("/some-protected-route")
-def protected_route(current_user: User = Depends(get_current_user)):
+@router.get("/some-protected-route", response_model=Message)
+async def protected_route(current_user: User = Depends(get_current_user)):
     return {"message": f"Hello, {current_user.name}"}
\ No newline at end of file
@@ -1,43 +1,47 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
-from database import get_db
+from applications import JobNotFoundError, submit_proposal
+from database import SessionRunner, get_read_session, get_session
 from .auth import get_current_user  # Fixed import path
 from models import Proposal, Job, User
-from schemas import ProposalCreate
+from schemas import JobRead, Message, ProposalCreate, ProposalRead
+from response_cache import PUBLIC_JOBS_SCOPE, client_scope, response_cache
 from typing import List
 
 router = APIRouter()
 
-@router.post("/proposals")
-def create_proposal(proposal: ProposalCreate, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+@router.post("/proposals", response_model=ProposalRead)
+async def create_proposal(proposal: ProposalCreate, db: SessionRunner = Depends(get_session), current_user: User = Depends(get_current_user)):
     if current_user.role != "freelancer":
         raise HTTPException(status_code=403, detail="Only freelancers can apply to jobs.")
-    
-    existing_proposal = db.query(Proposal).filter_by(job_id=proposal.job_id, freelancer_id=current_user.id).first()
-    if existing_proposal:
-        raise HTTPException(status_code=400, detail="Proposal already submitted.")
 
-    new_proposal = Proposal(
-        job_id=proposal.job_id,
-        freelancer_id=current_user.id,
-        cover_letter=proposal.cover_letter,  # Use cover_letter from schema
-        status="pending"
-    )
-    db.add(new_proposal)
-    db.commit()
-    db.refresh(new_proposal)
+    new_proposal, job_client_id = await db.run_sync(_insert_proposal, proposal, current_user.id)
+    await response_cache.bump(PUBLIC_JOBS_SCOPE, client_scope(job_client_id))
     return new_proposal
 
-@router.get("/freelancer/approved-jobs")
-def get_approved_jobs(db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+def _insert_proposal(db: Session, proposal: ProposalCreate, freelancer_id: int):
+    try:
+        # The schema's cover_letter is stored in the model's message column
+        new_proposal, job_client_id = submit_proposal(db, proposal.job_id, freelancer_id, message=proposal.cover_letter)
+    except JobNotFoundError:
+        raise HTTPException(status_code=404, detail="Job not found.")
+    if new_proposal is None:
+        raise HTTPException(status_code=400, detail="Proposal already submitted.")
+    return new_proposal, job_client_id
+
+@router.get("/freelancer/approved-jobs", response_model=List[JobRead])
+async def get_approved_jobs(db: SessionRunner = Depends(get_read_session), current_user: User = Depends(get_current_user)):
     if current_user.role != "freelancer":
         raise HTTPException(status_code=403, detail="Only freelancers can access approved jobs.")
 
-    approved_proposals = db.query(Proposal).filter_by(freelancer_id=current_user.id, status="approved").all()
+    return await db.run_sync(_approved_jobs, current_user.id)
+
+def _approved_jobs(db: Session, freelancer_id: int):
+    approved_proposals = db.query(Proposal).filter_by(freelancer_id=freelancer_id, status="approved").all()
     job_ids = [p.job_id for p in approved_proposals]
     jobs = db.query(Job).filter(Job.id.in_(job_ids)).all()
     return jobs
 
-@router.get("/some-protected-route")
-def protected_route(current_user: User = Depends(get_current_user)):
+@router.get("/some-protected-route", response_model=Message)
+async def protected_route(current_user: User = Depends(get_current_user)):
     return {"message": f"Hello, {current_user.name}"}
\ No newline at end of file
@@ -1,60 +1,82 @@
 # File: devvconnect-backend/routes/users.py
+import asyncio
+import logging
 from fastapi import APIRouter, Depends, HTTPException, status, Header, Request # Added Request
 from sqlalchemy.orm import Session
-from database import get_db
+from database import SessionRunner, get_read_session, get_session
 from models import User
 from schemas import UserCreate, UserRead
-from firebase_admin import auth as firebase_auth_admin 
+from auth_executor import auth_executor, ExecutorSaturatedError
+from firebase_auth import RevocationCheckUnavailableError, verify_id_token
+from metrics import auth_timer
 from typing import Optional
 from .auth import get_current_user # This is the critical dependency for /me
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter(tags=["users"])
 
 # verify_firebase_token function can stay here or be moved if only used by get_user_by_firebase_uid
-def verify_firebase_token(authorization: Optional[str] = Header(None)):
+async def verify_firebase_token(request: Request, authorization: Optional[str] = Header(None)):
     if not authorization:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Missing Authorization header")
     token = authorization.split("Bearer ")[-1]
     try:
-        decoded_token = firebase_auth_admin.verify_id_token(token)
-        return decoded_token
+        # On the bounded auth executor like every other verification: the revocation check is
+        # blocking network I/O, and its queue limit and timeout apply here too
+        with auth_timer():
+            decoded_token = await auth_executor.run(verify_id_token, token, check_revoked=True)
+    except RevocationCheckUnavailableError:
+        logger.error("verify_firebase_token: revocation check unavailable, the Firebase Admin SDK is not initialized")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Token verification is unavailable: the server can't check token revocation.",
+        )
+    except (asyncio.TimeoutError, ExecutorSaturatedError) as e:
+        logger.warning("verify_firebase_token: token verification unavailable (%s); auth executor stats: %s", type(e).__name__, auth_executor.stats())
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Token verification is temporarily unavailable. Please retry.",
+            headers={"Retry-After": "1"},
+        )
     except Exception as e:
-        print(f"Error in verify_firebase_token: {e}")
+        logger.info("verify_firebase_token: invalid token rejected (%s)", type(e).__name__)
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail=f"Invalid Firebase ID token: {e}")
+    request.state.firebase_uid = decoded_token.get("uid") # For read-your-writes routing (database.py)
+    return decoded_token
 
 # IMPORTANT: Define the more specific path "/me" BEFORE the dynamic path "/{firebase_uid}"
 @router.get("/me", response_model=UserRead)
-def get_logged_in_user(current_user: User = Depends(get_current_user)):
-    # This log will now execute if get_current_user is successful for this route
-    print(f"--- /users/me endpoint: Successfully resolved current_user: ID={current_user.id}, Email='{current_user.email}', Role='{current_user.role}' ---")
+async def get_logged_in_user(current_user: User = Depends(get_current_user)):
+    logger.debug("/users/me: user_id=%s role=%s", current_user.id, current_user.role)
     return current_user
 
 @router.get("/{firebase_uid}", response_model=UserRead)
-def get_user_by_firebase_uid(firebase_uid: str, db: Session = Depends(get_db), token_data=Depends(verify_firebase_token)):
-    print(f"--- /users/{{firebase_uid}} endpoint: Attempting to fetch user by UID: {firebase_uid} ---")
+async def get_user_by_firebase_uid(firebase_uid: str, db: SessionRunner = Depends(get_read_session), token_data=Depends(verify_firebase_token)):
     # This token_data check is just to ensure the dependency ran, not for specific user auth here
     if not token_data:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token for get_user_by_firebase_uid")
         
-    user = db.query(User).filter(User.firebase_uid == firebase_uid).first()
+    user = await db.run_sync(lambda session: session.query(User).filter(User.firebase_uid == firebase_uid).first())
     if not user:
-        print(f"--- /users/{{firebase_uid}} endpoint: User NOT FOUND with UID: {firebase_uid} ---")
+        logger.debug("/users/{firebase_uid}: no user for uid=%s", firebase_uid)
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found by UID")
-    print(f"--- /users/{{firebase_uid}} endpoint: User FOUND: {user.email} ---")
     return user
 
 @router.post("/", response_model=UserRead) # Assuming this is /users/ (prefix + /)
-def create_user(user: UserCreate, db: Session = Depends(get_db)):
-    print(f"--- /users POST: Received user creation request for email: {user.email}, UID: {user.firebase_uid}, Role: {user.role} ---")
-    
+async def create_user(user: UserCreate, request: Request, db: SessionRunner = Depends(get_session)):
+    request.state.firebase_uid = user.firebase_uid # The new user's next reads stick to the primary
+    return await db.run_sync(_insert_user, user)
+
+def _insert_user(db: Session, user: UserCreate) -> User:
     existing_user_by_email = db.query(User).filter(User.email == user.email).first()
     if existing_user_by_email:
-        print(f"--- /users POST: Email {user.email} already registered (UID: {existing_user_by_email.firebase_uid}). Aborting. ---")
+        logger.info("/users POST: email already registered (uid=%s)", user.firebase_uid)
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Email '{user.email}' already registered.")
     
     existing_user_by_uid = db.query(User).filter(User.firebase_uid == user.firebase_uid).first()
     if existing_user_by_uid:
-        print(f"--- /users POST: Firebase UID {user.firebase_uid} already registered (Email: {existing_user_by_uid.email}). Aborting. ---")
+        logger.info("/users POST: uid=%s already registered", user.firebase_uid)
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Firebase UID '{user.firebase_uid}' already exists.")
 
     try:
@@ -67,9 +89,9 @@ def create_user(user: UserCreate, db: Session = Depends(get_db)):
         db.add(new_user)
         db.commit()
         db.refresh(new_user)
-        print(f"--- /users POST: User {new_user.email} (UID: {new_user.firebase_uid}) created successfully in DB with ID {new_user.id} ---")
+        logger.info("/users POST: created user_id=%s uid=%s role=%s", new_user.id, new_user.firebase_uid, new_user.role)
         return new_user
     except Exception as e:
         db.rollback()
-        print(f"--- /users POST: DATABASE ERROR during user creation for {user.email}: {e} ---")
+        logger.exception("/users POST: database error creating user for uid=%s", user.firebase_uid)
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Could not create user in database: {e}")
\ No newline at end of file
@@ -1,5 +1,6 @@
-from pydantic import BaseModel, EmailStr
-from typing import Optional
+from datetime import date, datetime
+from pydantic import BaseModel, EmailStr, Field, field_validator
+from typing import Any, Dict, List, Literal, Optional
 
 # User schemas
 class UserBase(BaseModel):
@@ -35,10 +36,49 @@ class JobCreate(BaseModel): # User provided this schema
 class JobRead(JobBase):
     id: int
     client_id: int
+    is_open: Optional[bool] = None
+    created_at: Optional[datetime] = None
+    closed_at: Optional[datetime] = None
+    # Proposal rollups (see job_counters.py)
+    proposal_count: int = 0
+    pending_count: int = 0
+    approved_count: int = 0
 
     class Config:
         from_attributes = True
 
+# The job list endpoints select these columns (or the ?fields= subset) and serialize the rows as
+# they come, so the model documents those responses rather than validating them
+JOB_FIELDS = tuple(JobRead.model_fields)
+
+class ApprovedJob(JobBase):
+    id: int
+    proposal_id: int
+    proposal_status: Optional[str] = None
+
+    class Config:
+        from_attributes = True
+
+class RecommendedJob(JobBase):
+    id: int
+    proposal_count: int
+    approved_count: int
+    score: float
+
+MAX_JOB_BATCH = 500  # items per POST /client/jobs/batch
+
+class JobBatchCreated(BaseModel):
+    index: int  # position in the request
+    id: int
+
+class JobBatchError(BaseModel):
+    index: int
+    errors: List[Dict[str, Any]]  # pydantic validation errors for that item
+
+class JobBatchResult(BaseModel):
+    created: List[JobBatchCreated]
+    errors: List[JobBatchError]
+
 # Proposal schemas
 class ProposalBase(BaseModel):
     job_id: int
@@ -48,8 +88,93 @@ class ProposalBase(BaseModel):
 class ProposalCreate(ProposalBase):
     pass  # extend if you want, otherwise just reuse base
 
-class ProposalRead(ProposalBase):
+class ProposalRead(BaseModel):
     id: int
+    job_id: int
+    freelancer_id: int
+    status: Optional[str] = None
+    message: Optional[str] = None  # the cover letter
+    hourly_rate: Optional[str] = None
+    estimated_timeline: Optional[str] = None
+    created_at: Optional[datetime] = None
+    decided_at: Optional[datetime] = None
 
     class Config:
-        from_attributes = True  # Pydantic v2 syntax for ORM compatibility
\ No newline at end of file
+        from_attributes = True  # Pydantic v2 syntax for ORM compatibility
+
+class ProposalResponse(BaseModel):
+    message: str
+    proposal: ProposalRead
+
+class ProposalSummary(BaseModel):
+    # One proposal on the client dashboard (GET /client/jobs-with-proposals)
+    id: int
+    job_id: int
+    freelancer_id: int
+    status: Optional[str] = None
+    approved: bool
+    freelancer_name: str
+
+class JobWithProposals(BaseModel):
+    id: int
+    title: str
+    description: Optional[str] = None
+    budget: float
+    proposal_count: int
+    pending_count: int
+    approved_count: int
+    proposals: List[ProposalSummary]
+
+MAX_REVIEW_DECISIONS = 500
+
+class ProposalDecision(BaseModel):
+    proposal_id: int
+    status: Literal["approved", "rejected"]
+
+class ProposalReview(BaseModel):
+    decisions: List[ProposalDecision] = Field(default_factory=list, max_length=MAX_REVIEW_DECISIONS)
+    # Reject the job's other pending proposals / close the job. Default: yes if anything is approved.
+    reject_pending: Optional[bool] = None
+    close_job: Optional[bool] = None
+
+    @field_validator("decisions")
+    @classmethod
+    def one_decision_per_proposal(cls, decisions):
+        proposal_ids = [decision.proposal_id for decision in decisions]
+        if len(set(proposal_ids)) != len(proposal_ids):
+            raise ValueError("each proposal may appear only once in decisions")
+        return decisions
+
+class ProposalReviewResult(BaseModel):
+    job_id: int
+    approved: List[int]
+    rejected: int
+    job_closed: bool
+
+# Client stats schemas (see client_stats.py)
+class ClientActivity(BaseModel):
+    jobs_posted: int
+    budget_posted: float
+    jobs_closed: int
+    proposals_received: int
+    proposals_approved: int
+    proposals_rejected: int
+
+class ClientActivityDay(ClientActivity):
+    day: date
+
+class ClientStatsTotals(ClientActivity):
+    open_jobs: int
+    proposals_per_job: Optional[float] = None
+    approval_rate: Optional[float] = None
+
+class ClientStatsRead(BaseModel):
+    totals: ClientStatsTotals
+    daily: List[ClientActivityDay]
+
+class Message(BaseModel):
+    message: str
+
+class StreamTicketRead(BaseModel):
+    ticket: str
+    expires_in: int  # seconds
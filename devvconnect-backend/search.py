@@ -0,0 +1,131 @@
+# File: devvconnect-backend/search.py
+# Ranked full-text search over Job.title, Job.description and Job.tech_stack.
+#
+# The text index depends on the database picked in database.py:
+#   * SQLite     -> an FTS5 external-content table (jobs_fts) kept in sync by triggers
+#   * PostgreSQL -> a generated tsvector column (jobs.search_vector) with a GIN index
+# Both are maintained by the database itself on every INSERT/UPDATE/DELETE of a job, so
+# creating, editing or closing a job through any code path keeps the index current.
+# Other databases fall back to (slow) LIKE matching.
+import logging
+import re
+from typing import List, Optional
+
+from sqlalchemy import column, func, literal_column, or_, table, text
+from sqlalchemy.orm import Session
+
+from database import DATABASE_DIALECT, engine
+from models import Job
+
+logger = logging.getLogger(__name__)
+
+MAX_SEARCH_OFFSET = 1000  # deep pages of relevance-ranked results aren't useful; cap the work
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+jobs_fts = table("jobs_fts", column("rowid"))
+
+_SQLITE_FTS_DDL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS jobs_fts USING fts5(
+        title, description, tech_stack,
+        content='jobs', content_rowid='id',
+        tokenize='porter unicode61'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS jobs_fts_ai AFTER INSERT ON jobs BEGIN
+        INSERT INTO jobs_fts(rowid, title, description, tech_stack)
+        VALUES (new.id, new.title, new.description, new.tech_stack);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS jobs_fts_ad AFTER DELETE ON jobs BEGIN
+        INSERT INTO jobs_fts(jobs_fts, rowid, title, description, tech_stack)
+        VALUES ('delete', old.id, old.title, old.description, old.tech_stack);
+    END
+    """,
+    # Only re-index when the searchable text changes (closing a job doesn't touch the index)
+    """
+    CREATE TRIGGER IF NOT EXISTS jobs_fts_au AFTER UPDATE OF title, description, tech_stack ON jobs BEGIN
+        INSERT INTO jobs_fts(jobs_fts, rowid, title, description, tech_stack)
+        VALUES ('delete', old.id, old.title, old.description, old.tech_stack);
+        INSERT INTO jobs_fts(rowid, title, description, tech_stack)
+        VALUES (new.id, new.title, new.description, new.tech_stack);
+    END
+    """,
+]
+
+_POSTGRES_FTS_DDL = [
+    """
+    ALTER TABLE jobs ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(tech_stack, '')), 'B') ||
+        setweight(to_tsvector('english', coalesce(description, '')), 'C')
+    ) STORED
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_jobs_search_vector ON jobs USING GIN (search_vector)",
+]
+
+
+def ensure_search_index():
+    """Create the text index (and backfill it) if it doesn't exist yet. Safe to call on every startup."""
+    with engine.begin() as conn:
+        if DATABASE_DIALECT == "sqlite":
+            exists = conn.execute(
+                text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'jobs_fts'")
+            ).first()
+            for statement in _SQLITE_FTS_DDL:
+                conn.exec_driver_sql(statement)
+            if not exists:
+                # Index the jobs that were written before the FTS table existed
+                conn.exec_driver_sql("INSERT INTO jobs_fts(jobs_fts) VALUES ('rebuild')")
+        elif DATABASE_DIALECT == "postgresql":
+            for statement in _POSTGRES_FTS_DDL:
+                conn.exec_driver_sql(statement)
+        else:
+            logger.warning("search: no full-text index for dialect '%s', /jobs/search will use LIKE scans", DATABASE_DIALECT)
+
+
+def _fts5_match_expression(q: str) -> str:
+    # Quote every term so user input can't inject FTS5 syntax; terms are ANDed and the last
+    # one is a prefix match so partially typed words still hit ("reac" -> "react").
+    tokens = _TOKEN_RE.findall(q)
+    if not tokens:
+        return ""
+    quoted = [f'"{token}"' for token in tokens]
+    quoted[-1] += "*"
+    return " ".join(quoted)
+
+
+def search_jobs(db: Session, q: str, limit: int, offset: int = 0, only_open: bool = True, columns: Optional[list] = None) -> List:
+    # Jobs, or rows of just `columns` (Job attributes) when given
+    query = db.query(*columns) if columns else db.query(Job)
+    if only_open:
+        query = query.filter(Job.is_open == True)
+
+    if DATABASE_DIALECT == "sqlite":
+        match = _fts5_match_expression(q)
+        if not match:
+            return []
+        # bm25 column weights: title 10, description 1, tech_stack 5 (lower score = better)
+        query = (
+            query.join(jobs_fts, jobs_fts.c.rowid == Job.id)
+            .filter(text("jobs_fts MATCH :match"))
+            .order_by(text("bm25(jobs_fts, 10.0, 1.0, 5.0)"), Job.id.desc())
+            .params(match=match)
+        )
+    elif DATABASE_DIALECT == "postgresql":
+        ts_query = func.websearch_to_tsquery("english", q)
+        search_vector = literal_column("jobs.search_vector")
+        query = query.filter(search_vector.op("@@")(ts_query)).order_by(
+            func.ts_rank_cd(search_vector, ts_query).desc(), Job.id.desc()
+        )
+    else:
+        pattern = f"%{q}%"
+        query = query.filter(
+            or_(Job.title.ilike(pattern), Job.description.ilike(pattern), Job.tech_stack.ilike(pattern))
+        ).order_by(Job.created_at.desc(), Job.id.desc())
+
+    return query.offset(offset).limit(limit).all()
@@ -0,0 +1,98 @@
+# File: devvconnect-backend/sql_counter.py
+# Per-request SQL statement counter.
+#
+# Every statement executed on any of the engines (primary and, with DATABASE_READ_URL, the
+# read replica; sync and async) bumps the counter bound to the current request
+# (a contextvar, so it follows the request into FastAPI's threadpool) and adds its execution
+# time. The middleware reports the total in the X-SQL-Statements response header, which lets
+# tests assert that an endpoint runs a constant number of queries and can't quietly regress
+# to N+1; metrics.py exports counts and time per route.
+import contextvars
+import time
+
+from sqlalchemy import event
+
+from database import async_engine, async_read_engine, engine, read_engine
+
+SQL_STATEMENTS_HEADER = b"x-sql-statements"
+
+
+class StatementCounter:
+    __slots__ = ("count", "seconds")
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+
+
+_current_counter = contextvars.ContextVar("sql_statement_counter", default=None)
+
+
+def current_counter():
+    return _current_counter.get()
+
+
+class track_statements:
+    """Count statements run inside the block (useful in scripts and tests):
+
+        with track_statements() as counter:
+            ...
+        assert counter.count <= 3
+    """
+
+    def __enter__(self):
+        self.counter = StatementCounter()
+        self._token = _current_counter.set(self.counter)
+        return self.counter
+
+    def __exit__(self, *exc):
+        _current_counter.reset(self._token)
+        return False
+
+
+def _count_statement(conn, cursor, statement, parameters, context, executemany):
+    counter = _current_counter.get()
+    if counter is not None:
+        counter.count += 1
+        if context is not None:
+            context._statement_started_at = time.perf_counter()
+
+
+def _time_statement(conn, cursor, statement, parameters, context, executemany):
+    counter = _current_counter.get()
+    started = getattr(context, "_statement_started_at", None)
+    if counter is not None and started is not None:
+        counter.seconds += time.perf_counter() - started
+
+
+# DB_MODE=async: the async engines' statements go through their own sync_engine cores
+for _engine in (engine, read_engine, async_engine, async_read_engine):
+    if _engine is not None:
+        _engine = getattr(_engine, "sync_engine", _engine)
+        event.listen(_engine, "before_cursor_execute", _count_statement)
+        event.listen(_engine, "after_cursor_execute", _time_statement)
+
+
+class SQLStatementCountMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        counter = StatementCounter()
+        token = _current_counter.set(counter)
+
+        async def send_with_count(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((SQL_STATEMENTS_HEADER, str(counter.count).encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_count)
+        finally:
+            _current_counter.reset(token)
@@ -0,0 +1,63 @@
+# File: devvconnect-backend/stream_tickets.py
+# Tickets for GET /events (routes/events.py).
+#
+# EventSource can't send an Authorization header, and an ID token in the query string ends up
+# in access logs (uvicorn, proxies, load balancers) while it is still good for every endpoint
+# for up to an hour. Instead the dashboard asks for a ticket with an authenticated
+# POST /events/ticket and opens the stream with ?ticket=. A ticket opens one stream for its
+# user within STREAM_TICKET_TTL_SECONDS and nothing else: consuming it is a single
+#   DELETE FROM stream_tickets WHERE digest = ? AND expires_at > now RETURNING user_id
+# so a logged ticket is already spent (or expired) by the time anyone could read it. Only the
+# sha256 of the ticket is stored, and the table is shared by every worker through the database.
+# Expired tickets are deleted when new ones are issued and at startup.
+import hashlib
+import os
+import secrets
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import delete, insert, select
+from sqlalchemy.orm import Session
+
+from database import engine
+from models import StreamTicket
+
+STREAM_TICKET_TTL_SECONDS = int(os.getenv("STREAM_TICKET_TTL_SECONDS", "60"))
+
+
+def _digest(ticket: str) -> str:
+    return hashlib.sha256(ticket.encode("utf-8")).hexdigest()
+
+
+def issue_stream_ticket(db: Session, user_id: int) -> str:
+    """Create a ticket for `user_id` and commit."""
+    ticket = secrets.token_urlsafe(32)
+    now = datetime.utcnow()
+    db.execute(delete(StreamTicket).where(StreamTicket.expires_at <= now))
+    db.execute(
+        insert(StreamTicket).values(
+            digest=_digest(ticket), user_id=user_id, expires_at=now + timedelta(seconds=STREAM_TICKET_TTL_SECONDS)
+        )
+    )
+    db.commit()
+    return ticket
+
+
+def consume_stream_ticket(db: Session, ticket: str) -> Optional[int]:
+    """Spend a ticket and commit. Returns its user_id, or None if it is unknown, used or expired."""
+    statement = delete(StreamTicket).where(StreamTicket.digest == _digest(ticket), StreamTicket.expires_at > datetime.utcnow())
+    if engine.dialect.delete_returning:
+        user_id = db.execute(statement.returning(StreamTicket.user_id)).scalar()
+    else:
+        # Whoever deletes the row owns the ticket; a concurrent consumer deletes nothing
+        user_id = db.execute(select(StreamTicket.user_id).where(StreamTicket.digest == _digest(ticket))).scalar()
+        if user_id is not None and not db.execute(statement).rowcount:
+            user_id = None
+    db.commit()
+    return user_id
+
+
+def prune_stream_tickets() -> int:
+    """Delete expired tickets. Safe to call on every startup."""
+    with engine.begin() as conn:
+        return conn.execute(StreamTicket.__table__.delete().where(StreamTicket.expires_at <= datetime.utcnow())).rowcount
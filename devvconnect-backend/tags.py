@@ -0,0 +1,172 @@
+# File: devvconnect-backend/tags.py
+# Normalized skill tags parsed from Job.tech_stack.
+#
+# tech_stack stays the free-form string the client typed; at write time it is also parsed
+# into rows in `tags` linked through `job_tags`, so "open jobs needing React AND Python"
+# becomes an indexed set intersection on job_tags instead of substring scans.
+#
+# Jobs created before tags existed are backfilled once, at the first startup that finds the
+# backfill not yet recorded in completed_migrations; new jobs are tagged when they are written.
+# Run it again by hand (e.g. after importing jobs straight into the table) with:
+#   python tags.py backfill
+import re
+import sys
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy import false, func, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Query, Session
+
+from models import CompletedMigration, Job, Tag, job_tags
+
+TAG_BACKFILL_MIGRATION = "job_tags_backfill"
+
+MAX_TAG_LENGTH = 50
+MAX_FILTER_TAGS = 10
+
+_SPLIT_RE = re.compile(r"[,;/|\n]+")
+_SPACE_RE = re.compile(r"\s+")
+
+# Spellings people actually type -> one canonical tag
+TAG_ALIASES = {
+    "reactjs": "react",
+    "react.js": "react",
+    "react js": "react",
+    "nodejs": "node.js",
+    "node": "node.js",
+    "node js": "node.js",
+    "vuejs": "vue",
+    "vue.js": "vue",
+    "nextjs": "next.js",
+    "js": "javascript",
+    "ts": "typescript",
+    "py": "python",
+    "python3": "python",
+    "postgres": "postgresql",
+    "psql": "postgresql",
+    "golang": "go",
+    "k8s": "kubernetes",
+    "tailwindcss": "tailwind",
+}
+
+
+def normalize_tag(raw: str) -> Optional[str]:
+    tag = _SPACE_RE.sub(" ", raw.strip().lower())
+    if not tag or len(tag) > MAX_TAG_LENGTH:
+        return None
+    return TAG_ALIASES.get(tag, tag)
+
+
+def parse_tags(text: Optional[str]) -> List[str]:
+    """'React, Node.js / postgres' -> ['react', 'node.js', 'postgresql'] (deduplicated, in order)."""
+    if not text:
+        return []
+    seen = []
+    for part in _SPLIT_RE.split(text):
+        tag = normalize_tag(part)
+        if tag and tag not in seen:
+            seen.append(tag)
+    return seen
+
+
+def get_or_create_tags(db: Session, names: Iterable[str]) -> List[Tag]:
+    names = list(dict.fromkeys(names))
+    if not names:
+        return []
+    existing = {tag.name: tag for tag in db.query(Tag).filter(Tag.name.in_(names)).all()}
+    for name in names:
+        if name in existing:
+            continue
+        # Another request may create the same tag concurrently; the unique index decides
+        try:
+            with db.begin_nested():
+                tag = Tag(name=name)
+                db.add(tag)
+                db.flush()
+        except IntegrityError:
+            tag = db.query(Tag).filter(Tag.name == name).one()
+        existing[name] = tag
+    return [existing[name] for name in names]
+
+
+def set_job_tags(db: Session, job: Job, tech_stack: Optional[str]):
+    job.tags = get_or_create_tags(db, parse_tags(tech_stack))
+
+
+def insert_job_tags(db: Session, tech_stacks: Dict[int, Optional[str]]):
+    """Tag many already-inserted jobs ({job_id: tech_stack}) with one tag lookup and one
+    executemany into job_tags. Used by bulk inserts that bypass the Job.tags relationship."""
+    parsed = {job_id: parse_tags(tech_stack) for job_id, tech_stack in tech_stacks.items()}
+    tags = {tag.name: tag.id for tag in get_or_create_tags(db, [name for names in parsed.values() for name in names])}
+    rows = [{"job_id": job_id, "tag_id": tags[name]} for job_id, names in parsed.items() for name in names]
+    if rows:
+        db.execute(job_tags.insert(), rows)
+
+
+def filter_jobs_by_tags(db: Session, query: Query, tag_names: List[str], match_all: bool = True) -> Query:
+    """Restrict a Job query to jobs carrying all (AND) or any (OR) of the given tags."""
+    tag_names = parse_tags(",".join(tag_names))
+    if not tag_names:
+        return query
+    tag_ids = [tag_id for (tag_id,) in db.query(Tag.id).filter(Tag.name.in_(tag_names)).all()]
+    if not tag_ids or (match_all and len(tag_ids) < len(tag_names)):
+        # A required tag doesn't exist at all, so nothing can match
+        return query.filter(false())
+
+    matching_job_ids = select(job_tags.c.job_id).where(job_tags.c.tag_id.in_(tag_ids))
+    if match_all and len(tag_ids) > 1:
+        # Intersection: jobs that appear once for every requested tag
+        matching_job_ids = matching_job_ids.group_by(job_tags.c.job_id).having(func.count() == len(tag_ids))
+    return query.filter(Job.id.in_(matching_job_ids))
+
+
+def backfill_job_tags(db: Session, batch_size: int = 500) -> int:
+    """Tag every job that has a tech_stack but no job_tags rows yet. Returns the number of jobs tagged."""
+    tagged = 0
+    last_id = 0
+    while True:
+        jobs = (
+            db.query(Job)
+            .filter(
+                Job.id > last_id,
+                Job.tech_stack.isnot(None),
+                ~select(job_tags.c.job_id).where(job_tags.c.job_id == Job.id).exists(),
+            )
+            .order_by(Job.id)
+            .limit(batch_size)
+            .all()
+        )
+        if not jobs:
+            return tagged
+        for job in jobs:
+            set_job_tags(db, job, job.tech_stack)
+        db.commit()
+        tagged += len(jobs)
+        last_id = jobs[-1].id
+
+
+def backfill_job_tags_once(db: Session) -> int:
+    """backfill_job_tags unless it has completed before. Returns the number of jobs tagged."""
+    if db.get(CompletedMigration, TAG_BACKFILL_MIGRATION) is not None:
+        return 0
+    tagged = backfill_job_tags(db)
+    db.add(CompletedMigration(name=TAG_BACKFILL_MIGRATION))
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()  # another worker starting up at the same time recorded it first
+    return tagged
+
+
+if __name__ == "__main__":
+    if sys.argv[1:] != ["backfill"]:
+        print("usage: python tags.py backfill")
+        sys.exit(2)
+    from database import SessionLocal, create_missing_schema
+
+    create_missing_schema()
+    session = SessionLocal()
+    try:
+        print(f"Tagged {backfill_job_tags(session)} jobs.")
+    finally:
+        session.close()
@@ -0,0 +1,439 @@
+# File: devvconnect-backend/tasks.py
+# Background tasks for the side effects of a write that the response doesn't wait for:
+# dashboard notifications (events.py) and recommendation index updates (recommendations.py).
+#
+# A write path enqueues while its transaction is still open, then commits:
+#
+#   enqueue(db, "recommendations.add_jobs", job_ids=[new_job.id])
+#   db.commit()
+#
+# enqueue() only stages the task on the session. A before_commit hook writes staged tasks to
+# the task_outbox table, so a task commits or rolls back together with the write it belongs to
+# and a committed task survives a restart. After the commit the worker pool (TASK_WORKERS
+# threads) is woken. A worker claims due rows with one UPDATE ... RETURNING (FOR UPDATE SKIP
+# LOCKED on PostgreSQL, so several processes can share the table), runs the registered function
+# and deletes the row. A task that raises is retried with exponential backoff until it has run
+# TASK_MAX_ATTEMPTS times; after that it stays in the table with status "failed" and its last
+# error (`python tasks.py retry-failed` queues those again).
+#
+# Claiming a task leases it for TASK_LEASE_SECONDS. If the process dies mid-task the lease
+# expires and the task runs again, so delivery is at least once and tasks must be idempotent.
+# Other processes' tasks are picked up by polling every TASK_POLL_SECONDS.
+#
+# Tasks go through the outbox unless registered with local=True. A local task changes state
+# inside the process (publishing to the in-process event broker, updating this worker's
+# recommendation index), so run elsewhere it would reach nobody: it goes to local_task_queue
+# instead, an in-memory queue that an after_commit hook fills and this process's own threads
+# drain. It still only runs if the write commits, and is retried the same way, but is lost on
+# restart, which is only acceptable because what it changed is gone too (the streams it was
+# for; the index, rebuilt from the jobs table). `local` may be a callable deciding per enqueue:
+# events.publish is local only while the broker is, and durable once EVENTS_BROKER names a
+# shared one.
+#
+# While every registered task is local, the outbox workers aren't started and /metrics doesn't
+# query the outbox; the first task committed to it starts them.
+#
+# TASK_BACKEND=memory keeps the whole queue in this process instead, for tests and scripts.
+# task_queue.run_pending() runs due tasks on the calling thread. Tasks in the memory queue are
+# lost on restart. Queue depth, outcomes per task and latency (enqueue to done) are on /metrics.
+import itertools
+import json
+import logging
+import os
+import random
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Protocol, Sequence, Tuple, Union
+
+from sqlalchemy import delete, event, func, insert, select, update
+from sqlalchemy.orm import Session
+
+from database import SessionLocal, engine
+from metrics import registry as metrics_registry
+from models import OutboxTask
+
+logger = logging.getLogger(__name__)
+
+TASK_BACKEND = os.getenv("TASK_BACKEND", "outbox")
+TASK_WORKERS = int(os.getenv("TASK_WORKERS", "2"))  # 0: this process only enqueues
+TASK_MAX_ATTEMPTS = int(os.getenv("TASK_MAX_ATTEMPTS", "5"))
+TASK_RETRY_BASE_SECONDS = float(os.getenv("TASK_RETRY_BASE_SECONDS", "1"))
+TASK_RETRY_MAX_SECONDS = 300
+TASK_POLL_SECONDS = float(os.getenv("TASK_POLL_SECONDS", "1"))
+TASK_LEASE_SECONDS = float(os.getenv("TASK_LEASE_SECONDS", "60"))
+CLAIM_BATCH_SIZE = 10
+MAX_ERROR_LENGTH = 2000
+
+PENDING, RUNNING, FAILED = "pending", "running", "failed"
+
+_STAGED = "tasks.staged"  # session.info keys
+_STAGED_LOCAL = "tasks.staged_local"
+_COMMITTING = "tasks.committing"
+
+task_outcomes = metrics_registry.counter("tasks_total", "Background task runs by task and outcome (completed, retried, failed).", ("task", "outcome"))
+task_latency = metrics_registry.histogram("task_latency_seconds", "Time from enqueueing a task to its successful completion.", ("task",))
+task_run_time = metrics_registry.histogram("task_run_seconds", "Time spent running a task (successful runs).", ("task",))
+
+_registry: Dict[str, Callable[..., Any]] = {}
+_local: Dict[str, Union[bool, Callable[[], bool]]] = {}
+
+
+def task(name: str, local: Union[bool, Callable[[], bool]] = False):
+    """Register a function as the task `name`. It is called with the enqueued keyword arguments.
+    `local` (or local() at enqueue time) marks a task that only has an effect in the process
+    that runs it; those run in the enqueueing process, never through the outbox."""
+
+    def register(fn):
+        if name in _registry:
+            raise ValueError(f"Task {name!r} is already registered")
+        _registry[name] = fn
+        _local[name] = local
+        return fn
+
+    return register
+
+
+def _is_local(name: str) -> bool:
+    local = _local[name]
+    return local() if callable(local) else local
+
+
+def outbox_tasks_registered() -> bool:
+    """Whether any registered task currently goes through the outbox (task_queue)."""
+    return not all(_is_local(name) for name in _registry)
+
+
+def enqueue(db: Session, name: str, **payload):
+    """Queue a task to run once `db`'s transaction commits (nothing runs if it rolls back).
+    The payload must be JSON serializable."""
+    if name not in _registry:
+        raise LookupError(f"Unknown task {name!r}")
+    if not db.in_transaction():
+        db.begin()  # so a rollback fires after_rollback and drops the task
+    staged = _STAGED_LOCAL if _is_local(name) else _STAGED
+    db.info.setdefault(staged, []).append((name, json.dumps(payload, separators=(",", ":"))))
+
+
+class TaskRecord(NamedTuple):
+    id: int
+    name: str
+    payload: str  # JSON
+    attempts: int  # including the run it was claimed for
+    created_at: datetime
+
+
+class TaskBackend(Protocol):
+    def stage(self, db: Session, staged: Sequence[Tuple[str, str]]) -> Any: ...
+
+    def committed(self, staged: Any): ...
+
+    def claim(self, limit: int) -> List[TaskRecord]: ...
+
+    def complete(self, record: TaskRecord): ...
+
+    def retry(self, record: TaskRecord, error: str, delay_seconds: float): ...
+
+    def fail(self, record: TaskRecord, error: str): ...
+
+    def depth(self) -> dict: ...
+
+
+class OutboxBackend:
+    """Durable queue in the task_outbox table, shared by every process using the database."""
+
+    def stage(self, db: Session, staged):
+        # In the caller's transaction, right before it commits. One executemany: the ORM would
+        # insert row by row to read back ids nobody needs
+        now = datetime.utcnow()
+        db.execute(
+            insert(OutboxTask),
+            [{"name": name, "payload": payload, "status": PENDING, "attempts": 0, "run_at": now, "created_at": now} for name, payload in staged],
+        )
+
+    def committed(self, staged):
+        pass
+
+    def claim(self, limit: int) -> List[TaskRecord]:
+        now = datetime.utcnow()
+        is_due = (OutboxTask.status.in_((PENDING, RUNNING)), OutboxTask.run_at <= now)  # running: lease expired
+        due = select(OutboxTask.id).where(*is_due).order_by(OutboxTask.run_at).limit(limit).with_for_update(skip_locked=True)
+        lease = {"status": RUNNING, "run_at": now + timedelta(seconds=TASK_LEASE_SECONDS), "attempts": OutboxTask.attempts + 1}
+        columns = (OutboxTask.id, OutboxTask.name, OutboxTask.payload, OutboxTask.attempts, OutboxTask.created_at)
+        with SessionLocal() as db:
+            # A plain read first, so idle workers polling don't take SQLite's write lock
+            if db.execute(select(OutboxTask.id).where(*is_due).limit(1)).first() is None:
+                return []
+            if engine.dialect.update_returning:
+                claimed = db.execute(
+                    update(OutboxTask).where(OutboxTask.id.in_(due.scalar_subquery())).values(**lease).returning(*columns)
+                ).all()
+            else:
+                # One conditional UPDATE per candidate; another worker may claim it in between
+                claimed = []
+                for (task_id,) in db.execute(due).all():
+                    if db.execute(
+                        update(OutboxTask).where(OutboxTask.id == task_id, OutboxTask.run_at <= now).values(**lease)
+                    ).rowcount:
+                        claimed.extend(db.execute(select(*columns).where(OutboxTask.id == task_id)).all())
+            db.commit()
+        return [TaskRecord(*row) for row in claimed]
+
+    def complete(self, record: TaskRecord):
+        with SessionLocal() as db:
+            db.execute(delete(OutboxTask).where(OutboxTask.id == record.id))
+            db.commit()
+
+    def retry(self, record: TaskRecord, error: str, delay_seconds: float):
+        self._release(record, PENDING, error, datetime.utcnow() + timedelta(seconds=delay_seconds))
+
+    def fail(self, record: TaskRecord, error: str):
+        self._release(record, FAILED, error, datetime.utcnow())
+
+    def _release(self, record: TaskRecord, status: str, error: str, run_at: datetime):
+        with SessionLocal() as db:
+            db.execute(update(OutboxTask).where(OutboxTask.id == record.id).values(status=status, run_at=run_at, last_error=error))
+            db.commit()
+
+    def depth(self) -> dict:
+        with SessionLocal() as db:
+            counts = dict(db.execute(select(OutboxTask.status, func.count()).group_by(OutboxTask.status)).all())
+        return {status: counts.get(status, 0) for status in (PENDING, RUNNING, FAILED)}
+
+    def retry_failed(self) -> int:
+        with SessionLocal() as db:
+            count = db.execute(
+                update(OutboxTask).where(OutboxTask.status == FAILED).values(status=PENDING, attempts=0, run_at=datetime.utcnow())
+            ).rowcount
+            db.commit()
+        return count
+
+
+class MemoryBackend:
+    """Process-local queue for tests and scripts: same interface, nothing survives a restart."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._tasks: Dict[int, list] = {}  # id -> [name, payload, status, attempts, run_at, created_at, last_error]
+
+    def stage(self, db: Session, staged):
+        return list(staged)  # held by the session until the commit succeeds
+
+    def committed(self, staged):
+        now = datetime.utcnow()
+        with self._lock:
+            for name, payload in staged:
+                self._tasks[next(self._ids)] = [name, payload, PENDING, 0, now, now, None]
+
+    def claim(self, limit: int) -> List[TaskRecord]:
+        now = datetime.utcnow()
+        with self._lock:
+            due = sorted(
+                (entry[4], task_id) for task_id, entry in self._tasks.items() if entry[2] in (PENDING, RUNNING) and entry[4] <= now
+            )[:limit]
+            claimed = []
+            for _, task_id in due:
+                entry = self._tasks[task_id]
+                entry[2], entry[3], entry[4] = RUNNING, entry[3] + 1, now + timedelta(seconds=TASK_LEASE_SECONDS)
+                claimed.append(TaskRecord(task_id, entry[0], entry[1], entry[3], entry[5]))
+        return claimed
+
+    def complete(self, record: TaskRecord):
+        with self._lock:
+            self._tasks.pop(record.id, None)
+
+    def retry(self, record: TaskRecord, error: str, delay_seconds: float):
+        self._release(record, PENDING, error, datetime.utcnow() + timedelta(seconds=delay_seconds))
+
+    def fail(self, record: TaskRecord, error: str):
+        self._release(record, FAILED, error, datetime.utcnow())
+
+    def _release(self, record: TaskRecord, status: str, error: str, run_at: datetime):
+        with self._lock:
+            entry = self._tasks.get(record.id)
+            if entry is not None:
+                entry[2], entry[4], entry[6] = status, run_at, error
+
+    def depth(self) -> dict:
+        with self._lock:
+            statuses = [entry[2] for entry in self._tasks.values()]
+        return {status: statuses.count(status) for status in (PENDING, RUNNING, FAILED)}
+
+    def failed_tasks(self) -> List[Tuple[str, str, Optional[str]]]:
+        """(name, payload, last_error) of every task that ran out of attempts."""
+        with self._lock:
+            return [(entry[0], entry[1], entry[6]) for entry in self._tasks.values() if entry[2] == FAILED]
+
+
+def _load_backend(name: str) -> TaskBackend:
+    backends = {"outbox": OutboxBackend, "memory": MemoryBackend}
+    if name not in backends:
+        raise ValueError(f"TASK_BACKEND must be one of {sorted(backends)}, not {name!r}")
+    return backends[name]()
+
+
+def retry_delay(attempts: int) -> float:
+    # Exponential backoff with jitter, so tasks that failed together don't retry together
+    delay = min(TASK_RETRY_BASE_SECONDS * 2 ** (attempts - 1), TASK_RETRY_MAX_SECONDS)
+    return delay * random.uniform(0.5, 1.0)
+
+
+class TaskQueue:
+    """Runs queued tasks on a pool of daemon threads."""
+
+    def __init__(self, backend: TaskBackend, workers: int = TASK_WORKERS, max_attempts: int = TASK_MAX_ATTEMPTS):
+        self.backend = backend
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self._stopped = threading.Event()
+        self._wakeup = threading.Event()
+        self._threads: List[threading.Thread] = []
+        self._start_lock = threading.Lock()
+        self._start_when_used = False
+
+    def start(self, when_used: bool = False):
+        """Start the worker threads, or with `when_used`, once the first task is committed."""
+        with self._start_lock:
+            if self.workers <= 0 or any(thread.is_alive() for thread in self._threads):
+                return
+            if when_used:
+                self._start_when_used = True
+                return
+            self._start_when_used = False
+            self._stopped.clear()
+            self._threads = [
+                threading.Thread(target=self._work, name=f"task-worker-{number}", daemon=True) for number in range(self.workers)
+            ]
+            for thread in self._threads:
+                thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        # Tasks not yet run stay queued (in the outbox: until the next start)
+        self._start_when_used = False
+        self._stopped.set()
+        self._wakeup.set()
+        deadline = time.monotonic() + timeout
+        for thread in self._threads:
+            thread.join(max(0.0, deadline - time.monotonic()))
+
+    def wake(self):
+        if self._start_when_used and not self._stopped.is_set():
+            self.start()
+        self._wakeup.set()
+
+    def run_pending(self) -> int:
+        """Run every task that is due on the calling thread, including retries that fall due
+        meanwhile. Returns the number of runs."""
+        runs = 0
+        while True:
+            records = self.backend.claim(CLAIM_BATCH_SIZE)
+            if not records:
+                return runs
+            for record in records:
+                self._run(record)
+            runs += len(records)
+
+    def _work(self):
+        while not self._stopped.is_set():
+            try:
+                records = self.backend.claim(CLAIM_BATCH_SIZE)
+            except Exception:
+                logger.exception("Claiming background tasks failed")
+                records = []
+            for record in records:
+                self._run(record)
+            if not records:
+                self._wakeup.wait(timeout=TASK_POLL_SECONDS)
+                self._wakeup.clear()
+
+    def _run(self, record: TaskRecord):
+        started = time.perf_counter()
+        try:
+            fn = _registry.get(record.name)
+            if fn is None:
+                raise LookupError(f"Unknown task {record.name!r}")
+            fn(**json.loads(record.payload))
+        except Exception as exc:
+            error = f"{type(exc).__name__}: {exc}"[:MAX_ERROR_LENGTH]
+            try:
+                if record.attempts >= self.max_attempts:
+                    logger.exception("Task %s (id=%s) failed after %s attempts", record.name, record.id, record.attempts)
+                    self.backend.fail(record, error)
+                    task_outcomes.inc((record.name, "failed"))
+                else:
+                    delay = retry_delay(record.attempts)
+                    logger.warning(
+                        "Task %s (id=%s) failed, attempt %s of %s; retrying in %.1fs: %s",
+                        record.name, record.id, record.attempts, self.max_attempts, delay, error,
+                    )
+                    self.backend.retry(record, error, delay)
+                    task_outcomes.inc((record.name, "retried"))
+            except Exception:
+                logger.exception("Recording the failure of task %s (id=%s) failed; it runs again when its lease expires", record.name, record.id)
+            return
+        try:
+            self.backend.complete(record)
+        except Exception:
+            logger.exception("Removing finished task %s (id=%s) failed; it runs again when its lease expires", record.name, record.id)
+            return
+        task_run_time.observe((record.name,), time.perf_counter() - started)
+        task_latency.observe((record.name,), max(0.0, (datetime.utcnow() - record.created_at).total_seconds()))
+        task_outcomes.inc((record.name, "completed"))
+
+    def stats(self) -> dict:
+        if self._start_when_used:
+            return {"workers": 0}  # not used yet: nothing to count, and no query to count it
+        return {**self.backend.depth(), "workers": sum(thread.is_alive() for thread in self._threads)}
+
+
+task_queue = TaskQueue(_load_backend(TASK_BACKEND))
+# Tasks registered as local; with TASK_BACKEND=memory the main queue already is. Always has a
+# worker: nothing else would ever run them
+local_task_queue = task_queue if TASK_BACKEND == "memory" else TaskQueue(MemoryBackend(), workers=max(TASK_WORKERS, 1))
+
+
+@event.listens_for(Session, "before_commit")
+def _write_staged_tasks(session):
+    staged = session.info.pop(_STAGED, None)
+    if staged:
+        session.info[_COMMITTING] = task_queue.backend.stage(session, staged)
+
+
+@event.listens_for(Session, "after_commit")
+def _wake_workers(session):
+    if _COMMITTING in session.info:
+        task_queue.backend.committed(session.info.pop(_COMMITTING))
+        task_queue.wake()
+    staged_local = session.info.pop(_STAGED_LOCAL, None)
+    if staged_local:
+        local_task_queue.backend.committed(local_task_queue.backend.stage(session, staged_local))
+        local_task_queue.wake()
+
+
+@event.listens_for(Session, "after_rollback")
+def _drop_staged_tasks(session):
+    # The write they belonged to is gone
+    session.info.pop(_STAGED, None)
+    session.info.pop(_STAGED_LOCAL, None)
+    session.info.pop(_COMMITTING, None)
+
+
+if __name__ == "__main__":
+    if sys.argv[1:] not in (["run"], ["retry-failed"]):
+        print("usage: python tasks.py run | retry-failed")
+        sys.exit(2)
+    # Through the importable module, where the task functions register themselves
+    import events  # noqa: F401
+    import recommendations  # noqa: F401
+    import tasks
+    from database import create_missing_schema
+
+    create_missing_schema()
+    if sys.argv[1] == "run":
+        print(f"Ran {tasks.task_queue.run_pending()} tasks.")
+    elif isinstance(tasks.task_queue.backend, tasks.OutboxBackend):
+        print(f"Queued {tasks.task_queue.backend.retry_failed()} failed tasks again.")
+    else:
+        print("retry-failed needs TASK_BACKEND=outbox.")
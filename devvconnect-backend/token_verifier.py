@@ -0,0 +1,232 @@
+# File: devvconnect-backend/token_verifier.py
+# In-process verification of Firebase ID tokens.
+#
+# Firebase ID tokens are RS256 JWTs signed by Google. Instead of handing every token
+# to the Admin SDK we check the signature, aud, iss and exp here against a cache of
+# Google's public signing keys. The cache is filled at startup and refreshed by a
+# background thread according to the Cache-Control max-age of the key endpoint, so a
+# cold key fetch never happens while a request is waiting.
+#
+# Where the keys come from is pluggable (KeySource), so tests and benchmarks can point
+# at a local key server (FIREBASE_SIGNING_KEYS_URL) or a static keyset with no network.
+import json
+import logging
+import re
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+import jwt
+import requests
+from cryptography import x509
+from cryptography.hazmat.primitives.serialization import load_pem_public_key
+from firebase_admin import auth as firebase_auth_admin
+
+logger = logging.getLogger(__name__)
+
+GOOGLE_SECURETOKEN_CERTS_URL = (
+    "https://www.googleapis.com/robot/v1/metadata/x509/securetoken@system.gserviceaccount.com"
+)
+DEFAULT_KEYS_MAX_AGE_SECONDS = 3600.0  # used when the key endpoint sends no max-age
+MIN_REFRESH_INTERVAL_SECONDS = 30.0
+REFRESH_RETRY_SECONDS = 15.0
+
+_MAX_AGE_RE = re.compile(r"max-age=(\d+)")
+
+
+def load_public_key(material: Any):
+    """Accepts a PEM certificate, a PEM public key, or an already loaded key object."""
+    if not isinstance(material, (str, bytes)):
+        return material
+    pem = material.encode("utf-8") if isinstance(material, str) else material
+    if b"BEGIN CERTIFICATE" in pem:
+        return x509.load_pem_x509_certificate(pem).public_key()
+    return load_pem_public_key(pem)
+
+
+def parse_key_document(document: Any) -> Dict[str, Any]:
+    # Two shapes are accepted: Google's x509 map {kid: "-----BEGIN CERTIFICATE..."}
+    # and a standard JWKS {"keys": [{"kid": ..., "kty": "RSA", "n": ..., "e": ...}]}.
+    if isinstance(document, dict) and isinstance(document.get("keys"), list):
+        return {jwk["kid"]: jwt.PyJWK(jwk, algorithm="RS256").key for jwk in document["keys"]}
+    return {kid: load_public_key(pem) for kid, pem in document.items()}
+
+
+def parse_max_age(cache_control: Optional[str]) -> Optional[float]:
+    if not cache_control:
+        return None
+    match = _MAX_AGE_RE.search(cache_control)
+    return float(match.group(1)) if match else None
+
+
+class KeySource:
+    """Returns (kid -> public key, max_age_seconds or None)."""
+
+    def fetch(self) -> Tuple[Dict[str, Any], Optional[float]]:
+        raise NotImplementedError
+
+
+class HttpKeySource(KeySource):
+    def __init__(self, url: str = GOOGLE_SECURETOKEN_CERTS_URL, timeout: float = 5.0):
+        self.url = url
+        self.timeout = timeout
+
+    def fetch(self):
+        response = requests.get(self.url, timeout=self.timeout)
+        response.raise_for_status()
+        keys = parse_key_document(response.json())
+        return keys, parse_max_age(response.headers.get("Cache-Control"))
+
+
+class StaticKeySource(KeySource):
+    def __init__(self, keys: Dict[str, Any], max_age: Optional[float] = None):
+        self.keys = {kid: load_public_key(material) for kid, material in keys.items()}
+        self.max_age = max_age
+
+    def fetch(self):
+        return dict(self.keys), self.max_age
+
+
+class FileKeySource(KeySource):
+    def __init__(self, path: str):
+        self.path = path
+
+    def fetch(self):
+        with open(self.path) as f:
+            return parse_key_document(json.load(f)), None
+
+
+class SigningKeyCache:
+    def __init__(self, source: KeySource):
+        self.source = source
+        self._keys: Dict[str, Any] = {}
+        self._next_refresh_at = 0.0
+        self._last_refresh_at = 0.0
+        self._refresh_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.refreshes = 0
+        self.refresh_failures = 0
+
+    @property
+    def loaded(self) -> bool:
+        return bool(self._keys)
+
+    def refresh(self) -> bool:
+        with self._refresh_lock:
+            return self._refresh_locked()
+
+    def _refresh_locked(self) -> bool:
+        self._last_refresh_at = time.time()
+        try:
+            keys, max_age = self.source.fetch()
+        except Exception as e:
+            self.refresh_failures += 1
+            self._next_refresh_at = time.time() + REFRESH_RETRY_SECONDS
+            logger.warning("SigningKeyCache: failed to fetch signing keys: %s - %s", type(e).__name__, e)
+            return False
+        lifetime = max_age if max_age is not None else DEFAULT_KEYS_MAX_AGE_SECONDS
+        # Refresh a bit before the keys go stale so rotation never races a request
+        self._keys = keys
+        self._next_refresh_at = time.time() + max(lifetime * 0.9, MIN_REFRESH_INTERVAL_SECONDS)
+        self.refreshes += 1
+        return True
+
+    def get_key(self, kid: str):
+        key = self._keys.get(kid)
+        if key is not None:
+            return key
+        if not self._keys:
+            # Nothing was ever loaded (startup prefetch failed): this is the only case
+            # where a request waits on the network. Concurrent requests queue on the lock
+            # and share one fetch: whoever gets the lock next finds the keys loaded, or a
+            # fetch that just failed, which isn't retried before REFRESH_RETRY_SECONDS.
+            with self._refresh_lock:
+                if not self._keys and time.time() - self._last_refresh_at >= REFRESH_RETRY_SECONDS:
+                    self._refresh_locked()
+            return self._keys.get(kid)
+        # Unknown kid with a warm cache: Google may have rotated, wake the refresher
+        # but don't make this request wait for it. At most once per
+        # MIN_REFRESH_INTERVAL_SECONDS, so tokens with made-up kids can't drive fetches.
+        if time.time() - self._last_refresh_at >= MIN_REFRESH_INTERVAL_SECONDS:
+            self._wake.set()
+        return None
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        if not self._keys:
+            self.refresh()
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, name="signing-key-refresh", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+        self._wake.set()
+
+    def _run(self):
+        while not self._stopped.is_set():
+            self._wake.wait(timeout=max(self._next_refresh_at - time.time(), 0))
+            self._wake.clear()
+            if self._stopped.is_set():
+                break
+            now = time.time()
+            if now < self._next_refresh_at and now - self._last_refresh_at < MIN_REFRESH_INTERVAL_SECONDS:
+                # Woken for an unknown kid right after a refresh; don't hammer the key endpoint
+                self._next_refresh_at = self._last_refresh_at + MIN_REFRESH_INTERVAL_SECONDS
+                continue
+            self.refresh()
+
+
+class FirebaseTokenVerifier:
+    """Checks a Firebase ID token's RS256 signature and claims without any network I/O."""
+
+    def __init__(self, project_id: str, key_cache: SigningKeyCache, clock_skew_seconds: int = 0):
+        self.project_id = project_id
+        self.issuer = f"https://securetoken.google.com/{project_id}"
+        self.key_cache = key_cache
+        self.clock_skew_seconds = clock_skew_seconds
+
+    def verify(self, token: str) -> dict:
+        if not token or not isinstance(token, str):
+            raise firebase_auth_admin.InvalidIdTokenError("ID token must be a non-empty string.")
+        try:
+            header = jwt.get_unverified_header(token)
+        except jwt.PyJWTError as e:
+            raise firebase_auth_admin.InvalidIdTokenError(f"Malformed ID token: {e}", cause=e)
+
+        if header.get("alg") != "RS256":
+            raise firebase_auth_admin.InvalidIdTokenError("ID token has incorrect algorithm; expected RS256.")
+        kid = header.get("kid")
+        if not kid:
+            raise firebase_auth_admin.InvalidIdTokenError('ID token has no "kid" header.')
+        key = self.key_cache.get_key(kid)
+        if key is None:
+            raise firebase_auth_admin.InvalidIdTokenError("ID token was signed by an unknown key.")
+
+        try:
+            claims = jwt.decode(
+                token,
+                key,
+                algorithms=["RS256"],
+                audience=self.project_id,
+                issuer=self.issuer,
+                leeway=self.clock_skew_seconds,
+                options={"require": ["exp", "iat", "aud", "iss", "sub"]},
+            )
+        except jwt.ExpiredSignatureError as e:
+            raise firebase_auth_admin.ExpiredIdTokenError("Token expired.", cause=e)
+        except jwt.PyJWTError as e:
+            raise firebase_auth_admin.InvalidIdTokenError(f"Invalid ID token: {e}", cause=e)
+
+        subject = claims.get("sub")
+        if not isinstance(subject, str) or not subject or len(subject) > 128:
+            raise firebase_auth_admin.InvalidIdTokenError('ID token has an invalid "sub" claim.')
+        auth_time = claims.get("auth_time")
+        if auth_time is not None and auth_time > time.time() + self.clock_skew_seconds:
+            raise firebase_auth_admin.InvalidIdTokenError('ID token has an "auth_time" in the future.')
+
+        claims["uid"] = subject  # same convenience key the Admin SDK adds
+        return claims